@@ -0,0 +1,197 @@
+import asyncio
+import random
+import time
+from functools import cached_property
+from typing import AsyncGenerator, List, Optional
+
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import Client, errors, types
+from loguru import logger
+
+from backend.agents.model_routing import fallback_chain, select_model
+from backend.core.config import settings
+from backend.services.key_pool import GeminiCredential, get_key_pool
+from backend.services.rate_limiter import estimate_tokens, get_rate_limiter
+from backend.services.resilience import CircuitOpenError, get_circuit_breaker, get_latency_tracker
+from backend.utils.metrics import count
+
+RETRYABLE_STATUS_CODES = {429, 503}
+
+
+def _request_text_length(llm_request: LlmRequest) -> int:
+    length = 0
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            length += len(part.text or "")
+    if llm_request.config and isinstance(llm_request.config.system_instruction, str):
+        length += len(llm_request.config.system_instruction)
+    return length
+
+
+class ManagedGemini(Gemini):
+    """
+    Gemini model that picks the model for each call from the routing table by task
+    and input size, goes through the cluster-wide rate limiter and retries 429/503
+    responses with jittered exponential backoff. Each attempt runs with the client of
+    a credential chosen from the key pool, so no key is read from the environment;
+    while another key is healthy, a rate-limited attempt moves to it without waiting.
+    After ``gemini_fallback_after_attempts`` failed attempts the call moves on to the
+    fallback model of the overloaded one.
+
+    Models whose circuit breaker is open are skipped; if the whole chain is open the
+    call fails fast with CircuitOpenError. With hedging enabled, a non-streamed call
+    that runs longer than the observed p95 of its task and model gets a duplicate
+    request (on another key when one is available), and the first answer wins.
+
+    A call is retried only while nothing has been yielded to the runner yet,
+    so a partially streamed response is never duplicated.
+    """
+
+    # Routing task from ``model_routing``; without it ``model`` is always used.
+    task: Optional[str] = None
+
+    @cached_property
+    def api_client(self) -> Client:
+        """Client of the first pooled credential; calls are bound to the chosen key in ``_bound_to``."""
+        pool = get_key_pool()
+        return pool.client(pool.credentials[0], self._http_options())
+
+    def _http_options(self) -> types.HttpOptions:
+        return types.HttpOptions(headers=self._tracking_headers, retry_options=self.retry_options)
+
+    def _bound_to(self, credential: GeminiCredential) -> "ManagedGemini":
+        """
+        Shallow copy of the model that calls Gemini with the client of ``credential``.
+        The agents share one model instance, so the key is never set on ``self``.
+        """
+        bound = self.model_copy()
+        bound.__dict__["api_client"] = get_key_pool().client(credential, self._http_options())
+        bound.__dict__.pop("_api_backend", None)
+        return bound
+
+    async def _complete(self, credential: GeminiCredential, llm_request: LlmRequest) -> List[LlmResponse]:
+        bound = self._bound_to(credential)
+        return [response async for response in super(ManagedGemini, bound).generate_content_async(llm_request)]
+
+    async def _hedged_complete(
+            self,
+            model: str,
+            credential: GeminiCredential,
+            llm_request: LlmRequest,
+            estimated_tokens: int
+    ) -> List[LlmResponse]:
+        """
+        Non-streamed call that starts a duplicate once it runs longer than the hedge delay
+        and returns the first successful answer; the slower request is cancelled.
+        """
+        tasks = {asyncio.ensure_future(self._complete(credential, llm_request))}
+        delay = get_latency_tracker().hedge_delay((self.task or "", model))
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    hedge_credential = await get_key_pool().choose(model)
+                    await get_rate_limiter().acquire(model, hedge_credential.key_id, estimated_tokens)
+                    logger.info(f"Gemini ({model}) call is slower than {delay:.1f}s, sending a hedged request.")
+                    count("llm:hedged_calls", 1)
+                    tasks.add(asyncio.ensure_future(self._complete(hedge_credential, llm_request.model_copy(deep=True))))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_content_async(
+            self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        limiter = get_rate_limiter()
+        pool = get_key_pool()
+        breaker = get_circuit_breaker()
+        latencies = get_latency_tracker()
+        estimated_tokens = estimate_tokens(_request_text_length(llm_request))
+        primary = select_model(self.task, estimated_tokens, llm_request.model or self.model)
+        models = fallback_chain(primary)
+        max_attempts = max(1, settings.gemini_retry_attempts)
+        logger.debug(f"Routing {self.task or 'untyped'} request (~{estimated_tokens} tokens) to {primary}.")
+
+        for index, model in enumerate(models):
+            is_last_model = index == len(models) - 1
+            attempts = max_attempts if is_last_model else max(1, min(max_attempts, settings.gemini_fallback_after_attempts))
+            llm_request.model = model
+
+            for attempt in range(attempts):
+                # Checked before every attempt: the breaker may have opened while this call backed off.
+                permit = breaker.allow(model)
+                if permit is None:
+                    if is_last_model:
+                        raise CircuitOpenError(model, breaker.retry_after(model))
+                    logger.warning(f"Circuit breaker for {model} is open, using {models[index + 1]}.")
+                    break
+                credential = await pool.choose(model)
+                await limiter.acquire(model, credential.key_id, estimated_tokens)
+                started = time.monotonic()
+                yielded = False
+                healthy: Optional[bool] = None
+                try:
+                    if stream:
+                        responses = super(ManagedGemini, self._bound_to(credential)).generate_content_async(
+                            llm_request, stream=True
+                        )
+                    else:
+                        responses = _iterate(await self._hedged_complete(model, credential, llm_request, estimated_tokens))
+                    async for response in responses:
+                        yielded = True
+                        if not response.partial and response.usage_metadata and response.usage_metadata.total_token_count:
+                            await limiter.record_usage(
+                                model, credential.key_id, response.usage_metadata.total_token_count - estimated_tokens
+                            )
+                        yield response
+                    healthy = True
+                    pool.report_success(credential)
+                    latencies.observe((self.task or "", model), time.monotonic() - started)
+                    return
+                except (errors.ClientError, errors.ServerError) as e:
+                    # Only overload counts against the model; a 4xx is a problem of the request.
+                    healthy = not (e.code == 429 or isinstance(e, errors.ServerError))
+                    if yielded or e.code not in RETRYABLE_STATUS_CODES:
+                        raise
+                    if e.code == 429:
+                        # Quota is per key; a 503 means the model itself is overloaded.
+                        pool.report_failure(credential, e.code)
+                    if attempt == attempts - 1:
+                        if is_last_model:
+                            raise
+                        logger.warning(f"Gemini ({model}) returned {e.code}, falling back to {models[index + 1]}.")
+                        break
+                    if e.code == 429 and any(c.key_id != credential.key_id for c in pool.healthy()):
+                        logger.warning(f"Gemini ({model}) returned {e.code}, retrying on another key.")
+                        continue
+                    backoff = min(settings.gemini_retry_max_delay, settings.gemini_retry_base_delay * 2 ** attempt)
+                    delay = backoff / 2 + random.uniform(0, backoff / 2)
+                    logger.warning(
+                        f"Gemini ({model}) returned {e.code}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 2}/{attempts})."
+                    )
+                    await asyncio.sleep(delay)
+                except Exception:
+                    # Connection errors, timeouts and other failures of the call count against the model;
+                    # cancellation is a BaseException and leaves the outcome open.
+                    healthy = False
+                    raise
+                finally:
+                    if healthy is None:
+                        breaker.abandon(permit)
+                    else:
+                        breaker.record(permit, ok=healthy)
+
+
+async def _iterate(responses: List[LlmResponse]) -> AsyncGenerator[LlmResponse, None]:
+    for response in responses:
+        yield response
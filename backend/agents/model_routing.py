@@ -0,0 +1,82 @@
+"""
+Input-size-aware model selection for the agents.
+
+Every agent routes by its own task, named after the agent, so each agent can get its
+own models and tiers. The routing table maps the task to model tiers by the estimated
+number of input tokens, so short CVs go to the cheapest model and long interview
+transcripts to a model that handles long context well. When a model is overloaded,
+``ManagedGemini`` falls back along ``DEFAULT_MODEL_FALLBACKS``.
+
+Both tables can be overridden per agent or per model with the ``GEMINI_MODEL_ROUTES``
+and ``GEMINI_MODEL_FALLBACKS`` settings (JSON), e.g.
+``GEMINI_MODEL_ROUTES='{"final_report_generator": [{"model": "gemini-2.5-flash"}]}'``.
+"""
+from typing import Dict, List, Optional
+
+from backend.core.config import settings
+
+CANDIDATE_DATA_PARSER = "candidate_data_parser"
+JOB_REQUIREMENTS_PARSER = "job_requirements_parser"
+CANDIDATE_CV_PARSER = "candidate_cv_parser"
+MATCHING_AND_PROFILING = "matching_and_profiling_agent"
+INTERVIEW_PLAN_GENERATOR = "interview_plan_generator"
+INTERVIEW_TOPIC_EXTRACTOR = "interview_topic_extractor"
+FINAL_REPORT_GENERATOR = "final_report_generator"
+
+# Tiers are checked in order; a tier without "max_input_tokens" catches everything above.
+_EXTRACTION_TIERS = [
+    {"max_input_tokens": 32_000, "model": "gemini-2.0-flash-lite"},
+    {"max_input_tokens": 200_000, "model": "gemini-2.0-flash"},
+    {"model": "gemini-2.5-flash"},
+]
+_SHORT_INPUT_TIERS = [
+    {"max_input_tokens": 16_000, "model": "gemini-2.0-flash-lite"},
+    {"model": "gemini-2.0-flash"},
+]
+_TRANSCRIPT_TIERS = [
+    {"max_input_tokens": 32_000, "model": "gemini-2.0-flash-lite"},
+    {"max_input_tokens": 250_000, "model": "gemini-2.0-flash"},
+    {"model": "gemini-2.5-flash"},
+]
+
+DEFAULT_MODEL_ROUTES: Dict[str, List[dict]] = {
+    CANDIDATE_DATA_PARSER: _EXTRACTION_TIERS,
+    JOB_REQUIREMENTS_PARSER: _EXTRACTION_TIERS,
+    CANDIDATE_CV_PARSER: _EXTRACTION_TIERS,
+    MATCHING_AND_PROFILING: _SHORT_INPUT_TIERS,
+    INTERVIEW_PLAN_GENERATOR: _SHORT_INPUT_TIERS,
+    INTERVIEW_TOPIC_EXTRACTOR: _TRANSCRIPT_TIERS,
+    FINAL_REPORT_GENERATOR: _TRANSCRIPT_TIERS,
+}
+
+DEFAULT_MODEL_FALLBACKS: Dict[str, str] = {
+    "gemini-2.0-flash-lite": "gemini-2.0-flash",
+    "gemini-2.0-flash": "gemini-2.0-flash-lite",
+    "gemini-2.5-flash": "gemini-2.0-flash",
+}
+
+
+def select_model(task: Optional[str], estimated_tokens: int, default: str) -> str:
+    """Returns the model of the first tier of ``task`` that fits ``estimated_tokens``."""
+    if task is None:
+        return default
+    routes = settings.gemini_model_routes.get(task) or DEFAULT_MODEL_ROUTES.get(task)
+    if not routes:
+        return default
+    for route in routes:
+        max_tokens = route.get("max_input_tokens")
+        if max_tokens is None or estimated_tokens <= max_tokens:
+            return route["model"]
+    return routes[-1]["model"]
+
+
+def fallback_chain(model: str, max_length: int = 2) -> List[str]:
+    """``model`` followed by its fallbacks, without repeats."""
+    fallbacks = {**DEFAULT_MODEL_FALLBACKS, **settings.gemini_model_fallbacks}
+    chain = [model]
+    while len(chain) < max_length:
+        following = fallbacks.get(chain[-1])
+        if not following or following in chain:
+            break
+        chain.append(following)
+    return chain
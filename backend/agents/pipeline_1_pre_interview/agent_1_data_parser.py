@@ -1,8 +1,11 @@
 from google.adk.agents import Agent
 
+from backend.agents import model_routing
+from backend.agents.llm import ManagedGemini
+
 agent_1_data_parser = Agent(
     name="candidate_data_parser",
-    model="gemini-2.0-flash-lite",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.CANDIDATE_DATA_PARSER),
     description="Агент для извлечения и структурирования ключевой информации из резюме, требований к вакансии"
                 " и фидбэка рекрутера.",
     instruction="""
@@ -52,3 +55,77 @@ agent_1_data_parser = Agent(
 """,
     tools=[],
 )
+
+agent_1_requirements_parser = Agent(
+    name="job_requirements_parser",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.JOB_REQUIREMENTS_PARSER),
+    description="Агент для извлечения требований к вакансии. Используется один раз на пакет кандидатов.",
+    instruction="""
+    Ты — профессиональный HR-аналитик. Твоя задача — извлечь и структурировать требования к вакансии.
+
+    ### 1. Входные данные
+    - **requirements_text**: Текст с требованиями к вакансии (из Google Таблицы).
+
+    ### 2. Задачи по извлечению информации
+    - **hard_skills_required**: Список ключевых технических навыков и требований.
+    - **soft_skills_required**: Список ключевых "мягких" навыков и требований.
+
+    ### 3. Формат вывода
+    Твой ответ должен быть **ТОЛЬКО** одним валидным JSON-объектом, без каких-либо вводных слов или Markdown-разметки.
+
+    **Пример структуры JSON:**
+    ```json
+    {
+      "job_requirements": {
+        "hard_skills_required": ["Опыт с Selenium", "Знание SQL", "Опыт с CI/CD"],
+        "soft_skills_required": ["Коммуникабельность", "Работа в команде"]
+      }
+    }
+    ```
+""",
+    tools=[],
+)
+
+agent_1_candidate_parser = Agent(
+    name="candidate_cv_parser",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.CANDIDATE_CV_PARSER),
+    description="Агент для извлечения информации о кандидате из резюме и фидбэка рекрутера, когда требования"
+                " к вакансии уже разобраны.",
+    instruction="""
+    Ты — профессиональный HR-аналитик. Твоя задача — извлечь и структурировать ключевую информацию из двух источников: резюме кандидата и (опционально) фидбэка от рекрутера.
+
+    ### 1. Входные данные
+    - **cv_text**: Полный текст резюме кандидата.
+    - **feedback_text**: Текст с фидбэком от рекрутера.
+
+    ### 2. Задачи по извлечению информации
+
+    **А. Из резюме (`cv_text`):**
+    - **first_name**: Имя кандидата.
+    - **last_name**: Фамилия кандидата.
+    - **skills**: Список ВСЕХ технических навыков, языков программирования, фреймворков и инструментов.
+    - **experience**: Краткое, но емкое описание опыта работы, включая проекты, роли и обязанности.
+
+    **Б. Из фидбэка рекрутера (`feedback_text`):**
+    - Извлеки из текста любые комментарии, наблюдения и общую оценку от рекрутера.
+
+    ### 3. Формат вывода
+    Твой ответ должен быть **ТОЛЬКО** одним валидным JSON-объектом, без каких-либо вводных слов или Markdown-разметки.
+
+    **Пример структуры JSON:**
+    ```json
+    {
+      "candidate_info": {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "skills": ["Python", "JavaScript", "Docker", "CI/CD", "PostgreSQL"],
+        "experience": "3 года опыта в автоматизации тестирования API и веб-приложений."
+      },
+      "recruiter_feedback": {
+        "comments": "Кандидат показался очень мотивированным."
+      }
+    }
+    ```
+""",
+    tools=[],
+)
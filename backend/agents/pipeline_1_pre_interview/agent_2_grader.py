@@ -1,8 +1,11 @@
 from google.adk.agents import Agent
 
+from backend.agents import model_routing
+from backend.agents.llm import ManagedGemini
+
 agent_2_grader = Agent(
     name="matching_and_profiling_agent",
-    model="gemini-2.0-flash-lite",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.MATCHING_AND_PROFILING),
     description="Агент для сравнения данных кандидата с требованиями вакансии и формирования его профиля.",
     instruction="""
     Ты — опытный тимлиод. Твоя задача — взять существующий JSON с информацией о кандидате и требованиях, добавить в него свою экспертную оценку и вернуть объединенный JSON.
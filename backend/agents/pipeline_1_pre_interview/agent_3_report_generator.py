@@ -1,8 +1,11 @@
 from google.adk.agents import Agent
 
+from backend.agents import model_routing
+from backend.agents.llm import ManagedGemini
+
 agent_3_report_generator = Agent(
     name="interview_plan_generator",
-    model="gemini-2.0-flash-lite",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.INTERVIEW_PLAN_GENERATOR),
     description="Агент для создания итогового отчета и плана интервью в формате JSON.",
     instruction="""
 Ты — AI-ассистент, твоя задача — на основе JSON-объекта с полным анализом кандидата сгенерировать финальный отчет для интервьюера.
@@ -1,20 +1,24 @@
 from google.adk.agents import Agent
 
+from backend.agents import model_routing
+from backend.agents.llm import ManagedGemini
+
 agent_4_topic_extractor = Agent(
     name="interview_topic_extractor",
-    model="gemini-2.0-flash-lite",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.INTERVIEW_TOPIC_EXTRACTOR),
     description="Агент для извлечения обсуждавшихся тем из транскрипции интервью.",
     instruction="""
 Твоя задача — проанализировать стенограмму технического интервью и создать детальный список ключевых вопросов или тем, которые обсуждались.
 
 **Входные данные:**
-- Полный текст транскрипции.
+- Транскрипция, разбитая на реплики: каждая строка имеет вид `#номер роль мм:сс текст`, где роль `I` — интервьюер, `C` — кандидат (`S`, если в записи один голос). Если реплик нет, это сплошной текст.
 
 **Действия:**
 1. Внимательно прочитай весь текст.
-2. Для каждого логического блока разговора сформулируй основной вопрос, на который кандидат пытался ответить.
-3. Опускай общие фразы, комментарии и светскую беседу. Фокусируйся на конкретных технических и поведенческих вопросах.
-4. Результат должен быть списком конкретных, обсуждавшихся тем.
+2. Для каждого логического блока разговора сформулируй основной вопрос, на который кандидат пытался ответить. Вопросы обычно задает интервьюер (`I`), ответы дает кандидат (`C`).
+3. Если реплики пронумерованы, добавь в конец названия темы номера реплик, где она обсуждалась, в виде `(#12-#15)`.
+4. Опускай общие фразы, комментарии и светскую беседу. Фокусируйся на конкретных технических и поведенческих вопросах.
+5. Результат должен быть списком конкретных, обсуждавшихся тем.
 
 **Формат вывода:**
 - Верни результат в виде **ОДНОГО** валидного JSON-объекта.
@@ -25,8 +29,8 @@ agent_4_topic_extractor = Agent(
 ```json
 {
   "topics": [
-    "Разница между Put и Patch в REST API",
-    "Назначение и виды переменных в Postman",
+    "Разница между Put и Patch в REST API (#4-#7)",
+    "Назначение и виды переменных в Postman (#8-#11)",
     "Объяснение нормализации и денормализации баз данных",
     "Ключевые отличия Scrum от Kanban",
     "Специфика тестирования в блокчейн-проектах"
@@ -1,8 +1,11 @@
 from google.adk.agents import Agent
 
+from backend.agents import model_routing
+from backend.agents.llm import ManagedGemini
+
 agent_5_final_report_generator = Agent(
     name="final_report_generator",
-    model="gemini-2.0-flash-lite",
+    model=ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.FINAL_REPORT_GENERATOR),
     description="Агент для комплексного анализа данных кандидата и генерации структурированного JSON-отчета.",
     instruction="""
 Ты — ведущий AI-аналитик в HR-департаменте. Твоя главная задача — провести строгий и глубокий сравнительный анализ кандидата, сопоставляя информацию о нем с требованиями компании, и на основе этого анализа сгенерировать исчерпывающий JSON-отчет.
@@ -25,12 +28,12 @@ agent_5_final_report_generator = Agent(
 
 **1. Информация о кандидате:**
 - Текст резюме кандидата (CV). **Этот текст может отсутствовать или содержать сообщение "CV не был предоставлен".**
-- Транскрипция интервью
-- Список тем/вопросов интервью
+- Транскрипция интервью, разбитая на реплики вида `#номер роль мм:сс текст` (роль `I` — интервьюер, `C` — кандидат)
+- Список тем/вопросов интервью; номера в скобках, например `(#12-#15)`, указывают на реплики транскрипции, где обсуждалась тема
 
 **2. Требования компании:**
 - Требования к вакансии
-- Матрица компетенций
+- Матрица компетенций (только строки, относящиеся к темам интервью; остальные строки опущены)
 - Ценности департамента
 - Портрет идеального сотрудника
 
@@ -1,20 +1,80 @@
 import os
+from typing import TYPE_CHECKING, Optional
 
-from redis import from_url
-from rq import Queue
+from fastapi import Request
+from loguru import logger
+from redis import Redis, RedisError, from_url
 
-from backend.services.analysis_service import AnalysisService
+from backend.core.config import settings
+from backend.queue.scheduling import JobScheduler
 
+if TYPE_CHECKING:
+    from backend.services.analysis_service import AnalysisService
+
+
+def get_analysis_service() -> "AnalysisService":
+    # Imported on first use: the service pulls in google-adk, assemblyai and the Drive client,
+    # which would otherwise be paid on every cold start before the first request.
+    from backend.services.analysis_service import AnalysisService
 
-def get_analysis_service() -> AnalysisService:
     return AnalysisService()
 
 
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-redis_conn = from_url(redis_url)
-results_queue = Queue("results_processing", connection=redis_conn)
+redis_conn: Optional[Redis] = None
+job_scheduler: Optional[JobScheduler] = None
+
+
+def connect_redis() -> Redis:
+    """Creates the shared Redis connection. Called from the application startup hook."""
+    global redis_conn, job_scheduler
+    if redis_conn is None:
+        redis_conn = from_url(redis_url)
+        job_scheduler = JobScheduler(redis_conn)
+    return redis_conn
+
+
+def open_redis() -> None:
+    """Startup hook: creates the connection and opens the first socket before traffic arrives."""
+    connection = connect_redis()
+    try:
+        connection.ping()
+        logger.info("Подключение к Redis установлено.")
+    except RedisError as e:
+        logger.warning(f"Redis недоступен при старте, подключение будет повторено при запросе: {e}")
+
+
+def close_redis() -> None:
+    """Shutdown hook: closes the shared Redis connection pool."""
+    global redis_conn, job_scheduler
+    if redis_conn is not None:
+        redis_conn.close()
+    redis_conn = None
+    job_scheduler = None
+
+
+def get_redis_connection() -> Redis:
+    """FastAPI Dependency to get the shared Redis connection."""
+    return connect_redis()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """FastAPI Dependency to get the scheduler that routes jobs to priority queues."""
+    connect_redis()
+    return job_scheduler
 
 
-def get_results_queue() -> Queue:
-    """FastAPI Dependency to get the RQ queue instance."""
-    return results_queue
+def get_submitter(request: Request) -> str:
+    """
+    FastAPI Dependency that identifies who submitted a job, for fair-share scheduling.
+    The identity is the client address seen by the server, never a value the client can pick.
+    Behind ``trusted_proxy_hops`` proxies (1 on Cloud Run) it is the X-Forwarded-For entry
+    appended by the outermost trusted proxy; entries to its left are client-controlled.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        forwarded = [address.strip() for address in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [address for address in forwarded if address]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "anonymous"
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Any, Literal, Optional
 
 class BaseResponse(BaseModel):
     message: str
@@ -67,6 +68,7 @@ class FullReport(BaseModel):
 
 class ResultsAnalysis(BaseResponse):
     report: FullReport
+    matrix_coverage: Optional[float] = Field(None, description="Доля строк матрицы компетенций, затронутых на интервью")
 
 class TaskResponse(BaseModel):
     message: str
@@ -76,4 +78,60 @@ class JobStatusResponse(BaseModel):
     job_id: str
     status: str
     result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+class BatchCandidateStatus(BaseModel):
+    index: int
+    filename: Optional[str] = None
+    status: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    candidates: List[BatchCandidateStatus]
+
+class ExportRequest(BaseModel):
+    format: Literal["pdf", "docx"] = Field(..., description="Формат файла")
+    report: Dict[str, Any] = Field(..., description="Отчет подготовки или результатов интервью в том виде, в каком его вернул API")
+
+class ExportResponse(BaseModel):
+    report_hash: str
+    format: str
+    status: str
+    download_url: str
+
+class StoredReportSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    report_id: str
+    kind: str
+    candidate_name: Optional[str] = None
+    requirements_link: Optional[str] = None
+    recommendation: Optional[str] = None
+    assessed_level: Optional[str] = None
+    created_at: datetime
+
+class StoredReportResponse(StoredReportSummary):
+    report: Dict[str, Any]
+
+class ReportListResponse(BaseModel):
+    items: List[StoredReportSummary]
+    next_cursor: Optional[int] = Field(None, description="Передайте в cursor, чтобы получить следующую страницу")
+
+class RankedCandidate(BaseModel):
+    report_id: str
+    kind: str
+    candidate_name: Optional[str] = None
+    score: float
+    features: Dict[str, Optional[float]]
+
+class RankingResponse(BaseModel):
+    requirements_link: str
+    total: int = Field(..., description="Сколько отчетов по вакансии было ранжировано до фильтров")
+    items: List[RankedCandidate]
+
+class JobProfileResponse(BaseModel):
+    job_id: str
+    artifacts: Dict[str, str] = Field(..., description="Ссылки на скачивание: cpu (pstats), allocations (tracemalloc), summary (текст)")
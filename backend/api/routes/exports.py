@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from loguru import logger
+from pydantic import ValidationError
+from redis import Redis
+
+from backend.api.deps import get_job_scheduler, get_redis_connection, get_submitter
+from backend.api.models import ErrorResponse, ExportRequest, ExportResponse, JobStatusResponse
+from backend.core.config import settings
+from backend.queue import export_store, result_store
+from backend.queue.scheduling import JobScheduler
+from backend.queue.trigger import notify_worker
+from backend.services import report_export
+
+router = APIRouter()
+
+ACTIVE_JOB_STATUSES = {"queued", "started", "deferred", "scheduled"}
+
+
+def _download_url(request: Request, report_hash: str, export_format: str) -> str:
+    return str(request.url_for("download_export", report_hash=report_hash, export_format=export_format).path)
+
+
+@router.post(
+    "/",
+    response_model=ExportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        200: {"model": ExportResponse, "description": "Файл уже готов и доступен по download_url."},
+        422: {"model": ErrorResponse},
+    },
+    summary="Экспортировать отчет в DOCX или PDF",
+    description="Ставит рендер отчета в интерактивную очередь воркера и возвращает ссылку на файл. "
+                "Файлы кэшируются по хэшу отчета: повторный экспорт того же отчета не рендерит его заново."
+)
+async def create_export(
+        body: ExportRequest,
+        request: Request,
+        response: Response,
+        scheduler: JobScheduler = Depends(get_job_scheduler),
+        submitter: str = Depends(get_submitter),
+        redis_conn: Redis = Depends(get_redis_connection)
+):
+    try:
+        analysis = report_export.parse_report(body.report)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Некорректный отчет: {e}")
+
+    report_hash = report_export.report_hash(analysis)
+    result = ExportResponse(
+        report_hash=report_hash,
+        format=body.format,
+        status="finished",
+        download_url=_download_url(request, report_hash, body.format)
+    )
+
+    if redis_conn.exists(export_store.file_key(report_hash, body.format)):
+        logger.info(f"Экспорт {report_hash}.{body.format} уже есть в кэше.")
+        response.status_code = status.HTTP_200_OK
+        return result
+
+    job_id = export_store.export_job_id(report_hash, body.format)
+    job_status = result_store.get_job_status(redis_conn, job_id)
+    if job_status not in ACTIVE_JOB_STATUSES:
+        export_store.save_source(redis_conn, report_hash, analysis.model_dump())
+        job = scheduler.enqueue(
+            "backend.queue.tasks.render_report_export",
+            kind="interactive",
+            submitter=submitter,
+            report_hash=report_hash,
+            export_format=body.format,
+            job_id=job_id,
+            job_timeout="5m",
+            result_ttl=settings.export_retention_seconds,
+            failure_ttl=settings.export_retention_seconds
+        )
+        job_status = job.get_status()
+        logger.info(f"Задача экспорта {job_id} добавлена в очередь {job.origin}.")
+        await notify_worker()
+
+    result.status = job_status
+    return result
+
+
+@router.get(
+    "/{report_hash}/{export_format}",
+    name="download_export",
+    response_class=Response,
+    responses={
+        200: {"content": {media_type: {} for media_type in report_export.EXPORT_MEDIA_TYPES.values()}},
+        202: {"model": JobStatusResponse, "description": "Файл еще рендерится; повторите запрос позже."},
+        304: {"description": "Файл не изменился."},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    summary="Скачать экспортированный отчет",
+    description="Отдает готовый файл. Адрес определяется содержимым отчета, поэтому файл кэшируется "
+                "браузером без повторной проверки."
+)
+def download_export(
+        report_hash: str,
+        export_format: str,
+        request: Request,
+        redis_conn: Redis = Depends(get_redis_connection)
+):
+    media_type = report_export.EXPORT_MEDIA_TYPES.get(export_format)
+    if media_type is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Неизвестный формат {export_format}.")
+
+    etag = f'"{report_hash}-{export_format}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=86400, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = export_store.load_file(redis_conn, report_hash, export_format)
+    if content is not None:
+        headers["Content-Disposition"] = f'attachment; filename="report-{report_hash[:8]}.{export_format}"'
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    job_id = export_store.export_job_id(report_hash, export_format)
+    job_status = result_store.get_job_status(redis_conn, job_id)
+    if job_status in ACTIVE_JOB_STATUSES:
+        return Response(
+            content=JobStatusResponse(job_id=job_id, status=job_status).model_dump_json(),
+            status_code=status.HTTP_202_ACCEPTED,
+            media_type="application/json",
+            headers={"Retry-After": "1", "Cache-Control": "no-store"}
+        )
+    if job_status == "failed":
+        logger.error(f"Экспорт {report_hash}.{export_format} завершился ошибкой.")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Не удалось сформировать файл отчета. Повторите экспорт."
+        )
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Экспорт не найден или устарел.")
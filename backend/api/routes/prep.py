@@ -1,14 +1,55 @@
-from fastapi import APIRouter, UploadFile, File, Form, status, HTTPException, Depends
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, status, HTTPException, Depends, Response
+from typing import TYPE_CHECKING, List, Optional
 from loguru import logger
-import io
-from backend.api.models import PreparationAnalysis, ErrorResponse
-from backend.services.analysis_service import AnalysisService
-from backend.api.deps import get_analysis_service
+import asyncio
+from contextlib import nullcontext
+import json
+import math
+import uuid
+from redis import Redis
+from sse_starlette.sse import EventSourceResponse
+from backend.api.models import PreparationAnalysis, ErrorResponse, BatchStatusResponse, BatchCandidateStatus
+from backend.api.deps import get_analysis_service, get_job_scheduler, get_redis_connection, get_submitter
+from backend.core.config import settings
+from backend.db import report_store
+from backend.queue import batch_store, profile_store, result_store
+from backend.queue.scheduling import JobScheduler
+from backend.queue.trigger import notify_worker
+from backend.services.resilience import CircuitOpenError
+from backend.utils import profiling
 from backend.utils.validators import FileValidator
 
+if TYPE_CHECKING:
+    from backend.services.analysis_service import AnalysisService
+
 router = APIRouter()
 
+PROFILE_ID_HEADER = "X-Profile-Id"
+_IN_PROCESS_PROFILE_NOTE = (
+    " Флаг profile действует, только если на сервере включен API_REQUEST_PROFILING_ENABLED: запрос "
+    "профилируется в процессе API, идентификатор профиля приходит в заголовке "
+    f"{PROFILE_ID_HEADER} (GET /api/profiles/{{id}}). Профиль CPU охватывает весь цикл событий API "
+    "и замедляет параллельные запросы; одновременно профилируется только один запрос на процесс."
+)
+
+
+def _profile_id(requested: bool) -> Optional[str]:
+    """
+    Идентификатор профиля запроса, если запрос профилируется (по флагу или в выборку).
+    Без api_request_profiling_enabled клиент не может включить профилирование процесса API.
+    """
+    if not settings.api_request_profiling_enabled:
+        if requested:
+            logger.warning("Флаг profile проигнорирован: профилирование запросов в API отключено настройкой.")
+        return None
+    return f"prep-{uuid.uuid4()}" if profiling.should_profile(requested) else None
+
+
+def _profiled(redis_conn: Redis, profile_id: Optional[str]):
+    if profile_id is None:
+        return nullcontext()
+    return profile_store.profiled(redis_conn, profile_id, f"request {profile_id}")
+
 
 @router.post(
     "/",
@@ -16,34 +57,58 @@ router = APIRouter()
     responses={
         400: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+        504: {"model": ErrorResponse},
     },
     summary="Анализ данных кандидата для подготовки к интервью",
     description="Принимает резюме, фидбэк и ссылку на требования для генерации плана интервью."
+                + _IN_PROCESS_PROFILE_NOTE
 )
 async def analyze_preparation_endpoint(
+        response: Response,
         cv_file: UploadFile = File(..., description="Резюме кандидата (.txt, .pdf, .docx)."),
         feedback_text: str = Form(..., description="Фидбэк от рекрутера в виде текста."),
         requirements_link: str = Form(..., description="Ссылка на Google Таблицу с требованиями."),
-        analysis_service: AnalysisService = Depends(get_analysis_service)
+        profile: bool = Form(False, description="Снять профиль CPU и памяти запроса (заголовок X-Profile-Id), если это разрешено на сервере."),
+        analysis_service: "AnalysisService" = Depends(get_analysis_service),
+        redis_conn: Redis = Depends(get_redis_connection)
 ):
-    FileValidator.validate_cv_file_prep(cv_file)
+    cv_upload = await FileValidator.read_validated_upload(cv_file, 'cv_prep')
+    profile_id = _profile_id(profile)
+    if profile_id:
+        response.headers[PROFILE_ID_HEADER] = profile_id
 
     try:
         logger.info("Получен новый запрос на оценку кандидата.")
 
-        cv_content_bytes = await cv_file.read()
-        cv_file_like_object = io.BytesIO(cv_content_bytes)
+        with _profiled(redis_conn, profile_id):
+            analysis_result = await analysis_service.analyze_preparation(
+                cv_file=cv_upload.file,
+                cv_filename=cv_upload.filename,
+                feedback_text=feedback_text,
+                requirements_link=requirements_link
+            )
 
-        analysis_result = await analysis_service.analyze_preparation(
-            cv_file=cv_file_like_object,
-            cv_filename=cv_file.filename,
-            feedback_text=feedback_text,
-            requirements_link=requirements_link
+        await asyncio.to_thread(
+            report_store.save_report_safely, str(uuid.uuid4()), report_store.PREPARATION,
+            analysis_result.model_dump(), requirements_link
         )
-
         logger.info("Анализ успешно завершен. Возвращается результат.")
         return analysis_result
 
+    except TimeoutError as te:
+        logger.error(f"Анализ не уложился в срок: {te}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Модель не ответила вовремя: {te}"
+        )
+    except CircuitOpenError as ce:
+        logger.error(f"Вызовы модели временно приостановлены: {ce}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Модель временно недоступна из-за большого числа ошибок. Повторите запрос позже.",
+            headers={"Retry-After": str(max(1, math.ceil(ce.retry_after)))}
+        )
     except ValueError as ve:
         logger.error(f"Ошибка значения в процессе анализа: {ve}")
         raise HTTPException(
@@ -62,3 +127,175 @@ async def analyze_preparation_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Произошла внутренняя ошибка сервера: {str(e)}"
         )
+    finally:
+        cv_upload.file.close()
+
+
+@router.post(
+    "/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Поток событий: stage, section, report, timeout, error."},
+        400: {"model": ErrorResponse},
+    },
+    summary="Потоковая подготовка к интервью (SSE)",
+    description="То же, что и POST /api/prep/, но отчет отправляется по частям через Server-Sent Events: "
+                "каждая строка таблицы соответствия, профиль и темы интервью приходят, как только "
+                "агент их сгенерировал. Последнее событие report содержит полный отчет."
+                + _IN_PROCESS_PROFILE_NOTE
+)
+async def stream_preparation_endpoint(
+        cv_file: UploadFile = File(..., description="Резюме кандидата (.txt, .pdf, .docx)."),
+        feedback_text: str = Form(..., description="Фидбэк от рекрутера в виде текста."),
+        requirements_link: str = Form(..., description="Ссылка на Google Таблицу с требованиями."),
+        profile: bool = Form(False, description="Снять профиль CPU и памяти запроса (заголовок X-Profile-Id), если это разрешено на сервере."),
+        analysis_service: "AnalysisService" = Depends(get_analysis_service),
+        redis_conn: Redis = Depends(get_redis_connection)
+):
+    cv_upload = await FileValidator.read_validated_upload(cv_file, 'cv_prep')
+    logger.info("Получен новый запрос на потоковую оценку кандидата.")
+    profile_id = _profile_id(profile)
+
+    async def events():
+        try:
+            with _profiled(redis_conn, profile_id):
+                async for event, data in analysis_service.stream_preparation(
+                        cv_file=cv_upload.file,
+                        cv_filename=cv_upload.filename,
+                        feedback_text=feedback_text,
+                        requirements_link=requirements_link
+                ):
+                    payload = data.model_dump() if hasattr(data, "model_dump") else data
+                    if event == "report":
+                        await asyncio.to_thread(
+                            report_store.save_report_safely, str(uuid.uuid4()), report_store.PREPARATION,
+                            payload, requirements_link
+                        )
+                    yield {"event": event, "data": json.dumps(payload, ensure_ascii=False)}
+                logger.info("Потоковый анализ успешно завершен.")
+        except TimeoutError as te:
+            # До общего обработчика: срок агента (AgentDeadlineExceeded) - тоже TimeoutError, то есть OSError.
+            logger.error(f"Потоковый анализ не уложился в срок: {te}")
+            yield {
+                "event": "timeout",
+                "data": json.dumps({"detail": f"Модель не ответила вовремя: {te}"}, ensure_ascii=False)
+            }
+        except (ValueError, IOError, CircuitOpenError) as e:
+            logger.error(f"Ошибка в процессе потокового анализа: {e}")
+            yield {"event": "error", "data": json.dumps({"detail": str(e)}, ensure_ascii=False)}
+        except Exception as e:
+            logger.error(f"Произошла непредвиденная ошибка во время потокового анализа: {e}", exc_info=True)
+            yield {
+                "event": "error",
+                "data": json.dumps({"detail": f"Произошла внутренняя ошибка сервера: {str(e)}"}, ensure_ascii=False)
+            }
+        finally:
+            cv_upload.file.close()
+
+    return EventSourceResponse(events(), headers={PROFILE_ID_HEADER: profile_id} if profile_id else None)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    summary="Пакетная подготовка к интервью для нескольких кандидатов одной вакансии",
+    description="Принимает несколько резюме и фидбэков для одной ссылки на требования. "
+                "Требования скачиваются и разбираются один раз, кандидаты обрабатываются в очереди."
+)
+async def create_preparation_batch(
+        cv_files: List[UploadFile] = File(..., description="Резюме кандидатов (.txt, .pdf, .docx)."),
+        feedback_texts: Optional[List[str]] = Form(None, description="Фидбэк рекрутера, по одному на каждое резюме."),
+        requirements_link: str = Form(..., description="Ссылка на Google Таблицу с требованиями."),
+        profile: bool = Form(False, description="Снять профиль CPU и памяти задачи (GET /api/profiles/{batch_id})."),
+        scheduler: JobScheduler = Depends(get_job_scheduler),
+        submitter: str = Depends(get_submitter),
+        redis_conn: Redis = Depends(get_redis_connection)
+):
+    if len(cv_files) > settings.prep_batch_max_candidates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Слишком много кандидатов в пакете. Максимум: {settings.prep_batch_max_candidates}."
+        )
+    if feedback_texts and len(feedback_texts) != len(cv_files):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Количество фидбэков должно совпадать с количеством резюме."
+        )
+
+    candidates = []
+    for index, cv_file in enumerate(cv_files):
+        cv_upload = await FileValidator.read_validated_upload(cv_file, 'cv_prep')
+        with cv_upload.file:
+            cv_bytes = cv_upload.read_bytes()
+        candidates.append({
+            "cv_bytes": cv_bytes,
+            "cv_filename": cv_upload.filename,
+            "feedback_text": feedback_texts[index] if feedback_texts else "",
+        })
+
+    batch_id = str(uuid.uuid4())
+    logger.info(f"Постановка пакета {batch_id} из {len(candidates)} кандидатов в очередь...")
+    try:
+        batch_store.init_batch(redis_conn, batch_id, [candidate["cv_filename"] for candidate in candidates])
+        job = scheduler.enqueue(
+            "backend.queue.tasks.run_preparation_batch",
+            kind="bulk",
+            submitter=submitter,
+            batch_id=batch_id,
+            candidates=candidates,
+            requirements_link=requirements_link,
+            job_id=batch_id,
+            job_timeout="2h",
+            meta={profiling.PROFILE_META_KEY: profiling.should_profile(profile)}
+        )
+    except Exception as e:
+        logger.error(f"Не удалось поставить пакет в очередь: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Не удалось поставить пакет в очередь из-за внутренней ошибки."
+        )
+
+    await notify_worker()
+
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status=job.get_status(),
+        candidates=[
+            BatchCandidateStatus(index=index, filename=candidate["cv_filename"], status="queued")
+            for index, candidate in enumerate(candidates)
+        ]
+    )
+
+
+@router.get(
+    "/batch/{batch_id}",
+    response_model=BatchStatusResponse,
+    responses={
+        404: {"model": ErrorResponse},
+    },
+    summary="Проверить статус пакетной подготовки",
+    description="Возвращает статус пакета и каждого кандидата, а также готовые отчеты."
+)
+def get_preparation_batch(batch_id: str, redis_conn: Redis = Depends(get_redis_connection)):
+    candidates = batch_store.get_batch(redis_conn, batch_id)
+    if candidates is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Пакет с ID {batch_id} не найден.")
+
+    for candidate in candidates:
+        if candidate["status"] == "finished":
+            blob = result_store.load_result_blob(
+                redis_conn, batch_store.candidate_result_id(batch_id, candidate["index"])
+            )
+            if blob is not None:
+                candidate["result"] = result_store.decode_result(blob)
+
+    batch_status = result_store.get_job_status(redis_conn, batch_id) or "unknown"
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status=batch_status,
+        candidates=[BatchCandidateStatus(**candidate) for candidate in candidates]
+    )
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from redis import Redis
+
+from backend.api.deps import get_redis_connection
+from backend.api.models import ErrorResponse, JobProfileResponse
+from backend.queue import profile_store
+
+router = APIRouter()
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobProfileResponse,
+    responses={
+        404: {"model": ErrorResponse},
+    },
+    summary="Профиль задачи",
+    description="Возвращает ссылки на профиль CPU и снимок памяти задачи, запущенной с флагом profile "
+                "или попавшей в выборку профилирования. Профиль появляется после завершения задачи."
+)
+def get_job_profile(job_id: str, request: Request, redis_conn: Redis = Depends(get_redis_connection)):
+    artifacts = profile_store.available_artifacts(redis_conn, job_id)
+    if not artifacts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Профиль задачи {job_id} не найден.")
+    return JobProfileResponse(
+        job_id=job_id,
+        artifacts={
+            artifact: str(request.url_for("download_job_profile", job_id=job_id, artifact=artifact).path)
+            for artifact in artifacts
+        }
+    )
+
+
+@router.get(
+    "/{job_id}/{artifact}",
+    name="download_job_profile",
+    response_class=Response,
+    responses={
+        200: {"content": {media_type: {} for media_type, _ in profile_store.PROFILE_ARTIFACTS.values()}},
+        404: {"model": ErrorResponse},
+    },
+    summary="Скачать профиль задачи",
+    description="cpu - статистика cProfile (pstats.Stats, snakeviz), allocations - tracemalloc.Snapshot.load, "
+                "summary - текстовая сводка."
+)
+def download_job_profile(job_id: str, artifact: str, redis_conn: Redis = Depends(get_redis_connection)):
+    if artifact not in profile_store.PROFILE_ARTIFACTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Неизвестный артефакт {artifact}.")
+
+    content = profile_store.load_artifact(redis_conn, job_id, artifact)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Профиль задачи {job_id} не найден.")
+
+    media_type, extension = profile_store.PROFILE_ARTIFACTS[artifact]
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{job_id}-{artifact}.{extension}"'}
+    )
@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from loguru import logger
+
+from backend.api.models import (
+    ErrorResponse, RankedCandidate, RankingResponse, ReportListResponse, StoredReportResponse, StoredReportSummary
+)
+from backend.db import report_store
+from backend.db.database import history_available
+
+
+def require_history() -> None:
+    if not history_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="История отчетов отключена: не настроена общая база данных (DATABASE_URL)."
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_history)])
+
+
+@router.get(
+    "/",
+    response_model=ReportListResponse,
+    summary="Поиск по сохраненным отчетам",
+    description="Возвращает сохраненные отчеты, от новых к старым, с фильтрами по индексированным полям. "
+                "Постраничная выдача: next_cursor из ответа передается в параметр cursor."
+)
+def list_reports(
+        candidate: Optional[str] = Query(None, description="Начало имени кандидата, без учета регистра."),
+        requirements_link: Optional[str] = Query(None, description="Ссылка на требования к вакансии."),
+        recommendation: Optional[str] = Query(None, description="Рекомендация из заключения."),
+        assessed_level: Optional[str] = Query(None, description="Оцененный уровень (для отчетов по результатам)."),
+        kind: Optional[Literal["preparation", "results"]] = Query(None, description="Тип отчета."),
+        created_from: Optional[datetime] = Query(None, description="Не раньше этой даты."),
+        created_to: Optional[datetime] = Query(None, description="Раньше этой даты."),
+        cursor: Optional[int] = Query(None, description="Курсор следующей страницы."),
+        limit: int = Query(20, ge=1, le=100)
+):
+    rows, next_cursor = report_store.list_reports(
+        candidate=candidate,
+        requirements_link=requirements_link,
+        recommendation=recommendation,
+        assessed_level=assessed_level,
+        kind=kind,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit
+    )
+    logger.info(f"Поиск по отчетам: найдено {len(rows)} на странице.")
+    return ReportListResponse(
+        items=[StoredReportSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+@router.get(
+    "/ranking",
+    response_model=RankingResponse,
+    summary="Рейтинг кандидатов вакансии",
+    description="Ранжирует сохраненные отчеты одной вакансии и одного типа по векторам признаков, посчитанным "
+                "при сохранении: соответствие требованиям (full/partial/none) для подготовки; оцененный уровень, "
+                "рекомендация и доля строк матрицы компетенций, затронутых на интервью, для результатов. "
+                "Отчеты разных типов не сравниваются между собой. Модель не вызывается."
+)
+def rank_candidates(
+        requirements_link: str = Query(..., description="Ссылка на требования к вакансии."),
+        kind: Literal["preparation", "results"] = Query(
+            ..., description="Тип отчетов: у подготовки и результатов разные признаки, их оценки несравнимы."
+        ),
+        min_level: Optional[float] = Query(None, description="Минимальный уровень: 0 Intern ... 4 Lead."),
+        min_match_ratio: Optional[float] = Query(None, ge=0, le=1, description="Минимальная доля соответствия."),
+        min_recommendation: Optional[float] = Query(
+            None, ge=0, le=1, description="1 — рекомендован, 0.5 — с оговорками, 0 — не рекомендован."
+        ),
+        limit: int = Query(50, ge=1, le=500)
+):
+    # Imported on first use, like in report_store: numpy stays out of the API cold start.
+    from backend.services import ranking
+
+    rows = report_store.vacancy_features(requirements_link, kind)
+    features = ranking.decode_features([row[3] for row in rows])
+    ranked = ranking.rank(
+        features, min_level=min_level, min_match_ratio=min_match_ratio,
+        min_recommendation=min_recommendation, limit=limit
+    )
+    logger.info(f"Рейтинг вакансии: {len(rows)} отчетов, после фильтров {len(ranked)} в выдаче.")
+    return RankingResponse(
+        requirements_link=requirements_link,
+        total=len(rows),
+        items=[
+            RankedCandidate(
+                report_id=rows[row][0],
+                kind=rows[row][1],
+                candidate_name=rows[row][2],
+                score=round(row_score, 4),
+                features=ranking.features_as_dict(features[row])
+            )
+            for row, row_score in ranked
+        ]
+    )
+
+
+@router.get(
+    "/{report_id}",
+    response_model=StoredReportResponse,
+    responses={404: {"model": ErrorResponse}},
+    summary="Получить сохраненный отчет",
+)
+def get_report(report_id: str):
+    row = report_store.get_report(report_id)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Отчет с ID {report_id} не найден.")
+    summary = StoredReportSummary.model_validate(row)
+    return StoredReportResponse(**summary.model_dump(), report=json.loads(row.payload))
@@ -1,17 +1,21 @@
-import os
-import httpx
 from typing import Optional
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, status
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Depends, Request, Response, status
 from loguru import logger
-from rq import Queue
+from redis import Redis
 
-from backend.api.deps import get_results_queue
+from backend.api.deps import get_job_scheduler, get_redis_connection, get_submitter
 from backend.api.models import ErrorResponse, JobStatusResponse
+from backend.queue import cancellation, idempotency, result_store
+from backend.queue.scheduling import JobScheduler, release_submitter_slot
+from backend.queue.trigger import notify_worker
+from backend.utils import profiling
 from backend.utils.validators import FileValidator
 
 router = APIRouter()
 
+RESULTS_TASK = "backend.queue.tasks.run_analysis_pipeline"
+
 
 @router.post(
     "/",
@@ -19,33 +23,71 @@ router = APIRouter()
     status_code=status.HTTP_202_ACCEPTED,
     responses={
         400: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
     },
     summary="Запустить анализ результатов интервью",
-    description="Принимает данные для анализа, ставит задачу в очередь и немедленно возвращает ее ID."
+    description="Принимает данные для анализа, ставит задачу в очередь и немедленно возвращает ее ID. "
+                "Повторная отправка тех же данных (или того же заголовка Idempotency-Key) возвращает "
+                "ID уже существующей задачи, пока она в очереди, выполняется или недавно завершена."
 )
 async def create_analysis_task(
+        response: Response,
         cv_file: Optional[UploadFile] = File(None, description="Резюме кандидата (.pdf, .docx, .txt)."),
         video_link: str = Form(..., description="Ссылка на видеозапись собеседования."),
         competency_matrix_link: str = Form(..., description="Ссылка на матрицу компетенций QA/AQA."),
         department_values_link: str = Form(..., description="Ссылка на ценности департамента."),
         employee_portrait_link: str = Form(..., description="Ссылка на портрет сотрудника."),
         job_requirements_link: str = Form(..., description="Ссылка на требования к вакансии."),
-        queue: Queue = Depends(get_results_queue)
+        profile: bool = Form(False, description="Снять профиль CPU и памяти задачи (GET /api/profiles/{job_id})."),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+        scheduler: JobScheduler = Depends(get_job_scheduler),
+        submitter: str = Depends(get_submitter),
+        redis_conn: Redis = Depends(get_redis_connection)
 ):
     """
     Эндпоинт для постановки задачи анализа результатов интервью в очередь.
+    Дубликаты (двойной клик, повтор запроса фронтендом) не создают новую задачу.
     """
-    if cv_file:
-        FileValidator.validate_cv_file_results(cv_file)
+    cv_bytes: Optional[bytes] = None
+    cv_filename: Optional[str] = None
+    if cv_file and cv_file.file:
+        cv_upload = await FileValidator.read_validated_upload(cv_file, 'cv_results')
+        with cv_upload.file:
+            cv_bytes = cv_upload.read_bytes()
+        cv_filename = cv_upload.filename
+
+    fingerprint = idempotency.submission_fingerprint(
+        {
+            "video_link": video_link,
+            "competency_matrix_link": competency_matrix_link,
+            "department_values_link": department_values_link,
+            "employee_portrait_link": employee_portrait_link,
+            "job_requirements_link": job_requirements_link,
+        },
+        cv_bytes
+    )
+    claim_key = idempotency.idempotency_key("results", fingerprint, idempotency_key, submitter)
+    try:
+        job_id, is_new = idempotency.claim_submission(redis_conn, claim_key, fingerprint)
+    except idempotency.IdempotencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Ключ Idempotency-Key уже использован для запроса с другими данными."
+        )
 
-    cv_bytes: Optional[bytes] = await cv_file.read() if cv_file and cv_file.file else None
-    cv_filename: Optional[str] = cv_file.filename if cv_file else None
+    if not is_new:
+        job_status = result_store.get_job_status(redis_conn, job_id) or "queued"
+        logger.info(f"Повторная отправка: возвращаем существующую задачу {job_id} (статус {job_status}).")
+        response.headers["Idempotent-Replayed"] = "true"
+        return JobStatusResponse(job_id=job_id, status=job_status)
 
     logger.info("Постановка задачи на анализ в очередь...")
     try:
-        job = queue.enqueue(
-            "backend.queue.tasks.run_analysis_pipeline",
+        job = scheduler.enqueue(
+            RESULTS_TASK,
+            kind="results",
+            submitter=submitter,
             cv_bytes=cv_bytes,
             cv_filename=cv_filename,
             video_link=video_link,
@@ -53,27 +95,18 @@ async def create_analysis_task(
             department_values_link=department_values_link,
             employee_portrait_link=employee_portrait_link,
             job_requirements_link=job_requirements_link,
-            job_timeout="2h"
+            job_id=job_id,
+            job_timeout="2h",
+            meta={profiling.PROFILE_META_KEY: profiling.should_profile(profile)}
         )
-        logger.info(f"Задача {job.id} добавлена в очередь.")
-
-        try:
-            worker_url = os.getenv("WORKER_URL")
-            if worker_url:
-                logger.info(f"Отправка 'пинка' воркеру по адресу: {worker_url}")
+        logger.info(f"Задача {job.id} добавлена в очередь {job.origin}.")
 
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(f"{worker_url}/process", timeout=10.0)
-                    logger.info(f"'Пинок' воркеру отправлен. Статус ответа воркера: {response.status_code}")
-            else:
-                logger.warning("Переменная окружения WORKER_URL не установлена. 'Пинок' не отправлен.")
-
-        except Exception as e:
-            logger.error(f"Не удалось отправить 'пинок' воркеру: {e}", exc_info=True)
+        await notify_worker()
 
         return JobStatusResponse(job_id=job.id, status=job.get_status())
 
     except Exception as e:
+        idempotency.release_claim(redis_conn, claim_key, job_id)
         logger.error(f"Не удалось поставить задачу в очередь: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,38 +118,119 @@ async def create_analysis_task(
     "/status/{job_id}",
     response_model=JobStatusResponse,
     responses={
+        304: {"description": "Результат не изменился с момента последнего запроса."},
         404: {"model": ErrorResponse},
     },
     summary="Проверить статус задачи анализа",
     description="Возвращает текущий статус задачи и результат, если она успешно завершена."
 )
-def get_analysis_status(job_id: str, queue: Queue = Depends(get_results_queue)):
+def get_analysis_status(
+        job_id: str,
+        request: Request,
+        response: Response,
+        redis_conn: Redis = Depends(get_redis_connection)
+):
     """
     Проверяет статус задачи по ее ID.
+    Читает только статус задачи и сжатый отчет, не загружая саму задачу RQ.
     """
     logger.info(f"Проверка статуса для задачи {job_id}")
-    job = queue.fetch_job(job_id)
+    job_status = result_store.get_job_status(redis_conn, job_id)
 
-    if job is None:
+    if job_status is None and redis_conn.exists(result_store.result_key(job_id)):
+        # Хэш задачи RQ уже удален, но отчет хранится results_retention_seconds.
+        job_status = "finished"
+
+    if job_status is None:
         logger.warning(f"Попытка проверить статус для несуществующей задачи с ID {job_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Задача с ID {job_id} не найдена.")
 
-    job_status = job.get_status()
     logger.info(f"Проверка статуса для задачи {job_id}. Текущий статус: {job_status}")
 
-    response_data = {"job_id": job.id, "status": job_status}
+    response_data = {"job_id": job_id, "status": job_status}
 
     if job_status == 'finished':
-        logger.success(f"Задача {job_id} успешно завершена. Отправляем результат клиенту.")
-        result = job.result
-        if hasattr(result, 'model_dump'):
-            response_data["result"] = result.model_dump()
+        blob = result_store.load_result_blob(redis_conn, job_id)
+        if blob is not None:
+            etag = result_store.result_etag(blob)
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            logger.success(f"Задача {job_id} успешно завершена. Отправляем результат клиенту.")
+            response.headers.update(headers)
+            response_data["result"] = result_store.decode_result(blob)
         else:
-            response_data["result"] = result
+            # Задачи, поставленные до появления отдельного хранилища отчетов.
+            logger.success(f"Задача {job_id} успешно завершена. Отправляем результат клиенту.")
+            job = result_store.fetch_job(redis_conn, job_id)
+            result = job.result if job else None
+            if hasattr(result, 'model_dump'):
+                response_data["result"] = result.model_dump()
+            elif isinstance(result, dict):
+                response_data["result"] = result
+
+    elif job_status == 'failed' and cancellation.is_cancel_requested(redis_conn, job_id):
+        logger.info(f"Задача {job_id} была отменена пользователем.")
+        response_data.update(status="canceled", error="Задача отменена пользователем.")
 
     elif job_status == 'failed':
         logger.error(f"Задача {job_id} провалена. Отправляем ошибку клиенту.")
-        error_message = job.exc_info.strip().split('\n')[-1] if job.exc_info else "Неизвестная ошибка в воркере."
+        job = result_store.fetch_job(redis_conn, job_id)
+        exc_info = job.exc_info if job else None
+        error_message = exc_info.strip().split('\n')[-1] if exc_info else "Неизвестная ошибка в воркере."
         response_data["error"] = error_message
 
     return JobStatusResponse(**response_data)
+
+
+@router.delete(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    responses={
+        202: {"model": JobStatusResponse, "description": "Задача выполняется и будет остановлена на ближайшем шаге."},
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+    },
+    summary="Отменить задачу анализа",
+    description="Задача в очереди отменяется сразу. Выполняющаяся задача останавливается на ближайшем этапе "
+                "пайплайна: загрузки и запросы к модели прерываются, транскрипция AssemblyAI удаляется, "
+                "временные файлы освобождаются. Статус задачи после остановки — canceled."
+)
+def cancel_analysis_task(
+        job_id: str,
+        response: Response,
+        redis_conn: Redis = Depends(get_redis_connection)
+):
+    job_status = result_store.get_job_status(redis_conn, job_id)
+    if job_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Задача с ID {job_id} не найдена.")
+
+    if job_status == "canceled" or (job_status == "failed" and cancellation.is_cancel_requested(redis_conn, job_id)):
+        return JobStatusResponse(job_id=job_id, status="canceled")
+
+    if job_status in ("queued", "deferred", "scheduled"):
+        job = result_store.fetch_job(redis_conn, job_id)
+        job.cancel()
+        release_submitter_slot(job, redis_conn)
+        # If a worker took the job in the meantime, it stops at the first check.
+        cancellation.request_cancel(redis_conn, job_id)
+        logger.info(f"Задача {job_id} отменена до начала выполнения.")
+        return JobStatusResponse(job_id=job_id, status="canceled")
+
+    if job_status == "started":
+        job = result_store.fetch_job(redis_conn, job_id)
+        if job is None or job.func_name != RESULTS_TASK:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Задачу {job_id} нельзя остановить во время выполнения."
+            )
+        cancellation.request_cancel(redis_conn, job_id)
+        logger.info(f"Запрошена отмена выполняющейся задачи {job_id}.")
+        response.status_code = status.HTTP_202_ACCEPTED
+        return JobStatusResponse(job_id=job_id, status=job_status)
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Задача {job_id} уже завершена (статус {job_status}), отменять нечего."
+    )
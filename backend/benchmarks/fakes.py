@@ -0,0 +1,179 @@
+"""
+Offline stand-ins for the external services used by AnalysisService.
+
+Each fake sleeps for a configurable latency and returns payloads of a configurable
+size, so the benchmark measures the pipeline's own overhead and its behaviour under
+concurrency without any network access.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+
+import httplib2
+from google.adk.agents.run_config import StreamingMode
+from google.genai import types
+
+# Size of the partial events the fake Runner emits in SSE streaming mode.
+STREAM_CHUNK_CHARS = 64
+
+
+@dataclass
+class FakeBackendConfig:
+    drive_latency: float = 0.05
+    sheet_kb: int = 20
+    audio_mb: float = 5.0
+    transcription_latency: float = 0.5
+    transcript_kb: int = 60
+    llm_latency: float = 0.3
+    llm_output_kb: int = 4
+
+
+def _filler(size_bytes: int, word: str = "lorem ") -> str:
+    return (word * (size_bytes // len(word) + 1))[:size_bytes]
+
+
+class _FakeDriveHttp:
+    """Serves byte ranges like the Drive media endpoint, which MediaIoBaseDownload requests."""
+
+    def __init__(self, content: bytes, latency: float):
+        self.content = content
+        self.latency = latency
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        time.sleep(self.latency)
+        total = len(self.content)
+        range_header = (headers or {}).get("range")
+        if not range_header:
+            return httplib2.Response({"status": "200", "content-length": str(total)}), self.content
+
+        start, end = (int(value) for value in range_header.split("=")[1].split("-"))
+        end = min(end, total - 1)
+        chunk = self.content[start:end + 1]
+        response = httplib2.Response({"status": "206", "content-range": f"bytes {start}-{end}/{total}"})
+        return response, chunk
+
+
+class _FakeMediaRequest:
+    def __init__(self, uri: str, content: bytes, latency: float):
+        self.uri = uri
+        self.headers = {}
+        self.http = _FakeDriveHttp(content, latency)
+
+
+class FakeDriveService:
+    """Minimal ``drive.files()`` surface used by ``file_processing``: export_media and get_media."""
+
+    def __init__(self, config: FakeBackendConfig):
+        self.config = config
+        self.sheet = _filler(config.sheet_kb * 1024, "Категория,Требование,Уровень\n").encode("utf-8")
+        self.audio = b"\0" * int(config.audio_mb * 1024 * 1024)
+
+    def files(self):
+        return self
+
+    def export_media(self, fileId: str, mimeType: str):
+        return _FakeMediaRequest(f"fake://drive/{fileId}/export", self.sheet, self.config.drive_latency)
+
+    def get_media(self, fileId: str):
+        return _FakeMediaRequest(f"fake://drive/{fileId}/media", self.audio, self.config.drive_latency)
+
+
+def make_fake_transcriber(config: FakeBackendConfig):
+    """Replacement for ``file_processing.transcribe_audio_assemblyai``; blocks a thread like the real poller."""
+    transcript = _filler(config.transcript_kb * 1024, "интервьюер спрашивает кандидат отвечает ")
+
+    async def transcribe(audio_path: str) -> str:
+        await asyncio.to_thread(time.sleep, config.transcription_latency)
+        return transcript
+
+    return transcribe
+
+
+def _agent_outputs(config: FakeBackendConfig) -> dict:
+    text = _filler(config.llm_output_kb * 1024)
+    candidate_info = {
+        "full_name": "Иван Иванов",
+        "experience_years": "5",
+        "tech_stack": ["Python", "Selenium"],
+        "projects": ["CRM"],
+        "domains": ["FinTech"],
+        "tasks": ["Автоматизация тестирования"],
+    }
+    report = {
+        "ai_summary": text,
+        "candidate_info": candidate_info,
+        "interview_analysis": {"topics": [], "tech_assignment": "Нет", "knowledge_assessment": text},
+        "communication_skills": {"assessment": "Хорошо"},
+        "foreign_languages": {"assessment": "B2"},
+        "team_fit": "Подходит",
+        "additional_information": [],
+        "conclusion": {"recommendation": "Рекомендуем", "assessed_level": "Middle", "summary": "Кандидат подходит."},
+        "recommendations_for_candidate": ["Изучить k6"],
+    }
+    preparation = {
+        "report": {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "matching_table": [{"criterion": "Python", "match": "Да", "comment": "Опыт 5 лет"}],
+            "candidate_profile": text,
+            "conclusion": {
+                "summary": "Кандидат подходит.",
+                "recommendations": "Пригласить",
+                "interview_topics": ["Python"],
+                "values_assessment": "Соответствует",
+            },
+        }
+    }
+    requirements = {"hard_skills_required": ["Python"], "soft_skills_required": ["Коммуникация"]}
+    return {
+        "candidate_data_parser": {"candidate_info": candidate_info, "job_requirements": requirements},
+        "candidate_cv_parser": {"candidate_info": candidate_info},
+        "job_requirements_parser": {"job_requirements": requirements},
+        "matching_and_profiling_agent": {"candidate_info": candidate_info, "assessment": text},
+        "interview_plan_generator": preparation,
+        "interview_topic_extractor": {"topics": ["Python", "Тест-дизайн", "CI"]},
+        "final_report_generator": report,
+    }
+
+
+def make_fake_runner(config: FakeBackendConfig):
+    """Returns a drop-in replacement for ``google.adk.runners.Runner`` with canned, schema-valid outputs."""
+    outputs = {name: json.dumps(output, ensure_ascii=False) for name, output in _agent_outputs(config).items()}
+
+    class FakeRunner:
+        def __init__(self, agent, app_name: str, session_service=None):
+            self.agent = agent
+
+        async def run_async(
+                self,
+                session_id: str,
+                user_id: str,
+                new_message: Optional[types.Content] = None,
+                run_config=None
+        ):
+            await asyncio.sleep(config.llm_latency)
+            prompt_chars = sum(len(part.text or "") for part in new_message.parts) if new_message else 0
+            output = outputs.get(self.agent.name, "{}")
+            if run_config is not None and run_config.streaming_mode == StreamingMode.SSE:
+                for offset in range(0, len(output), STREAM_CHUNK_CHARS):
+                    yield SimpleNamespace(
+                        partial=True,
+                        usage_metadata=None,
+                        content=types.Content(
+                            role="model", parts=[types.Part(text=output[offset:offset + STREAM_CHUNK_CHARS])]
+                        ),
+                    )
+            yield SimpleNamespace(
+                partial=False,
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_chars // 4,
+                    candidates_token_count=len(output) // 4,
+                    total_token_count=(prompt_chars + len(output)) // 4,
+                ),
+                content=types.Content(role="model", parts=[types.Part(text=output)]),
+            )
+
+    return FakeRunner
@@ -0,0 +1,265 @@
+"""
+HTTP load test for one uvicorn instance of ``backend.main:app``.
+
+``run`` starts the API in a subprocess (``serve``) with stubbed agents, fake Drive and
+AssemblyAI backends and an in-memory Redis (fakeredis, or a local redis-server via
+``--redis-url``), then drives each route with a closed loop of concurrent clients and
+reports request rate, error rate and tail latency per route and concurrency level.
+
+    python -m backend.benchmarks.http_load run --concurrency 1 8 32 --duration 10
+    python -m backend.benchmarks.http_load run --routes status --redis-url redis://localhost:6379/15
+    python -m backend.benchmarks.http_load serve --port 8100
+
+The server runs in its own process so the load generator does not compete with it for the GIL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("ASSEMBLYAI_API_KEY", "benchmark")
+os.environ.setdefault("GOOGLE_APPLICATION_B64", "")
+
+import httpx
+from loguru import logger
+
+from backend.benchmarks.pipeline_benchmark import make_offline_service, percentile
+
+ROUTES = ("prep", "results", "status")
+STATUS_JOB_PREFIX = "loadtest-finished-"
+DRIVE_LINK = "https://drive.google.com/file/d/loadtest{}/view"
+
+
+@dataclass
+class RouteResult:
+    route: str
+    concurrency: int
+    requests: int
+    errors: int
+    requests_per_second: float
+    error_rate: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def serve(port: int, redis_url: Optional[str], status_jobs: int, llm_latency: float, log_level: str) -> None:
+    """Runs the API with stubbed external services; used as the load-test target."""
+    from unittest import mock
+
+    import uvicorn
+    from fakeredis import FakeRedis
+    from redis import from_url
+    from rq.job import Job
+
+    from backend.api import deps
+    from backend.benchmarks.fakes import FakeBackendConfig, make_fake_runner, make_fake_transcriber
+    from backend.main import app
+    from backend.queue import result_store
+    from backend.queue.scheduling import JobScheduler
+
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+
+    connection = from_url(redis_url) if redis_url else FakeRedis()
+    scheduler = JobScheduler(connection)
+    config = FakeBackendConfig(llm_latency=llm_latency)
+
+    for index in range(status_jobs):
+        job = Job.create("backend.queue.tasks.run_analysis_pipeline", id=f"{STATUS_JOB_PREFIX}{index}", connection=connection)
+        job.save()
+        job.set_status("finished")
+        result_store.save_result(connection, job.id, {"message": "ok", "report": {"ai_summary": "x" * 4096}})
+
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    app.dependency_overrides[deps.get_job_scheduler] = lambda: scheduler
+    # A new service per request, as in the real dependency.
+    app.dependency_overrides[deps.get_analysis_service] = lambda: make_offline_service(config)
+
+    with mock.patch("backend.services.analysis_service.Runner", make_fake_runner(config)), \
+            mock.patch("backend.utils.file_processing.transcribe_audio_assemblyai", make_fake_transcriber(config)):
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _build_request(route: str, status_jobs: int) -> Dict:
+    if route == "prep":
+        return {
+            "method": "POST",
+            "url": "/api/prep/",
+            "files": {"cv_file": ("cv.txt", "Опыт работы QA инженером. " * 200, "text/plain")},
+            "data": {"feedback_text": "Уверенный кандидат.", "requirements_link": DRIVE_LINK.format("req")},
+        }
+    if route == "results":
+        return {
+            "method": "POST",
+            "url": "/api/results/",
+            "data": {
+                # Unique links: identical submissions would be deduplicated by the idempotency check.
+                "video_link": DRIVE_LINK.format(uuid.uuid4().hex),
+                "competency_matrix_link": DRIVE_LINK.format("matrix"),
+                "department_values_link": DRIVE_LINK.format("values"),
+                "employee_portrait_link": DRIVE_LINK.format("portrait"),
+                "job_requirements_link": DRIVE_LINK.format("req"),
+            },
+        }
+    return {"method": "GET", "url": f"/api/results/status/{STATUS_JOB_PREFIX}{random.randrange(status_jobs)}"}
+
+
+async def run_route(
+        client: httpx.AsyncClient,
+        route: str,
+        concurrency: int,
+        duration: float,
+        status_jobs: int
+) -> RouteResult:
+    """Closed loop: ``concurrency`` clients send requests back to back for ``duration`` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.request(**_build_request(route, status_jobs))
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = len(latencies)
+    return RouteResult(
+        route=route,
+        concurrency=concurrency,
+        requests=total,
+        errors=errors,
+        requests_per_second=round(total / elapsed, 2) if elapsed else 0.0,
+        error_rate=round(errors / total, 4) if total else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        max_ms=round(max(latencies, default=0) * 1000, 2),
+    )
+
+
+async def run_load(
+        base_url: str,
+        routes: List[str],
+        concurrency_levels: List[int],
+        duration: float,
+        status_jobs: int
+) -> List[RouteResult]:
+    limits = httpx.Limits(max_connections=max(concurrency_levels), max_keepalive_connections=max(concurrency_levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        results = []
+        for route in routes:
+            for concurrency in concurrency_levels:
+                results.append(await run_route(client, route, concurrency, duration, status_jobs))
+        return results
+
+
+def format_report(results: List[RouteResult]) -> str:
+    lines = [f"{'route':<8} {'conc':>4} {'req':>7} {'rps':>9} {'err %':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for result in results:
+        lines.append(
+            f"{result.route:<8} {result.concurrency:>4} {result.requests:>7} {result.requests_per_second:>9.1f} "
+            f"{result.error_rate * 100:>7.2f} {result.p50_ms:>9.1f} {result.p95_ms:>9.1f} {result.p99_ms:>9.1f} "
+            f"{result.max_ms:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("API server did not start in time")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load test for the API and status endpoints.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--redis-url", help="Local Redis to use instead of the in-memory fakeredis.")
+    common.add_argument("--status-jobs", type=int, default=100, help="Finished jobs seeded for the status route.")
+    common.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per stubbed agent run.")
+    common.add_argument("--log-level", default="ERROR", help="Log level of the API server.")
+
+    serve_parser = subparsers.add_parser("serve", parents=[common], help="Run the stubbed API server.")
+    serve_parser.add_argument("--port", type=int, default=8100)
+
+    run_parser = subparsers.add_parser("run", parents=[common], help="Start the stubbed server and load it.")
+    run_parser.add_argument("--url", help="Load an already running server instead of starting one.")
+    run_parser.add_argument("--routes", nargs="+", choices=ROUTES, default=list(ROUTES))
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    run_parser.add_argument("--duration", type=float, default=10.0, help="Seconds per route and concurrency level.")
+    run_parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port, args.redis_url, args.status_jobs, args.llm_latency, args.log_level)
+        return 0
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        command = [
+            sys.executable, "-m", "backend.benchmarks.http_load", "serve", "--port", str(port),
+            "--status-jobs", str(args.status_jobs), "--llm-latency", str(args.llm_latency),
+            "--log-level", args.log_level,
+        ]
+        if args.redis_url:
+            command += ["--redis-url", args.redis_url]
+        process = subprocess.Popen(command)
+
+    try:
+        if process is not None:
+            _wait_until_ready(base_url, process)
+        results = asyncio.run(run_load(base_url, args.routes, args.concurrency, args.duration, args.status_jobs))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Offline end-to-end throughput benchmark for AnalysisService.
+
+Drives ``analyze_preparation`` and ``analyze_results`` against the fake Drive,
+AssemblyAI and ADK Runner backends from ``fakes.py`` at several concurrency levels
+and reports throughput, latency percentiles, peak RSS and a per-stage breakdown
+of time and peak RSS (process-wide, so it grows with the concurrency level).
+
+    python -m backend.benchmarks.pipeline_benchmark --pipeline results --concurrency 1 4 16
+    python -m backend.benchmarks.pipeline_benchmark --output bench.json
+    python -m backend.benchmarks.pipeline_benchmark --baseline bench.json --tolerance 0.25
+
+With ``--baseline`` the process exits with code 1 when throughput drops or p95 latency
+grows by more than the tolerance, which makes it usable as a CI regression gate.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+from unittest import mock
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("ASSEMBLYAI_API_KEY", "benchmark")
+os.environ.setdefault("GOOGLE_APPLICATION_B64", "")
+
+from loguru import logger
+
+from backend.benchmarks.fakes import FakeBackendConfig, FakeDriveService, make_fake_runner, make_fake_transcriber
+from backend.services.analysis_service import AnalysisService
+from backend.utils.metrics import collect_stages, current_rss_bytes, peak_rss_bytes
+
+PIPELINES = ("preparation", "results")
+DRIVE_LINK = "https://drive.google.com/file/d/benchmark{}/view"
+
+
+@dataclass
+class LevelResult:
+    pipeline: str
+    concurrency: int
+    requests: int
+    errors: int
+    wall_seconds: float
+    throughput_per_second: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    peak_rss_mb: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+    stage_peak_rss_mb: Dict[str, float] = field(default_factory=dict)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; ``q`` is in the range 0..100."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def make_offline_service(config: FakeBackendConfig, max_concurrency: int = 1) -> AnalysisService:
+    """Builds an AnalysisService that talks to the fake Drive service."""
+    # The real Drive client cannot be built without credentials; that error is expected here.
+    logger.disable("backend.services.analysis_service")
+    try:
+        service = AnalysisService(max_concurrency=max_concurrency)
+    finally:
+        logger.enable("backend.services.analysis_service")
+    service.drive_service = FakeDriveService(config)
+    return service
+
+
+def _make_request(pipeline: str, service: AnalysisService, index: int, cv_kb: int):
+    cv_file = io.BytesIO(("Опыт работы QA инженером. " * (cv_kb * 1024 // 48 + 1)).encode("utf-8"))
+    if pipeline == "preparation":
+        return service.analyze_preparation(
+            cv_file=cv_file,
+            cv_filename="cv.txt",
+            feedback_text="Кандидат уверенно отвечал на вопросы.",
+            requirements_link=DRIVE_LINK.format(index),
+        )
+    return service.analyze_results(
+        cv_file=cv_file,
+        cv_filename="cv.txt",
+        video_link=DRIVE_LINK.format(index),
+        competency_matrix_link=DRIVE_LINK.format("matrix"),
+        department_values_link=DRIVE_LINK.format("values"),
+        employee_portrait_link=DRIVE_LINK.format("portrait"),
+        job_requirements_link=DRIVE_LINK.format("requirements"),
+    )
+
+
+async def _sample_rss(peak: List[int], interval: float = 0.05) -> None:
+    while True:
+        peak[0] = max(peak[0], current_rss_bytes())
+        await asyncio.sleep(interval)
+
+
+async def run_level(
+        pipeline: str,
+        concurrency: int,
+        requests: int,
+        config: FakeBackendConfig,
+        cv_kb: int = 8
+) -> LevelResult:
+    """Runs ``requests`` pipeline calls with at most ``concurrency`` in flight on one shared service."""
+    service = make_offline_service(config, max_concurrency=concurrency)
+
+    latencies: List[float] = []
+    stage_totals: Dict[str, float] = {}
+    counter_totals: Dict[str, float] = {}
+    stage_peaks: Dict[str, int] = {}
+    errors = 0
+    pending = iter(range(requests))
+
+    async def client() -> None:
+        nonlocal errors
+        for index in pending:
+            started = time.perf_counter()
+            with collect_stages() as timings:
+                try:
+                    await _make_request(pipeline, service, index, cv_kb)
+                except Exception as e:
+                    errors += 1
+                    logger.error(f"Benchmark request {index} failed: {e}")
+            latencies.append(time.perf_counter() - started)
+            for name, seconds in timings.totals().items():
+                stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+            for name, value in timings.counters.items():
+                counter_totals[name] = counter_totals.get(name, 0.0) + value
+            for name, rss in timings.peak_rss.items():
+                stage_peaks[name] = max(stage_peaks.get(name, 0), rss)
+
+    peak = [current_rss_bytes()]
+    sampler = asyncio.create_task(_sample_rss(peak))
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    sampler.cancel()
+
+    return LevelResult(
+        pipeline=pipeline,
+        concurrency=concurrency,
+        requests=requests,
+        errors=errors,
+        wall_seconds=round(wall, 4),
+        throughput_per_second=round(requests / wall, 3) if wall else 0.0,
+        p50_seconds=round(percentile(latencies, 50), 4),
+        p95_seconds=round(percentile(latencies, 95), 4),
+        p99_seconds=round(percentile(latencies, 99), 4),
+        peak_rss_mb=round(max(peak[0], current_rss_bytes()) / (1024 * 1024), 1),
+        stages={name: round(total / requests, 4) for name, total in sorted(stage_totals.items())},
+        counters={name: round(total / requests, 1) for name, total in sorted(counter_totals.items())},
+        stage_peak_rss_mb={name: round(rss / (1024 * 1024), 1) for name, rss in sorted(stage_peaks.items())},
+    )
+
+
+async def run_benchmark(
+        pipelines: List[str],
+        concurrency_levels: List[int],
+        requests: int,
+        config: FakeBackendConfig,
+        cv_kb: int = 8
+) -> List[LevelResult]:
+    results = []
+    with mock.patch("backend.services.analysis_service.Runner", make_fake_runner(config)), \
+            mock.patch("backend.utils.file_processing.transcribe_audio_assemblyai", make_fake_transcriber(config)):
+        for pipeline in pipelines:
+            for concurrency in concurrency_levels:
+                results.append(await run_level(pipeline, concurrency, max(requests, concurrency), config, cv_kb))
+    return results
+
+
+def format_report(results: List[LevelResult]) -> str:
+    lines = [
+        f"{'pipeline':<12} {'conc':>4} {'req':>5} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'rss MB':>8}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.pipeline:<12} {result.concurrency:>4} {result.requests:>5} {result.errors:>4} "
+            f"{result.throughput_per_second:>8.2f} {result.p50_seconds:>8.3f} {result.p95_seconds:>8.3f} "
+            f"{result.p99_seconds:>8.3f} {result.peak_rss_mb:>8.1f}"
+        )
+        for name, seconds in result.stages.items():
+            peak = result.stage_peak_rss_mb.get(name)
+            lines.append(f"{'':<19}{name:<40} {seconds:>8.3f}s/req" + (f" {peak:>8.1f} MB peak" if peak else ""))
+        for name, value in result.counters.items():
+            lines.append(f"{'':<19}{name:<40} {value:>8.1f}/req")
+    lines.append(f"Process peak RSS: {peak_rss_bytes() / (1024 * 1024):.1f} MB")
+    return "\n".join(lines)
+
+
+def compare_with_baseline(results: List[LevelResult], baseline: List[dict], tolerance: float) -> List[str]:
+    """Returns a description of every level that regressed beyond ``tolerance`` against the baseline."""
+    previous = {(item["pipeline"], item["concurrency"]): item for item in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result.pipeline, result.concurrency))
+        if base is None:
+            continue
+        if result.throughput_per_second < base["throughput_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{result.pipeline} x{result.concurrency}: throughput "
+                f"{result.throughput_per_second} < {base['throughput_per_second']}"
+            )
+        if result.p95_seconds > base["p95_seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result.pipeline} x{result.concurrency}: p95 {result.p95_seconds}s > {base['p95_seconds']}s"
+            )
+        if result.errors > base.get("errors", 0):
+            regressions.append(f"{result.pipeline} x{result.concurrency}: {result.errors} failed requests")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for the analysis pipelines.")
+    parser.add_argument("--pipeline", choices=[*PIPELINES, "all"], default="all")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level.")
+    parser.add_argument("--drive-latency", type=float, default=0.05, help="Seconds per Drive HTTP request.")
+    parser.add_argument("--sheet-kb", type=int, default=20)
+    parser.add_argument("--audio-mb", type=float, default=5.0)
+    parser.add_argument("--transcription-latency", type=float, default=0.5)
+    parser.add_argument("--transcript-kb", type=int, default=60)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per agent run.")
+    parser.add_argument("--llm-output-kb", type=int, default=4)
+    parser.add_argument("--cv-kb", type=int, default=8)
+    parser.add_argument("--log-level", default="WARNING", help="Pipeline log level; INFO includes logging overhead.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression.")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    config = FakeBackendConfig(
+        drive_latency=args.drive_latency,
+        sheet_kb=args.sheet_kb,
+        audio_mb=args.audio_mb,
+        transcription_latency=args.transcription_latency,
+        transcript_kb=args.transcript_kb,
+        llm_latency=args.llm_latency,
+        llm_output_kb=args.llm_output_kb,
+    )
+    pipelines = list(PIPELINES) if args.pipeline == "all" else [args.pipeline]
+    results = asyncio.run(run_benchmark(pipelines, args.concurrency, args.requests, config, args.cv_kb))
+
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Cold-start profiler for the API and worker entry points.
+
+Imports the target module in a fresh interpreter with ``python -X importtime``, then
+reports the total import time, the most expensive modules (self and cumulative time)
+and the self time per top-level package. It also measures the wall time of the whole
+import, so cold-start regressions can be tracked over time.
+
+    python -m backend.benchmarks.startup_profile
+    python -m backend.benchmarks.startup_profile --target backend.worker_main --top 15
+    python -m backend.benchmarks.startup_profile --output startup.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+DEFAULT_TARGETS = ("backend.main", "backend.worker_main")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class ModuleImport:
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    target: str
+    wall_ms: float
+    import_ms: float
+    modules: int
+    top_cumulative: List[ModuleImport] = field(default_factory=list)
+    top_self: List[ModuleImport] = field(default_factory=list)
+    packages: Dict[str, float] = field(default_factory=dict)
+
+
+def parse_importtime(stderr: str) -> List[ModuleImport]:
+    """Parses ``-X importtime`` output; nesting depth is taken from the indentation."""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append(ModuleImport(
+            name=name,
+            self_ms=int(self_us) / 1000,
+            cumulative_ms=int(cumulative_us) / 1000,
+            depth=max(0, (len(indent) - 1) // 2),
+        ))
+    return modules
+
+
+def profile_target(target: str, top: int = 20, env: Optional[Dict[str, str]] = None) -> StartupProfile:
+    """Imports ``target`` in a child interpreter and summarises where the import time goes."""
+    child_env = {**os.environ, **(env or {})}
+    child_env.pop("PYTHONPROFILEIMPORTTIME", None)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=child_env,
+        cwd=PROJECT_ROOT,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{completed.stderr[-2000:]}")
+
+    modules = parse_importtime(completed.stderr)
+    # A module can be reported more than once (e.g. a package and its re-import); keep the costliest row.
+    unique: Dict[str, ModuleImport] = {}
+    for module in modules:
+        if module.name not in unique or module.cumulative_ms > unique[module.name].cumulative_ms:
+            unique[module.name] = module
+    packages: Dict[str, float] = defaultdict(float)
+    for module in modules:
+        packages[module.name.split(".")[0]] += module.self_ms
+
+    return StartupProfile(
+        target=target,
+        wall_ms=round(wall_ms, 1),
+        import_ms=round(sum(module.self_ms for module in modules), 1),
+        modules=len(modules),
+        top_cumulative=sorted(unique.values(), key=lambda module: module.cumulative_ms, reverse=True)[:top],
+        top_self=sorted(unique.values(), key=lambda module: module.self_ms, reverse=True)[:top],
+        packages=dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+    )
+
+
+def format_profile(profile: StartupProfile) -> str:
+    lines = [
+        f"== {profile.target}: wall {profile.wall_ms:.0f} ms, imports {profile.import_ms:.0f} ms, "
+        f"{profile.modules} modules",
+        "Top modules by cumulative time:",
+    ]
+    lines += [f"  {module.cumulative_ms:>9.1f} ms  {module.name}" for module in profile.top_cumulative]
+    lines.append("Top modules by self time:")
+    lines += [f"  {module.self_ms:>9.1f} ms  {module.name}" for module in profile.top_self]
+    lines.append("Self time per top-level package:")
+    lines += [f"  {ms:>9.1f} ms  {package}" for package, ms in profile.packages.items()]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import cost of the API and worker entry points.")
+    parser.add_argument("--target", nargs="+", default=list(DEFAULT_TARGETS), help="Modules to import.")
+    parser.add_argument("--top", type=int, default=20, help="Rows per section.")
+    parser.add_argument("--output", help="Write the profiles as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    # Settings are validated at import time; placeholders keep the profiler usable without secrets.
+    env = {
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "profile"),
+        "ASSEMBLYAI_API_KEY": os.environ.get("ASSEMBLYAI_API_KEY", "profile"),
+        "GOOGLE_APPLICATION_B64": os.environ.get("GOOGLE_APPLICATION_B64", ""),
+    }
+    profiles = [profile_target(target, args.top, env) for target in args.target]
+    print("\n\n".join(format_profile(profile) for profile in profiles))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(profile) for profile in profiles], f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
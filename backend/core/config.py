@@ -18,12 +18,78 @@ class Settings(BaseSettings):
     ]
 
     google_api_key: str
+    # Pool of Gemini API keys (or "vertex:<project>[:<location>]" entries); google_api_key alone when empty.
+    gemini_api_keys: list[str] = []
     assemblyai_api_key: str
 
     google_application_b64: str
 
     google_credentials_path: str | None = None
 
+    results_retention_seconds: int = 7 * 24 * 60 * 60
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    job_cancel_poll_seconds: float = 2.0
+
+    worker_max_processes: int = 2
+    worker_supervisor_poll_seconds: float = 5.0
+    worker_mode: str = "rq"
+    worker_async_concurrency: int = 4
+    worker_reserved_interactive_slots: int = 1
+    fair_share_max_active_jobs: int = 2
+    # Proxies in front of the API that append to X-Forwarded-For; the submitter of a job is
+    # the address the outermost of them saw. 0 uses the address of the direct peer.
+    trusted_proxy_hops: int = 0
+    # Workers exit after finishing this many jobs or above this RSS; 0 disables the limit.
+    worker_max_jobs: int = 0
+    worker_max_rss_mb: float = 0
+    worker_memory_sample_seconds: float = 1.0
+
+    gemini_default_rpm: int = 1000
+    gemini_default_tpm: int = 1_000_000
+    gemini_rate_limits: dict[str, dict[str, int]] = {}
+    gemini_retry_attempts: int = 5
+    gemini_retry_base_delay: float = 1.0
+    gemini_retry_max_delay: float = 30.0
+    gemini_model_routes: dict[str, list[dict]] = {}
+    gemini_model_fallbacks: dict[str, str] = {}
+    gemini_fallback_after_attempts: int = 2
+    gemini_key_cooldown_seconds: float = 30.0
+    gemini_key_max_cooldown_seconds: float = 300.0
+    gemini_hedging_enabled: bool = False
+    gemini_hedge_percentile: float = 95.0
+    gemini_hedge_min_samples: int = 20
+    gemini_hedge_min_delay_seconds: float = 2.0
+    gemini_latency_window: int = 200
+    gemini_breaker_window_seconds: float = 60.0
+    gemini_breaker_min_calls: int = 10
+    gemini_breaker_error_rate: float = 0.5
+    gemini_breaker_open_seconds: float = 30.0
+    agent_deadline_seconds: float = 180.0
+    agent_deadlines: dict[str, float] = {}
+
+    # "none", "console" (spans printed to stdout) or "gcp" (Cloud Trace).
+    tracing_exporter: str = "none"
+    tracing_sample_rate: float = 1.0
+    # Share of results and batch jobs profiled without an explicit request (0 - only on request).
+    job_profile_sample_rate: float = 0.0
+    # Profiling of POST /api/prep/ and /api/prep/stream runs inside the API process and slows
+    # every concurrent request, so the profile flag of these routes is ignored unless enabled here.
+    api_request_profiling_enabled: bool = False
+
+    transcription_speakers_expected: int | None = None
+    matrix_max_rows: int = 40
+    sheet_cache_ttl_seconds: int = 300
+    sheet_cache_max_entries: int = 64
+
+    database_url: str = "sqlite:///data/reports.db"
+
+    export_retention_seconds: int = 24 * 60 * 60
+    report_font_path: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+    report_font_bold_path: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+    prep_batch_concurrency: int = 4
+    prep_batch_max_candidates: int = 50
+
     @model_validator(mode='after')
     def generate_credentials_file(self) -> 'Settings':
         if self.google_application_b64:
@@ -0,0 +1,81 @@
+import os
+import threading
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.config import settings
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
+
+
+def _create_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(database_url, pool_pre_ping=True)
+
+    if url.database and url.database != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+        return create_engine(database_url, connect_args={"check_same_thread": False})
+    # In-memory SQLite lives inside one connection; share it between threads.
+    return create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def history_available() -> bool:
+    """
+    On Cloud Run the API and the worker are separate services with their own ephemeral
+    filesystems, so a SQLite file would give each container a private store that is lost
+    on restart. Report history is off there unless DATABASE_URL points to a shared database.
+    """
+    return not (os.getenv("K_SERVICE") and make_url(settings.database_url).get_backend_name() == "sqlite")
+
+
+def warn_if_history_unavailable() -> None:
+    """Startup check: report history is optional, so a missing shared database only disables it."""
+    if not history_available():
+        logger.warning(
+            "DATABASE_URL is SQLite on Cloud Run: report history and ranking are disabled. "
+            "Point it to a database shared by the API and the worker (e.g. postgresql+psycopg://...) to enable them."
+        )
+
+
+def get_engine() -> Engine:
+    """Creates the engine and the tables on first use; the API and the workers share this code path."""
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = _create_engine(settings.database_url)
+                # Import the models so that their tables are registered on Base.metadata.
+                from backend.db import report_store  # noqa: F401
+
+                Base.metadata.create_all(engine)
+                _session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+                _engine = engine
+    return _engine
+
+
+def new_session() -> Session:
+    get_engine()
+    return _session_factory()
+
+
+def dispose_engine() -> None:
+    """Closes all pooled connections; the next call to get_engine() creates a new engine."""
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
@@ -0,0 +1,155 @@
+"""
+Persistent store of finished preparation and results reports.
+
+Besides the full report JSON, every row keeps the fields used for lookups in indexed
+columns, so finding past candidates is a cheap indexed read instead of a new analysis.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String, Text, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.database import Base, history_available, new_session
+
+PREPARATION = "preparation"
+RESULTS = "results"
+
+
+class StoredReport(Base):
+    __tablename__ = "reports"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    report_id: Mapped[str] = mapped_column(String(128), unique=True)
+    kind: Mapped[str] = mapped_column(String(16))
+    candidate_name: Mapped[Optional[str]] = mapped_column(String(255))
+    # Lower-cased name: prefix search on it is an index range scan on every database.
+    candidate_key: Mapped[Optional[str]] = mapped_column(String(255), index=True)
+    requirements_link: Mapped[Optional[str]] = mapped_column(String(1024))
+    recommendation: Mapped[Optional[str]] = mapped_column(String(255), index=True)
+    assessed_level: Mapped[Optional[str]] = mapped_column(String(64), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    payload: Mapped[str] = mapped_column(Text)
+    # float32 vector of ranking.FEATURE_NAMES, computed once when the report is saved.
+    features: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+
+    __table_args__ = (
+        Index("ix_reports_requirements_link_id", "requirements_link", "id"),
+    )
+
+
+def _summary_fields(kind: str, report: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    body = report.get("report") or {}
+    if kind == RESULTS:
+        conclusion = body.get("conclusion") or {}
+        return {
+            "candidate_name": (body.get("candidate_info") or {}).get("full_name"),
+            "recommendation": conclusion.get("recommendation"),
+            "assessed_level": conclusion.get("assessed_level"),
+        }
+    name = " ".join(part for part in (body.get("first_name"), body.get("last_name")) if part) or None
+    return {
+        "candidate_name": name,
+        "recommendation": (body.get("conclusion") or {}).get("recommendations"),
+        "assessed_level": None,
+    }
+
+
+def save_report(report_id: str, kind: str, report: Dict[str, Any], requirements_link: Optional[str]) -> None:
+    """Stores a finished report. Saving the same report id again is a no-op (e.g. a retried job)."""
+    # Imported on first use: ranking pulls in numpy, which the API would otherwise load on every cold start.
+    from backend.services import ranking
+
+    fields = _summary_fields(kind, report)
+    row = StoredReport(
+        report_id=report_id,
+        kind=kind,
+        candidate_name=(fields["candidate_name"] or "")[:255] or None,
+        candidate_key=(fields["candidate_name"] or "").strip().lower()[:255] or None,
+        requirements_link=requirements_link,
+        recommendation=(fields["recommendation"] or "")[:255] or None,
+        assessed_level=(fields["assessed_level"] or "")[:64] or None,
+        created_at=datetime.now(timezone.utc),
+        payload=json.dumps(report, ensure_ascii=False, separators=(",", ":")),
+        features=ranking.encode_features(ranking.compute_features(kind, report)),
+    )
+    with new_session() as session:
+        session.add(row)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            logger.info(f"Report {report_id} is already stored.")
+
+
+def save_report_safely(report_id: str, kind: str, report: Dict[str, Any], requirements_link: Optional[str]) -> None:
+    """save_report for pipeline code: a storage failure is logged and does not fail the analysis."""
+    if not history_available():
+        return
+    try:
+        save_report(report_id, kind, report, requirements_link)
+    except Exception as e:
+        logger.error(f"Could not store report {report_id}: {e}", exc_info=True)
+
+
+def list_reports(
+        candidate: Optional[str] = None,
+        requirements_link: Optional[str] = None,
+        recommendation: Optional[str] = None,
+        assessed_level: Optional[str] = None,
+        kind: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[int] = None,
+        limit: int = 20
+) -> Tuple[List[StoredReport], Optional[int]]:
+    """
+    Newest reports first, filtered by the indexed columns. Keyset pagination:
+    pass the returned cursor to get the next page; None means there are no more rows.
+    """
+    query = select(StoredReport)
+    if candidate:
+        prefix = candidate.strip().lower()
+        query = query.where(StoredReport.candidate_key >= prefix, StoredReport.candidate_key < prefix + "\uffff")
+    if requirements_link:
+        query = query.where(StoredReport.requirements_link == requirements_link)
+    if recommendation:
+        query = query.where(StoredReport.recommendation == recommendation)
+    if assessed_level:
+        query = query.where(StoredReport.assessed_level == assessed_level)
+    if kind:
+        query = query.where(StoredReport.kind == kind)
+    if created_from:
+        query = query.where(StoredReport.created_at >= created_from)
+    if created_to:
+        query = query.where(StoredReport.created_at < created_to)
+    if cursor is not None:
+        query = query.where(StoredReport.id < cursor)
+    query = query.order_by(StoredReport.id.desc()).limit(limit + 1)
+
+    with new_session() as session:
+        rows = list(session.scalars(query))
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def get_report(report_id: str) -> Optional[StoredReport]:
+    with new_session() as session:
+        return session.scalars(select(StoredReport).where(StoredReport.report_id == report_id)).first()
+
+
+def vacancy_features(requirements_link: str, kind: Optional[str] = None) -> List[Tuple[str, str, Optional[str], bytes]]:
+    """
+    ``(report_id, kind, candidate_name, features)`` of every report of a vacancy;
+    reads only these columns through the requirements link index.
+    """
+    query = select(
+        StoredReport.report_id, StoredReport.kind, StoredReport.candidate_name, StoredReport.features
+    ).where(StoredReport.requirements_link == requirements_link, StoredReport.features.is_not(None))
+    if kind:
+        query = query.where(StoredReport.kind == kind)
+    with new_session() as session:
+        return [tuple(row) for row in session.execute(query.order_by(StoredReport.id))]
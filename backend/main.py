@@ -1,16 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
-from backend.api.routes import prep, results
+from backend.api import deps
+from backend.api.routes import exports, prep, profiles, reports, results
 from backend.core.config import settings
+from backend.db import database
+from backend.utils.tracing import TracingMiddleware, configure_tracing
 
 logger.add("logs/app.log", rotation="500 MB", level="INFO")
 
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_tracing("interview-api")
+    database.warn_if_history_unavailable()
+    deps.open_redis()
+    yield
+    deps.close_redis()
+    database.dispose_engine()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="API for AI-assistant for interviews.",
     version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -26,9 +44,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last, so the request span also covers the CORS handling.
+app.add_middleware(TracingMiddleware)
 
 app.include_router(prep.router, prefix="/api/prep", tags=["Interview Preparation"])
 app.include_router(results.router, prefix="/api/results", tags=["Interview Results"])
+app.include_router(exports.router, prefix="/api/exports", tags=["Report Export"])
+app.include_router(reports.router, prefix="/api/reports", tags=["Report History"])
+app.include_router(profiles.router, prefix="/api/profiles", tags=["Job Profiling"])
 
 
 @app.get("/", summary="Health Check", description="A simple endpoint to check if the server is running.")
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import signal
+import socket
+import traceback
+from typing import List, Optional, Set
+
+from loguru import logger
+from redis import Redis
+from rq import Queue
+from rq.executions import Execution
+from rq.job import Job, JobStatus
+from rq.timeouts import JobTimeoutException
+from rq.utils import now
+
+from backend.queue.tasks import ASYNC_TASKS
+from backend.queue.memory_watchdog import RecyclePolicy, track_job_memory
+from backend.services.analysis_service import AnalysisService
+from backend.utils.tracing import job_span
+
+DEFAULT_RESULT_TTL = 500
+
+
+class AsyncWorker:
+    """
+    Long-lived RQ worker that runs several jobs concurrently in one event loop.
+
+    The default RQ worker forks a process per job, and every job then creates its own
+    event loop and AnalysisService. The jobs are I/O-bound, so this worker keeps one loop
+    and one preloaded AnalysisService (Drive client, AssemblyAI settings) for the whole
+    process lifetime and runs up to ``concurrency`` jobs at the same time.
+
+    Jobs registered in ``ASYNC_TASKS`` are awaited directly; any other job function is
+    executed in a thread. ``job_timeout`` is enforced per job, and failures are recorded
+    through the regular RQ result/failed-registry machinery, so the status endpoint
+    works the same as with the default worker. That machinery (``Job._handle_success``,
+    ``Execution`` and friends) is not public API, which is why rq is pinned in requirements.txt.
+
+    The last ``reserved_interactive`` slots only take jobs from ``interactive_queue``,
+    so short tasks are not stuck behind long ones that fill the process.
+
+    Memory of every job is tracked, and once ``recycle_policy`` asks for a restart
+    (job count or RSS limit) the worker stops taking jobs, finishes the running ones and exits.
+    """
+
+    def __init__(
+            self,
+            queues: List[Queue],
+            connection: Redis,
+            concurrency: int = 4,
+            poll_interval: float = 1.0,
+            name: Optional[str] = None,
+            interactive_queue: Optional[str] = None,
+            reserved_interactive: int = 0,
+            recycle_policy: Optional[RecyclePolicy] = None
+    ):
+        self.queues = queues
+        self.connection = connection
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.interactive_queues = [queue for queue in queues if queue.name == interactive_queue]
+        self.reserved_interactive = min(reserved_interactive, self.concurrency - 1) if self.interactive_queues else 0
+        self.name = name or f"async-worker:{socket.gethostname()}:{os.getpid()}"
+        self.recycle_policy = recycle_policy or RecyclePolicy()
+
+        self.service: Optional[AnalysisService] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stop_requested = False
+
+    def request_stop(self) -> None:
+        """Warm shutdown: stop taking new jobs and let the running ones finish."""
+        if not self._stop_requested:
+            logger.info(f"Воркер {self.name}: получен сигнал остановки, дожидаюсь текущих задач ({len(self._tasks)}).")
+        self._stop_requested = True
+
+    async def run(self, burst: bool = False) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        self.service = AnalysisService(max_concurrency=self.concurrency)
+        logger.info(
+            f"Асинхронный воркер {self.name} запущен: очереди {[q.name for q in self.queues]}, "
+            f"одновременных задач до {self.concurrency}."
+        )
+
+        while not self._stop_requested:
+            if len(self._tasks) < self.concurrency and self._start_next_job():
+                continue
+
+            if burst and not self._tasks:
+                logger.info(f"Воркер {self.name}: очереди пусты, завершаю работу (burst).")
+                break
+
+            if self._tasks:
+                await asyncio.wait(self._tasks, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(self.poll_interval)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Воркер {self.name} остановлен.")
+
+    def _start_next_job(self) -> bool:
+        free_slots = self.concurrency - len(self._tasks)
+        queues = self.interactive_queues if free_slots <= self.reserved_interactive else self.queues
+        dequeued = Queue.dequeue_any(queues, None, connection=self.connection)
+        if dequeued is None:
+            return False
+
+        job, queue = dequeued
+        task = asyncio.create_task(self._perform(job, queue), name=f"job:{job.id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _perform(self, job: Job, queue: Queue) -> None:
+        timeout = job.timeout or Queue.DEFAULT_TIMEOUT
+        execution = self._prepare(job, queue, timeout)
+        logger.info(f"Воркер {self.name}: начинаю задачу {job.id} ({job.func_name}) из очереди {queue.name}.")
+
+        try:
+            with job_span(job), track_job_memory(job):
+                coroutine = self._run_job(job)
+                if timeout is not None and timeout > 0:
+                    try:
+                        result = await asyncio.wait_for(coroutine, timeout)
+                    except asyncio.TimeoutError:
+                        raise JobTimeoutException(f"Task exceeded maximum timeout value ({timeout} seconds)")
+                else:
+                    result = await coroutine
+        except Exception as e:
+            exc_string = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+            self._handle_failure(job, queue, execution, e, exc_string)
+        else:
+            self._handle_success(job, queue, execution, result)
+
+        reason = self.recycle_policy.job_finished()
+        if reason and not self._stop_requested:
+            logger.info(f"Воркер {self.name} будет перезапущен: {reason}.")
+            self.request_stop()
+
+    async def _run_job(self, job: Job):
+        handler = ASYNC_TASKS.get(job.func_name)
+        if handler is not None:
+            return await handler(self.service, job, *job.args, **job.kwargs)
+        return await asyncio.to_thread(job.func, *job.args, **job.kwargs)
+
+    def _prepare(self, job: Job, queue: Queue, timeout: int) -> Execution:
+        execution_ttl = (timeout if timeout and timeout > 0 else Queue.DEFAULT_TIMEOUT) + 60
+        with self.connection.pipeline() as pipeline:
+            execution = Execution.create(job, execution_ttl, pipeline=pipeline, worker_name=self.name)
+            job.prepare_for_execution(self.name, pipeline=pipeline)
+            pipeline.lrem(queue.intermediate_queue_key, 1, job.id)
+            pipeline.execute()
+        return execution
+
+    def _handle_success(self, job: Job, queue: Queue, execution: Execution, result) -> None:
+        job.ended_at = now()
+        job._result = result
+        result_ttl = job.get_result_ttl(DEFAULT_RESULT_TTL)
+
+        if job.success_callback:
+            try:
+                job.success_callback(job, self.connection, result)
+            except Exception as e:
+                logger.error(f"Ошибка в success-callback задачи {job.id}: {e}", exc_info=True)
+
+        with self.connection.pipeline() as pipeline:
+            if result_ttl != 0:
+                job._handle_success(
+                    result_ttl,
+                    pipeline=pipeline,
+                    worker_name=self.name,
+                    execution_id=execution.id,
+                    execution_started_at=execution.created_at,
+                    execution_ended_at=job.ended_at,
+                )
+            job.cleanup(result_ttl, pipeline=pipeline, remove_from_queue=False)
+            execution.delete(job=job, pipeline=pipeline)
+            pipeline.execute()
+
+        queue.enqueue_dependents(job)
+        logger.success(f"Воркер {self.name}: задача {job.id} выполнена за {job.ended_at - job.started_at}.")
+
+    def _handle_failure(self, job: Job, queue: Queue, execution: Execution, error: Exception, exc_string: str) -> None:
+        job.ended_at = now()
+        logger.error(f"Воркер {self.name}: задача {job.id} завершилась ошибкой: {error}")
+
+        if job.failure_callback:
+            try:
+                job.failure_callback(job, self.connection, type(error), error, error.__traceback__)
+            except Exception as e:
+                logger.error(f"Ошибка в failure-callback задачи {job.id}: {e}", exc_info=True)
+
+        with self.connection.pipeline() as pipeline:
+            job.set_status(JobStatus.FAILED, pipeline=pipeline)
+            job._handle_failure(
+                exc_string,
+                pipeline=pipeline,
+                worker_name=self.name,
+                execution_id=execution.id,
+                execution_started_at=execution.created_at,
+                execution_ended_at=job.ended_at,
+            )
+            execution.delete(job=job, pipeline=pipeline)
+            pipeline.execute()
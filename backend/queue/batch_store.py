@@ -0,0 +1,43 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from redis import Redis
+
+from backend.core.config import settings
+
+BATCH_KEY_PREFIX = "prep_batch:"
+
+
+def batch_key(batch_id: str) -> str:
+    """Returns the Redis hash holding per-candidate statuses of a preparation batch."""
+    return f"{BATCH_KEY_PREFIX}{batch_id}"
+
+
+def candidate_result_id(batch_id: str, index: int) -> str:
+    """Returns the id under which the report of one batch candidate is kept in the result store."""
+    return f"{batch_id}:{index}"
+
+
+def init_batch(connection: Redis, batch_id: str, filenames: List[Optional[str]]) -> None:
+    """Registers all candidates of a new batch with the 'queued' status."""
+    key = batch_key(batch_id)
+    mapping = {
+        str(index): json.dumps({"index": index, "filename": filename, "status": "queued"}, ensure_ascii=False)
+        for index, filename in enumerate(filenames)
+    }
+    connection.hset(key, mapping=mapping)
+    connection.expire(key, settings.results_retention_seconds)
+
+
+def update_candidate(connection: Redis, batch_id: str, candidate: Dict[str, Any]) -> None:
+    """Overwrites the status entry of one candidate; `candidate` must contain its `index`."""
+    connection.hset(batch_key(batch_id), str(candidate["index"]), json.dumps(candidate, ensure_ascii=False))
+
+
+def get_batch(connection: Redis, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Returns candidate status entries ordered by index, or None for an unknown batch."""
+    raw = connection.hgetall(batch_key(batch_id))
+    if not raw:
+        return None
+    candidates = [json.loads(value) for value in raw.values()]
+    return sorted(candidates, key=lambda candidate: candidate["index"])
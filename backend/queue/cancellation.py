@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from loguru import logger
+from redis import Redis, RedisError
+
+from backend.core.config import settings
+from backend.utils.cancellation import CancellationToken, JobCancelled, cancellation_scope
+
+CANCEL_KEY_PREFIX = "jobs:cancel:"
+
+T = TypeVar("T")
+
+
+def cancel_key(job_id: str) -> str:
+    """Returns the Redis key that marks a running job as cancelled by the user."""
+    return f"{CANCEL_KEY_PREFIX}{job_id}"
+
+
+def request_cancel(connection: Redis, job_id: str) -> None:
+    connection.set(cancel_key(job_id), 1, ex=settings.results_retention_seconds)
+
+
+def is_cancel_requested(connection: Redis, job_id: str) -> bool:
+    return bool(connection.exists(cancel_key(job_id)))
+
+
+async def run_cancellable(connection: Redis, job_id: str, coroutine: Awaitable[T]) -> T:
+    """
+    Runs a job coroutine and cancels it once the job is marked cancelled in Redis.
+
+    The flag is polled every ``job_cancel_poll_seconds``. On cancellation the token of the
+    job is set (worker threads stop at their next step) and the task is cancelled, which
+    aborts in-flight downloads and LLM streams at their current await and runs the
+    pipeline's cleanup. Raises JobCancelled in that case.
+    """
+    token = CancellationToken()
+    with cancellation_scope(token):
+        # The task copies the current context, so the pipeline and its threads see the token.
+        task = asyncio.ensure_future(coroutine)
+
+    async def watch() -> None:
+        while not task.done():
+            try:
+                requested = await asyncio.to_thread(is_cancel_requested, connection, job_id)
+            except RedisError as e:
+                logger.warning(f"Не удалось проверить отмену задачи {job_id}: {e}")
+                requested = False
+            if requested:
+                logger.warning(f"Задача {job_id} отменена пользователем, останавливаю пайплайн.")
+                token.cancel()
+                task.cancel()
+                return
+            await asyncio.sleep(settings.job_cancel_poll_seconds)
+
+    watcher = asyncio.create_task(watch())
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.cancelled and task.cancelled():
+            raise JobCancelled(f"Задача {job_id} отменена пользователем.")
+        raise
+    except Exception as e:
+        # A stage that turned the cancellation into its own error (e.g. a stopped thread).
+        if token.cancelled:
+            raise JobCancelled(f"Задача {job_id} отменена пользователем.") from e
+        raise
+    finally:
+        watcher.cancel()
@@ -0,0 +1,46 @@
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from redis import Redis
+
+from backend.core.config import settings
+
+EXPORT_SOURCE_PREFIX = "exports:source:"
+EXPORT_FILE_PREFIX = "exports:file:"
+
+
+def source_key(report_hash: str) -> str:
+    """Returns the Redis key of the report JSON an export is rendered from."""
+    return f"{EXPORT_SOURCE_PREFIX}{report_hash}"
+
+
+def file_key(report_hash: str, export_format: str) -> str:
+    """Returns the Redis key of a rendered export file."""
+    return f"{EXPORT_FILE_PREFIX}{report_hash}:{export_format}"
+
+
+def export_job_id(report_hash: str, export_format: str) -> str:
+    """Deterministic job id, so concurrent requests for the same export share one render job."""
+    return f"export-{report_hash}-{export_format}"
+
+
+def save_source(connection: Redis, report_hash: str, report: Dict[str, Any]) -> None:
+    payload = json.dumps(report, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    connection.set(source_key(report_hash), zlib.compress(payload), ex=settings.export_retention_seconds)
+
+
+def load_source(connection: Redis, report_hash: str) -> Optional[Dict[str, Any]]:
+    blob = connection.get(source_key(report_hash))
+    return json.loads(zlib.decompress(blob)) if blob is not None else None
+
+
+def save_file(connection: Redis, report_hash: str, export_format: str, content: bytes) -> str:
+    """Stores a rendered file and returns its key; the file expires with the export retention."""
+    key = file_key(report_hash, export_format)
+    connection.set(key, content, ex=settings.export_retention_seconds)
+    return key
+
+
+def load_file(connection: Redis, report_hash: str, export_format: str) -> Optional[bytes]:
+    return connection.get(file_key(report_hash, export_format))
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from redis import Redis, WatchError
+
+from backend.core.config import settings
+from backend.queue import result_store
+
+IDEMPOTENCY_KEY_PREFIX = "idempotency:"
+
+# Statuses in which a previous submission is returned instead of starting a new job.
+REUSABLE_STATUSES = {"queued", "started", "deferred", "scheduled", "finished"}
+
+# A claim that points to a job which does not exist yet is treated as in flight for
+# this long: the duplicate request came in between the claim and the enqueue.
+CLAIM_GRACE_SECONDS = 30
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used for a submission with different inputs."""
+
+
+def submission_fingerprint(inputs: Dict[str, Any], file_bytes: Optional[bytes] = None) -> str:
+    """
+    Builds a canonical hash of submission inputs: string values are stripped, keys are
+    sorted, and an attached file contributes its SHA-256 instead of its bytes.
+    """
+    canonical = {key: value.strip() if isinstance(value, str) else value for key, value in inputs.items()}
+    canonical["file_sha256"] = hashlib.sha256(file_bytes).hexdigest() if file_bytes else None
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def idempotency_key(scope: str, fingerprint: str, client_key: Optional[str] = None, submitter: Optional[str] = None) -> str:
+    """
+    Returns the Redis key that guards a submission. A client-supplied Idempotency-Key is
+    scoped to its submitter; without one the canonical input hash is the key.
+    """
+    if client_key:
+        digest = hashlib.sha256(f"{submitter or ''}:{client_key}".encode("utf-8")).hexdigest()
+        return f"{IDEMPOTENCY_KEY_PREFIX}{scope}:key:{digest}"
+    return f"{IDEMPOTENCY_KEY_PREFIX}{scope}:input:{fingerprint}"
+
+
+def _parse_claim(raw: Optional[bytes]) -> Tuple[Optional[str], Optional[str]]:
+    if raw is None:
+        return None, None
+    value = raw.decode() if isinstance(raw, bytes) else raw
+    job_id, _, fingerprint = value.partition("|")
+    return job_id, fingerprint
+
+
+def _is_reusable(connection: Redis, key: str, job_id: str) -> bool:
+    job_status = result_store.get_job_status(connection, job_id)
+    if job_status is None:
+        remaining = connection.ttl(key)
+        return remaining is not None and remaining > settings.idempotency_ttl_seconds - CLAIM_GRACE_SECONDS
+    return job_status in REUSABLE_STATUSES
+
+
+def claim_submission(connection: Redis, key: str, fingerprint: str) -> Tuple[str, bool]:
+    """
+    Claims a job id for a submission.
+
+    Returns ``(job_id, True)`` when the caller must enqueue a new job under ``job_id``,
+    or ``(job_id, False)`` when an equivalent job is queued, running or recently finished.
+    Failed, stopped and expired jobs do not block a new submission.
+    Raises IdempotencyConflict if the key was used with different inputs.
+    """
+    new_job_id = str(uuid.uuid4())
+    value = f"{new_job_id}|{fingerprint}"
+    ttl = settings.idempotency_ttl_seconds
+
+    if connection.set(key, value, nx=True, ex=ttl):
+        return new_job_id, True
+
+    with connection.pipeline() as pipeline:
+        try:
+            pipeline.watch(key)
+            existing_job_id, existing_fingerprint = _parse_claim(pipeline.get(key))
+            if existing_job_id is not None:
+                if existing_fingerprint != fingerprint:
+                    raise IdempotencyConflict(key)
+                if _is_reusable(connection, key, existing_job_id):
+                    return existing_job_id, False
+
+            pipeline.multi()
+            pipeline.set(key, value, ex=ttl)
+            pipeline.execute()
+            return new_job_id, True
+        except WatchError:
+            # Another request replaced the claim concurrently: follow it.
+            existing_job_id, _ = _parse_claim(connection.get(key))
+            return existing_job_id or new_job_id, existing_job_id is None
+
+
+def release_claim(connection: Redis, key: str, job_id: str) -> None:
+    """Drops a claim whose job could not be enqueued, so a retry is not blocked."""
+    current_job_id, _ = _parse_claim(connection.get(key))
+    if current_job_id == job_id:
+        connection.delete(key)
@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from loguru import logger
+from rq.job import Job
+
+from backend.core.config import settings
+from backend.utils.metrics import collect_stages, current_rss_bytes, sample_memory
+
+MEMORY_META_KEY = "memory"
+
+
+def _mb(value: int) -> float:
+    return round(value / (1024 * 1024), 1)
+
+
+@contextmanager
+def track_job_memory(job: Job) -> Iterator[None]:
+    """
+    Measures the worker process RSS while a job runs: before, after, the peak and the peak
+    of every stage. The report is logged and stored in ``job.meta["memory"]`` for sizing
+    instances by real jobs.
+    """
+    rss_before = current_rss_bytes()
+    with collect_stages() as timings, sample_memory(timings, settings.worker_memory_sample_seconds):
+        timings.enter("job")
+        try:
+            yield
+        finally:
+            timings.exit("job")
+            report: Dict[str, Any] = {
+                "rss_before_mb": _mb(rss_before),
+                "rss_after_mb": _mb(current_rss_bytes()),
+                "peak_rss_mb": _mb(timings.peak_rss.get("job", rss_before)),
+                "stages_peak_rss_mb": {
+                    name: _mb(peak) for name, peak in sorted(timings.peak_rss.items()) if name != "job"
+                },
+            }
+            logger.info(
+                f"Память задачи {job.id}: RSS {report['rss_before_mb']} -> {report['rss_after_mb']} МБ, "
+                f"пик {report['peak_rss_mb']} МБ; пики по этапам: {report['stages_peak_rss_mb']}"
+            )
+            try:
+                job.meta[MEMORY_META_KEY] = report
+                job.save_meta()
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить замеры памяти задачи {job.id}: {e}")
+
+
+class RecyclePolicy:
+    """
+    Decides when a long-lived worker should exit: after ``max_jobs`` jobs, or when the
+    process RSS after a job is at or above ``max_rss_mb``. Zero disables a limit. The worker
+    exits gracefully once its current jobs finish; the supervisor or the runtime starts a
+    new process.
+    """
+
+    def __init__(self, max_jobs: int = 0, max_rss_mb: float = 0):
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.jobs_done = 0
+
+    @classmethod
+    def from_settings(cls) -> "RecyclePolicy":
+        return cls(max_jobs=settings.worker_max_jobs, max_rss_mb=settings.worker_max_rss_mb)
+
+    def job_finished(self) -> Optional[str]:
+        """Counts a finished job; returns the reason to recycle the worker, or None."""
+        self.jobs_done += 1
+        if self.max_jobs and self.jobs_done >= self.max_jobs:
+            return f"выполнено задач: {self.jobs_done} (лимит {self.max_jobs})"
+        if self.max_rss_mb:
+            rss_mb = _mb(current_rss_bytes())
+            if rss_mb >= self.max_rss_mb:
+                return f"RSS {rss_mb} МБ не ниже порога {self.max_rss_mb} МБ"
+        return None
@@ -0,0 +1,67 @@
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from redis import Redis
+
+from backend.core.config import settings
+from backend.utils import profiling
+from backend.utils.profiling import JobProfile
+
+PROFILE_KEY_PREFIX = "profiles:"
+
+# Artifact name -> (media type, file extension).
+PROFILE_ARTIFACTS: Dict[str, Tuple[str, str]] = {
+    "cpu": ("application/octet-stream", "pstats"),
+    "allocations": ("application/octet-stream", "tracemalloc"),
+    "summary": ("text/plain; charset=utf-8", "txt"),
+}
+
+
+def profile_key(job_id: str, artifact: str) -> str:
+    """Returns the Redis key of one profiling artifact of a job."""
+    return f"{PROFILE_KEY_PREFIX}{job_id}:{artifact}"
+
+
+def save_profile(connection: Redis, job_id: str, profile: JobProfile) -> None:
+    """Stores the zlib-compressed artifacts of a job; they expire with the job results."""
+    contents = {
+        "cpu": profile.cpu_stats,
+        "allocations": profile.allocations,
+        "summary": profile.summary.encode("utf-8"),
+    }
+    with connection.pipeline() as pipeline:
+        for artifact, content in contents.items():
+            pipeline.set(profile_key(job_id, artifact), zlib.compress(content), ex=settings.results_retention_seconds)
+        pipeline.execute()
+
+
+def load_artifact(connection: Redis, job_id: str, artifact: str) -> Optional[bytes]:
+    blob = connection.get(profile_key(job_id, artifact))
+    return zlib.decompress(blob) if blob is not None else None
+
+
+def available_artifacts(connection: Redis, job_id: str) -> List[str]:
+    with connection.pipeline() as pipeline:
+        for artifact in PROFILE_ARTIFACTS:
+            pipeline.exists(profile_key(job_id, artifact))
+        exists = pipeline.execute()
+    return [artifact for artifact, found in zip(PROFILE_ARTIFACTS, exists) if found]
+
+
+@contextmanager
+def profiled(connection: Redis, profile_id: str, label: str) -> Iterator[None]:
+    """Profiles the block and stores the artifacts under ``profile_id``, also when the block fails."""
+    job_profile = None
+    try:
+        with profiling.profile(label) as job_profile:
+            yield
+    finally:
+        # Профиль сохраняется и для упавшего запуска: он нужен как раз для разбора медленных и тяжелых запросов.
+        if job_profile is not None:
+            try:
+                save_profile(connection, profile_id, job_profile)
+                logger.info(f"Профиль {label} сохранен.")
+            except Exception as e:
+                logger.error(f"Не удалось сохранить профиль {label}: {e}")
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from redis import Redis
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+from backend.core.config import settings
+
+RESULT_KEY_PREFIX = "results:report:"
+
+
+def result_key(job_id: str) -> str:
+    """Returns the Redis key under which the finished report of a job is stored."""
+    return f"{RESULT_KEY_PREFIX}{job_id}"
+
+
+def save_result(connection: Redis, job_id: str, result: Dict[str, Any]) -> str:
+    """
+    Stores a finished report as zlib-compressed JSON under its own key
+    and returns that key. The key expires after the configured retention.
+    """
+    payload = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    key = result_key(job_id)
+    connection.set(key, zlib.compress(payload), ex=settings.results_retention_seconds)
+    return key
+
+
+def load_result_blob(connection: Redis, job_id: str) -> Optional[bytes]:
+    """Returns the compressed report of a job or None if it is missing or expired."""
+    return connection.get(result_key(job_id))
+
+
+def decode_result(blob: bytes) -> Dict[str, Any]:
+    """Decompresses and parses a stored report."""
+    return json.loads(zlib.decompress(blob))
+
+
+def result_etag(blob: bytes) -> str:
+    """Builds a strong ETag from the stored (compressed) report bytes."""
+    return f'"{hashlib.sha1(blob).hexdigest()}"'
+
+
+def get_job_status(connection: Redis, job_id: str) -> Optional[str]:
+    """
+    Reads only the status field of an RQ job hash, without fetching
+    and unpickling the job itself. Returns None for unknown jobs.
+    """
+    raw_status = connection.hget(Job.key_for(job_id), "status")
+    if raw_status is None:
+        return None
+    return raw_status.decode() if isinstance(raw_status, bytes) else raw_status
+
+
+def fetch_job(connection: Redis, job_id: str) -> Optional[Job]:
+    """Fetches a job regardless of the priority queue it was enqueued to."""
+    try:
+        return Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        return None
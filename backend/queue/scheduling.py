@@ -0,0 +1,123 @@
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from opentelemetry.trace import SpanKind
+from redis import Redis
+from rq import Callback, Queue
+from rq.job import Job
+
+from backend.core.config import settings
+from backend.utils.tracing import TRACE_META_KEY, inject_context, tracer
+
+INTERACTIVE_QUEUE = "interactive"
+DEFAULT_QUEUE = "results_processing"
+BULK_QUEUE = "bulk"
+
+# Workers take jobs from these queues strictly in this order.
+QUEUE_PRIORITIES = [INTERACTIVE_QUEUE, DEFAULT_QUEUE, BULK_QUEUE]
+
+JOB_KIND_QUEUES = {
+    "interactive": INTERACTIVE_QUEUE,
+    "results": DEFAULT_QUEUE,
+    "bulk": BULK_QUEUE,
+}
+
+SUBMITTER_KEY_PREFIX = "queue:submitter:"
+ACTIVE_STATUSES = {"queued", "started", "deferred", "scheduled"}
+
+
+def submitter_key(submitter: str) -> str:
+    """Returns the sorted set with the in-flight job ids of one submitter."""
+    return f"{SUBMITTER_KEY_PREFIX}{submitter}"
+
+
+def release_submitter_slot(job: Job, connection: Redis, *args, **kwargs) -> None:
+    """RQ success/failure callback: removes a finished job from its submitter's in-flight set."""
+    submitter = job.meta.get("submitter")
+    if submitter:
+        connection.zrem(submitter_key(submitter), job.id)
+
+
+class JobScheduler:
+    """
+    Routes jobs to priority queues and keeps per-submitter fair share.
+
+    Interactive jobs always go to the highest-priority queue. Long jobs go to the default
+    queue until their submitter has ``fair_share_max_active_jobs`` jobs in flight; further
+    jobs of that submitter are demoted to the bulk queue. A recruiter submitting thirty videos
+    therefore occupies the default queue with only a few of them, and other submitters'
+    jobs are picked up before the rest of the backlog. Interactive jobs are short and do not
+    count towards the share.
+    """
+
+    def __init__(self, connection: Redis):
+        self.connection = connection
+        self.queues: Dict[str, Queue] = {name: Queue(name, connection=connection) for name in QUEUE_PRIORITIES}
+
+    def queue(self, name: str) -> Queue:
+        return self.queues[name]
+
+    def active_jobs(self, submitter: str) -> int:
+        """
+        Counts in-flight jobs of a submitter. Entries whose jobs finished without running
+        a callback (deleted, expired, stopped) are pruned here, so the count heals itself.
+        """
+        key = submitter_key(submitter)
+        job_ids = [job_id.decode() if isinstance(job_id, bytes) else job_id for job_id in self.connection.zrange(key, 0, -1)]
+        if not job_ids:
+            return 0
+
+        with self.connection.pipeline() as pipeline:
+            for job_id in job_ids:
+                pipeline.hget(Job.key_for(job_id), "status")
+            statuses = pipeline.execute()
+
+        stale = [
+            job_id for job_id, raw_status in zip(job_ids, statuses)
+            if raw_status is None or raw_status.decode() not in ACTIVE_STATUSES
+        ]
+        if stale:
+            self.connection.zrem(key, *stale)
+        return len(job_ids) - len(stale)
+
+    def select_queue(self, kind: str, submitter: Optional[str]) -> Queue:
+        queue_name = JOB_KIND_QUEUES.get(kind, DEFAULT_QUEUE)
+        if queue_name == DEFAULT_QUEUE and submitter:
+            active = self.active_jobs(submitter)
+            if active >= settings.fair_share_max_active_jobs:
+                logger.info(
+                    f"Отправитель {submitter} уже имеет {active} активных задач, задача переносится в очередь {BULK_QUEUE}."
+                )
+                queue_name = BULK_QUEUE
+        return self.queues[queue_name]
+
+    def enqueue(self, func: str, kind: str, submitter: Optional[str] = None, **kwargs: Any) -> Job:
+        """
+        Enqueues a job into the queue chosen for its kind and submitter. The trace context
+        of the request goes into the job meta, so the worker continues the same trace.
+        """
+        with tracer.start_as_current_span(f"enqueue {func}", kind=SpanKind.PRODUCER) as span:
+            queue = self.select_queue(kind, submitter)
+            meta = {**kwargs.pop("meta", {}), "submitter": submitter, "kind": kind}
+            trace_context = inject_context()
+            if trace_context:
+                meta[TRACE_META_KEY] = trace_context
+            # RQ keeps finished job hashes for 500 s by default; the status of a job must stay
+            # readable as long as its report is kept.
+            kwargs.setdefault("result_ttl", settings.results_retention_seconds)
+            kwargs.setdefault("failure_ttl", settings.results_retention_seconds)
+            job = queue.enqueue(
+                func,
+                meta=meta,
+                on_success=Callback(release_submitter_slot),
+                on_failure=Callback(release_submitter_slot),
+                **kwargs
+            )
+            span.set_attribute("messaging.destination.name", queue.name)
+            span.set_attribute("messaging.message.id", job.id)
+        if submitter and queue.name != INTERACTIVE_QUEUE:
+            key = submitter_key(submitter)
+            self.connection.zadd(key, {job.id: time.time()})
+            self.connection.expire(key, settings.results_retention_seconds)
+        return job
@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import threading
+from typing import List, Optional
+
+from loguru import logger
+from redis import Redis, from_url
+from rq import Queue
+
+
+class WorkerSupervisor:
+    """
+    Keeps a bounded pool of burst worker processes for the on-demand worker service.
+
+    Triggers only wake the supervisor up, so a burst of triggers is merged into a single
+    reconciliation pass. Each pass starts at most as many workers as there are pending jobs,
+    never exceeding ``max_workers``. Burst workers exit on their own once the queues are empty,
+    which scales the pool back down to zero.
+
+    Up to ``reserved_interactive`` of the slots are kept for workers that listen only to
+    ``interactive_queue``, so a short task never waits until a long job frees a worker.
+    """
+
+    def __init__(
+            self,
+            redis_url: str,
+            queue_names: List[str],
+            max_workers: int,
+            poll_interval: float = 5.0,
+            interactive_queue: Optional[str] = None,
+            reserved_interactive: int = 0
+    ):
+        self.redis_url = redis_url
+        self.queue_names = queue_names
+        self.max_workers = max(1, max_workers)
+        self.poll_interval = poll_interval
+        self.interactive_queue = interactive_queue
+        self.reserved_interactive = min(reserved_interactive, self.max_workers - 1) if interactive_queue else 0
+
+        self._processes: List[subprocess.Popen] = []
+        self._interactive_processes: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[Redis] = None
+
+    @property
+    def connection(self) -> Redis:
+        if self._connection is None:
+            self._connection = from_url(self.redis_url)
+        return self._connection
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="worker-supervisor", daemon=True)
+        self._thread.start()
+        logger.info(f"Worker supervisor started (max_workers={self.max_workers}).")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stops the reconciliation loop and asks running workers for a warm shutdown."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+        with self._lock:
+            processes = self._processes + self._interactive_processes
+            for process in processes:
+                if process.poll() is None:
+                    process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"Worker process {process.pid} did not stop in time, killing it.")
+                    process.kill()
+            self._processes.clear()
+            self._interactive_processes.clear()
+        logger.info("Worker supervisor stopped.")
+
+    def trigger(self) -> None:
+        """Requests a reconciliation pass. Repeated triggers before the pass are merged."""
+        self._wakeup.set()
+
+    def running_workers(self) -> int:
+        with self._lock:
+            self._reap()
+            return len(self._processes) + len(self._interactive_processes)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=self.poll_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self._reconcile()
+            except Exception as e:
+                logger.error(f"Worker supervisor reconciliation failed: {e}", exc_info=True)
+
+    def _reap(self) -> None:
+        self._processes = self._alive(self._processes)
+        self._interactive_processes = self._alive(self._interactive_processes)
+
+    @staticmethod
+    def _alive(processes: List[subprocess.Popen]) -> List[subprocess.Popen]:
+        alive = []
+        for process in processes:
+            return_code = process.poll()
+            if return_code is None:
+                alive.append(process)
+            else:
+                logger.info(f"Worker process {process.pid} exited with code {return_code}.")
+        return alive
+
+    def _pending_jobs(self, queue_names: List[str]) -> int:
+        return sum(Queue(name, connection=self.connection).count for name in queue_names)
+
+    def _reconcile(self) -> None:
+        with self._lock:
+            self._reap()
+
+            if self.reserved_interactive:
+                running = len(self._interactive_processes)
+                pending = self._pending_jobs([self.interactive_queue])
+                to_start = min(self.reserved_interactive - running, pending)
+                if to_start > 0:
+                    logger.info(f"Pending interactive jobs: {pending}. Starting {to_start} interactive worker(s).")
+                    for _ in range(to_start):
+                        self._interactive_processes.append(self._spawn([self.interactive_queue]))
+
+            running = len(self._processes)
+            regular_limit = self.max_workers - self.reserved_interactive
+            if running >= regular_limit:
+                return
+
+            pending = self._pending_jobs(self.queue_names)
+            to_start = min(regular_limit - running, pending)
+            if to_start <= 0:
+                return
+
+            logger.info(f"Pending jobs: {pending}, running workers: {running}. Starting {to_start} worker(s).")
+            for _ in range(to_start):
+                self._processes.append(self._spawn(self.queue_names))
+
+    def _spawn(self, queue_names: List[str]) -> subprocess.Popen:
+        env = {**os.environ, "REDIS_URL": self.redis_url}
+        command = [sys.executable, "-m", "backend.queue.worker", "--burst", "--queues", *queue_names]
+        process = subprocess.Popen(command, env=env)
+        logger.info(f"Started burst worker process {process.pid} for queues {queue_names}.")
+        return process
@@ -1,10 +1,69 @@
 import asyncio
 import io
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
 from loguru import logger
+from redis import Redis
+from rq import get_current_job
+from rq.job import Job
 
+from backend.core.config import settings
+from backend.db import report_store
+from backend.queue import batch_store, export_store, profile_store
+from backend.queue.cancellation import run_cancellable
+from backend.queue.result_store import save_result
+from backend.services import report_export
 from backend.services.analysis_service import AnalysisService
+from backend.utils import profiling
+from backend.utils.cancellation import JobCancelled
+
+
+@contextmanager
+def _profiled(job: Optional[Job]) -> Iterator[None]:
+    """Профилирует задачу, если при постановке в очередь для нее включено профилирование."""
+    if job is None or not job.meta.get(profiling.PROFILE_META_KEY):
+        yield
+        return
+
+    with profile_store.profiled(job.connection, job.id, f"job {job.id}"):
+        yield
+
+
+async def _analyze_results(
+        service: AnalysisService,
+        cv_bytes: Optional[bytes],
+        cv_filename: Optional[str],
+        video_link: str,
+        competency_matrix_link: str,
+        department_values_link: str,
+        employee_portrait_link: str,
+        job_requirements_link: str
+) -> Dict[str, Any]:
+    cv_file = io.BytesIO(cv_bytes) if cv_bytes else None
+
+    result = await service.analyze_results(
+        cv_file=cv_file,
+        cv_filename=cv_filename,
+        video_link=video_link,
+        competency_matrix_link=competency_matrix_link,
+        department_values_link=department_values_link,
+        employee_portrait_link=employee_portrait_link,
+        job_requirements_link=job_requirements_link
+    )
+
+    logger.success(f"Анализ успешно завершен. Результат: {result.message}")
+    return result.model_dump()
+
+
+def _store_report(job: Optional[Job], report: Dict[str, Any], requirements_link: str):
+    if job is None:
+        return report
+
+    # Копия в постоянном хранилище отчетов для поиска по истории кандидатов.
+    report_store.save_report_safely(job.id, report_store.RESULTS, report, requirements_link)
+    # Отчет хранится отдельно в сжатом виде, в результат RQ кладем только ключ.
+    return save_result(job.connection, job.id, report)
 
 
 def run_analysis_pipeline(
@@ -21,25 +80,154 @@ def run_analysis_pipeline(
     Она создает сервис анализа и запускает пайплайн обработки результатов.
     """
     logger.info("Воркер получил новую задачу на анализ результатов интервью.")
+    job = get_current_job()
 
     try:
-        service = AnalysisService()
-        cv_file = io.BytesIO(cv_bytes) if cv_bytes else None
-
-        result = asyncio.run(service.analyze_results(
-            cv_file=cv_file,
+        analysis = _analyze_results(
+            AnalysisService(),
+            cv_bytes=cv_bytes,
             cv_filename=cv_filename,
             video_link=video_link,
             competency_matrix_link=competency_matrix_link,
             department_values_link=department_values_link,
             employee_portrait_link=employee_portrait_link,
             job_requirements_link=job_requirements_link
-        ))
+        )
+        # DELETE /api/results/{job_id} помечает задачу отмененной; пайплайн останавливается на ближайшем шаге.
+        with _profiled(job):
+            report = asyncio.run(run_cancellable(job.connection, job.id, analysis) if job else analysis)
+        return _store_report(job, report, job_requirements_link)
+
+    except JobCancelled as e:
+        logger.warning(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка при выполнении задачи анализа: {e}", exc_info=True)
+        raise
+
+
+async def run_analysis_pipeline_async(service: AnalysisService, job: Job, **kwargs):
+    """
+    Асинхронный вариант run_analysis_pipeline для AsyncWorker.
+    Использует общий, заранее созданный сервис анализа и цикл событий воркера.
+    """
+    logger.info(f"Асинхронный воркер получил задачу {job.id} на анализ результатов интервью.")
+
+    try:
+        with _profiled(job):
+            report = await run_cancellable(job.connection, job.id, _analyze_results(service, **kwargs))
+        # Запись в Redis и базу отчетов блокирующая, а цикл событий общий с другими задачами воркера.
+        return await asyncio.to_thread(_store_report, job, report, kwargs["job_requirements_link"])
 
-        logger.success(f"Анализ успешно завершен. Результат: {result.message}")
+    except JobCancelled as e:
+        logger.warning(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка при выполнении задачи анализа {job.id}: {e}", exc_info=True)
+        raise
 
-        return result.model_dump()
 
+async def _prepare_batch(
+        service: AnalysisService,
+        connection: Redis,
+        batch_id: str,
+        candidates: List[Dict[str, Any]],
+        requirements_link: str
+) -> Dict[str, Any]:
+    """
+    Разбирает требования вакансии один раз и готовит отчеты для всех кандидатов пакета
+    с ограниченной параллельностью. Статус каждого кандидата сохраняется в batch_store.
+    """
+    try:
+        parsed_requirements = await service.parse_requirements(requirements_link)
     except Exception as e:
-        logger.error(f"Ошибка при выполнении задачи анализа: {e}", exc_info=True)
+        logger.error(f"Пакет {batch_id}: не удалось разобрать требования вакансии: {e}", exc_info=True)
+        for index, candidate in enumerate(candidates):
+            await asyncio.to_thread(batch_store.update_candidate, connection, batch_id, {
+                "index": index, "filename": candidate["cv_filename"], "status": "failed", "error": str(e)
+            })
         raise
+
+    semaphore = asyncio.Semaphore(settings.prep_batch_concurrency)
+
+    async def prepare_candidate(index: int, candidate: Dict[str, Any]) -> bool:
+        entry = {"index": index, "filename": candidate["cv_filename"]}
+        async with semaphore:
+            # Вызовы Redis блокирующие, а в AsyncWorker цикл событий общий с другими задачами.
+            await asyncio.to_thread(batch_store.update_candidate, connection, batch_id, {**entry, "status": "started"})
+            try:
+                result = await service.analyze_preparation(
+                    cv_file=io.BytesIO(candidate["cv_bytes"]),
+                    cv_filename=candidate["cv_filename"],
+                    feedback_text=candidate["feedback_text"],
+                    requirements_link=requirements_link,
+                    parsed_requirements=parsed_requirements
+                )
+            except Exception as e:
+                logger.error(f"Пакет {batch_id}: ошибка при анализе кандидата #{index}: {e}", exc_info=True)
+                await asyncio.to_thread(
+                    batch_store.update_candidate, connection, batch_id, {**entry, "status": "failed", "error": str(e)}
+                )
+                return False
+
+            result_id = batch_store.candidate_result_id(batch_id, index)
+            report = result.model_dump()
+            await asyncio.to_thread(save_result, connection, result_id, report)
+            await asyncio.to_thread(
+                report_store.save_report_safely, result_id, report_store.PREPARATION, report, requirements_link
+            )
+            await asyncio.to_thread(batch_store.update_candidate, connection, batch_id, {**entry, "status": "finished"})
+            return True
+
+    outcomes = await asyncio.gather(*(prepare_candidate(i, c) for i, c in enumerate(candidates)))
+    finished = sum(outcomes)
+    logger.success(f"Пакет {batch_id} обработан: успешно {finished}, с ошибкой {len(outcomes) - finished}.")
+    return {"batch_id": batch_id, "finished": finished, "failed": len(outcomes) - finished}
+
+
+def run_preparation_batch(batch_id: str, candidates: List[Dict[str, Any]], requirements_link: str):
+    """
+    Эта функция выполняется воркером RQ: подготовка к интервью для пакета кандидатов одной вакансии.
+    """
+    logger.info(f"Воркер получил пакет {batch_id} из {len(candidates)} кандидатов.")
+    job = get_current_job()
+    service = AnalysisService(max_concurrency=settings.prep_batch_concurrency)
+    with _profiled(job):
+        return asyncio.run(_prepare_batch(service, job.connection, batch_id, candidates, requirements_link))
+
+
+async def run_preparation_batch_async(service: AnalysisService, job: Job, **kwargs):
+    """Асинхронный вариант run_preparation_batch для AsyncWorker."""
+    logger.info(f"Асинхронный воркер получил пакет {kwargs['batch_id']} из {len(kwargs['candidates'])} кандидатов.")
+    with _profiled(job):
+        return await _prepare_batch(service, job.connection, **kwargs)
+
+
+def _render_export(connection: Redis, report_hash: str, export_format: str) -> str:
+    report = export_store.load_source(connection, report_hash)
+    if report is None:
+        raise ValueError(f"Исходный отчет для экспорта {report_hash} не найден или устарел.")
+    content = report_export.render(report_export.parse_report(report), export_format)
+    logger.success(f"Экспорт {report_hash}.{export_format} готов ({len(content)} байт).")
+    return export_store.save_file(connection, report_hash, export_format, content)
+
+
+def render_report_export(report_hash: str, export_format: str):
+    """
+    Эта функция выполняется воркером RQ в интерактивной очереди: рендер отчета в DOCX или PDF.
+    """
+    logger.info(f"Воркер получил задачу на экспорт отчета {report_hash} в {export_format}.")
+    return _render_export(get_current_job().connection, report_hash, export_format)
+
+
+async def render_report_export_async(service: AnalysisService, job: Job, **kwargs):
+    """Асинхронный вариант render_report_export: рендер занимает CPU, поэтому выполняется в потоке."""
+    logger.info(f"Асинхронный воркер получил задачу на экспорт отчета {kwargs['report_hash']}.")
+    return await asyncio.to_thread(_render_export, job.connection, **kwargs)
+
+
+ASYNC_TASKS = {
+    "backend.queue.tasks.run_analysis_pipeline": run_analysis_pipeline_async,
+    "backend.queue.tasks.run_preparation_batch": run_preparation_batch_async,
+    "backend.queue.tasks.render_report_export": render_report_export_async,
+}
@@ -0,0 +1,24 @@
+import os
+
+from loguru import logger
+
+
+async def notify_worker() -> None:
+    """
+    Отправляет 'пинок' сервису воркеров, чтобы он начал разбирать очередь.
+    Ошибки только логируются: задача уже в очереди и будет обработана позже.
+    """
+    try:
+        worker_url = os.getenv("WORKER_URL")
+        if worker_url:
+            logger.info(f"Отправка 'пинка' воркеру по адресу: {worker_url}")
+            import httpx
+
+            async with httpx.AsyncClient() as client:
+                response = await client.post(f"{worker_url}/process", timeout=10.0)
+                logger.info(f"'Пинок' воркеру отправлен. Статус ответа воркера: {response.status_code}")
+        else:
+            logger.warning("Переменная окружения WORKER_URL не установлена. 'Пинок' не отправлен.")
+
+    except Exception as e:
+        logger.error(f"Не удалось отправить 'пинок' воркеру: {e}", exc_info=True)
@@ -1,39 +1,129 @@
+import argparse
+import asyncio
 import os
+import signal
 import time
 
 from loguru import logger
-from redis import from_url
+from redis import Redis, from_url
 from redis.exceptions import ConnectionError
-from rq import Worker
+from rq import Queue, Worker
+from rq.job import Job
 
-listen = ["results_processing"]
+from backend.core.config import settings
+from backend.queue.memory_watchdog import RecyclePolicy, track_job_memory
+from backend.queue.scheduling import INTERACTIVE_QUEUE, QUEUE_PRIORITIES
+from backend.utils import tracing
+
+listen = QUEUE_PRIORITIES
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-conn = None
 
 retry_interval = 5
 max_retries = 12
 
-for i in range(max_retries):
-    try:
-        conn = from_url(redis_url)
-        conn.ping()
-        logger.success("Успешное подключение к Redis!")
-        break
-    except ConnectionError as e:
-        logger.warning(f"Не удалось подключиться к Redis: {e}. Попытка {i + 1} из {max_retries}...")
-        if i == max_retries - 1:
-            logger.error("Не удалось подключиться к Redis после нескольких попыток. Воркер останавливается.")
-            exit(1)
-        time.sleep(retry_interval)
 
+class InstrumentedJob(Job):
+    """RQ job that runs inside the trace of the request that enqueued it and reports its memory use."""
 
-if __name__ == '__main__':
-    if conn:
-        logger.info(f"Запускаю воркер RQ, который слушает очереди: {listen}")
-        worker = Worker(
-            queues=listen,
-            connection=conn
+    def perform(self):
+        try:
+            with tracing.job_span(self), track_job_memory(self):
+                return super().perform()
+        finally:
+            # The forked work horse exits right after the job, before the batch exporter's next run.
+            tracing.flush()
+
+
+class RecyclingWorker(Worker):
+    """
+    Forking RQ worker that shuts down warmly after a job once its RecyclePolicy says so.
+    Job memory is freed with each work horse, so the policy watches the long-lived parent
+    process; the job count limit is left to ``work(max_jobs=...)``.
+    """
+
+    def __init__(self, *args, recycle_policy: RecyclePolicy, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recycle_policy = recycle_policy
+
+    def execute_job(self, job: Job, queue: Queue):
+        super().execute_job(job, queue)
+        reason = self.recycle_policy.job_finished()
+        if reason:
+            logger.info(f"Воркер {self.name} завершается для перезапуска: {reason}.")
+            # The same warm shutdown as on SIGTERM: the worker is idle here, so the work loop ends.
+            self.request_stop(signal.SIGTERM, None)
+
+
+def connect_to_redis() -> Redis:
+    """Подключается к Redis с повторными попытками. Завершает процесс, если Redis недоступен."""
+    for i in range(max_retries):
+        try:
+            conn = from_url(redis_url)
+            conn.ping()
+            logger.success("Успешное подключение к Redis!")
+            return conn
+        except ConnectionError as e:
+            logger.warning(f"Не удалось подключиться к Redis: {e}. Попытка {i + 1} из {max_retries}...")
+            if i == max_retries - 1:
+                logger.error("Не удалось подключиться к Redis после нескольких попыток. Воркер останавливается.")
+                exit(1)
+            time.sleep(retry_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RQ воркер для обработки задач анализа.")
+    parser.add_argument("--burst", action="store_true", help="Завершить работу, когда очереди опустеют.")
+    parser.add_argument(
+        "--queues",
+        nargs="+",
+        default=listen,
+        help="Очереди в порядке приоритета."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["rq", "async"],
+        default=settings.worker_mode,
+        help="rq - стандартный воркер с fork на задачу, async - один цикл событий и несколько задач на процесс."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.worker_async_concurrency,
+        help="Число одновременных задач в режиме async."
+    )
+    args = parser.parse_args()
+
+    conn = connect_to_redis()
+    tracing.configure_tracing("interview-worker")
+
+    if args.mode == "async":
+        from backend.queue.async_worker import AsyncWorker
+
+        queues = [Queue(name, connection=conn) for name in args.queues]
+        worker = AsyncWorker(
+            queues=queues,
+            connection=conn,
+            concurrency=args.concurrency,
+            interactive_queue=INTERACTIVE_QUEUE,
+            reserved_interactive=settings.worker_reserved_interactive_slots,
+            recycle_policy=RecyclePolicy.from_settings()
         )
-        worker.work(logging_level="INFO")
-    else:
-        logger.error("Соединение с Redis не установлено. Воркер не может быть запущен.")
+        asyncio.run(worker.run(burst=args.burst))
+        return
+
+    # RQ forks a process per job; importing the tasks here lets every fork inherit
+    # google-adk and the other heavy modules instead of importing them again.
+    import backend.queue.tasks  # noqa: F401
+
+    logger.info(f"Запускаю воркер RQ, который слушает очереди: {args.queues}")
+    worker = RecyclingWorker(
+        queues=args.queues,
+        connection=conn,
+        job_class=InstrumentedJob,
+        recycle_policy=RecyclePolicy(max_rss_mb=settings.worker_max_rss_mb)
+    )
+    worker.work(burst=args.burst, logging_level="INFO", max_jobs=settings.worker_max_jobs or None)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,33 +3,58 @@ import json
 import io
 import asyncio
 import base64
-from typing import Optional
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from loguru import logger
 
 from backend.api.models import PreparationAnalysis, ResultsAnalysis, FullReport
 from ..core.config import settings
+from backend.services.resilience import AgentDeadlineExceeded, agent_deadline
 from backend.utils import file_processing as fp
-from backend.agents.pipeline_1_pre_interview.agent_1_data_parser import agent_1_data_parser
+from backend.utils.json_stream import IncrementalJSONParser
+from backend.utils.matrix_index import select_relevant_rows, topic_coverage
+from backend.utils.metrics import stage
+from backend.utils.transcript import strip_turn_refs
+from backend.agents.pipeline_1_pre_interview.agent_1_data_parser import (
+    agent_1_candidate_parser,
+    agent_1_data_parser,
+    agent_1_requirements_parser,
+)
 from backend.agents.pipeline_1_pre_interview.agent_2_grader import agent_2_grader
 from backend.agents.pipeline_1_pre_interview.agent_3_report_generator import agent_3_report_generator
 from backend.agents.pipeline_2_post_interview.agent_4_topic_extractor import agent_4_topic_extractor
 from backend.agents.pipeline_2_post_interview.agent_5_final_report_generator import agent_5_final_report_generator
 
 import assemblyai as aai
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 import httplib2
 from google_auth_httplib2 import AuthorizedHttp
 
 
+# Report sections of agent 3 that are sent to the client as soon as they are complete.
+PREPARATION_STREAM_SECTIONS = [
+    ("report", "first_name"),
+    ("report", "last_name"),
+    ("report", "matching_table", "*"),
+    ("report", "candidate_profile"),
+    ("report", "conclusion", "summary"),
+    ("report", "conclusion", "recommendations"),
+    ("report", "conclusion", "interview_topics"),
+    ("report", "conclusion", "values_assessment"),
+]
+
+
 class AnalysisService:
     """Service responsible for interview analysis business logic using AI Agents"""
 
-    def __init__(self):
-        self.semaphore = asyncio.Semaphore(1)
+    def __init__(self, max_concurrency: int = 1):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
         if settings.assemblyai_api_key:
             aai.settings.api_key = settings.assemblyai_api_key
             logger.success("AssemblyAI client configured.")
@@ -47,13 +72,19 @@ class AnalysisService:
             creds = service_account.Credentials.from_service_account_info(credentials_info)
             scoped_credentials = creds.with_scopes(['https://www.googleapis.com/auth/drive'])
 
-            http_client_with_timeout = httplib2.Http(timeout=900)
+            def new_authed_http() -> AuthorizedHttp:
+                return AuthorizedHttp(scoped_credentials, http=httplib2.Http(timeout=900))
+
+            def build_request(_http, *args, **kwargs) -> HttpRequest:
+                # httplib2.Http is not thread-safe: every request gets its own connection,
+                # so concurrent downloads of a shared service do not interfere.
+                return HttpRequest(new_authed_http(), *args, **kwargs)
 
-            authed_http = AuthorizedHttp(scoped_credentials, http=http_client_with_timeout)
             self.drive_service = build(
                 'drive',
                 'v3',
-                http=authed_http,
+                http=new_authed_http(),
+                requestBuilder=build_request,
                 cache_discovery=False
             )
 
@@ -61,40 +92,161 @@ class AnalysisService:
         except Exception as e:
             logger.error(f"Error initializing Google Drive API client: {e}", exc_info=True)
 
-    def _set_google_api_key(self):
-        """Sets the Google API key as an environment variable for the current request."""
-        api_key_to_use = settings.google_api_key
-        if not api_key_to_use:
-            logger.error("Google API key (google_api_key) not found in .env file.")
-            raise ValueError("Google API key is not provided.")
-        os.environ['GOOGLE_API_KEY'] = api_key_to_use
-        logger.info("Google API key set as an environment variable for the current request.")
-
-    async def analyze_preparation(
+    async def _run_agent(
             self,
-            cv_file: io.BytesIO,
-            cv_filename: str,
-            feedback_text: str,
-            requirements_link: str
-    ) -> PreparationAnalysis:
+            agent,
+            label: str,
+            session_service: InMemorySessionService,
+            session_id: str,
+            user_id: str,
+            message: types.Content
+    ) -> Tuple[str, int]:
+        """
+        Runs a single agent in the given session and returns its text output and the tokens used.
+        Raises AgentDeadlineExceeded if the agent does not finish within its deadline.
+        """
+        logger.info(f"🚀 Running {label} ({agent.name})...")
+        runner = Runner(agent=agent, app_name=settings.app_name, session_service=session_service)
+        output = ""
+        tokens_used = 0
+        deadline = agent_deadline(agent.name)
+        timeout = asyncio.timeout(deadline)
+        try:
+            async with timeout:
+                with stage(f"agent:{agent.name}"):
+                    async for event in runner.run_async(session_id=session_id, user_id=user_id, new_message=message):
+                        if event.usage_metadata:
+                            tokens_used += event.usage_metadata.total_token_count or 0
+                            logger.info(
+                                f"Tokens ({label}): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
+                        if event.content and event.content.parts:
+                            output += "".join(part.text for part in event.content.parts if part.text)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            logger.error(f"{label} ({agent.name}) did not finish within {deadline:.0f}s.")
+            raise AgentDeadlineExceeded(f"{label} did not finish within {deadline:.0f}s.") from None
+        return output, tokens_used
+
+    async def _stream_agent(
+            self,
+            agent,
+            label: str,
+            session_service: InMemorySessionService,
+            session_id: str,
+            user_id: str,
+            message: types.Content
+    ) -> AsyncIterator[Event]:
+        """
+        Streams the events of a single agent run (SSE mode) under the same deadline as ``_run_agent``.
+        Only waiting for the next event counts against the deadline, not the consumer's work between
+        events; the model calls go through ManagedGemini and its circuit breaker as usual.
+        """
+        logger.info(f"🚀 Streaming {label} ({agent.name})...")
+        runner = Runner(agent=agent, app_name=settings.app_name, session_service=session_service)
+        deadline = agent_deadline(agent.name)
+        expires_at = asyncio.get_running_loop().time() + deadline
+        events = runner.run_async(
+            session_id=session_id,
+            user_id=user_id,
+            new_message=message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+        )
+        try:
+            with stage(f"agent:{agent.name}"):
+                while True:
+                    timeout = asyncio.timeout_at(expires_at)
+                    try:
+                        async with timeout:
+                            event = await anext(events)
+                    except StopAsyncIteration:
+                        return
+                    except TimeoutError:
+                        if not timeout.expired():
+                            raise
+                        logger.error(f"{label} ({agent.name}) did not finish within {deadline:.0f}s.")
+                        raise AgentDeadlineExceeded(f"{label} did not finish within {deadline:.0f}s.") from None
+                    yield event
+        finally:
+            await events.aclose()
+
+    @staticmethod
+    def _topics_from_output(agent_4_output: str) -> List[str]:
+        """
+        Topics found by agent 4 without their turn references; the raw output is used as a
+        single topic if it is not valid JSON. Agent 5 still gets the raw output with the references.
+        """
+        try:
+            topics = json.loads(fp.extract_json_from_string(agent_4_output)).get("topics", [])
+            return [strip_turn_refs(str(topic)) for topic in topics]
+        except (json.JSONDecodeError, AttributeError):
+            return [agent_4_output]
+
+    async def parse_requirements(self, requirements_link: str) -> str:
+        """
+        Downloads and parses the vacancy requirements once, so that a batch of candidates
+        for the same vacancy can share them. Returns the `job_requirements` object as JSON.
+        """
         async with self.semaphore:
-            logger.info("Starting candidate evaluation process (Pipeline 1)...")
-            pipeline_tokens_used = 0
-
-            self._set_google_api_key()
-
-            cv_text = fp.read_file_content(cv_file, cv_filename)
+            logger.info("Parsing vacancy requirements for a batch of candidates...")
 
             requirements_file_id = fp.get_google_drive_file_id(requirements_link)
-            requirements_text = await fp.download_sheet_from_drive(self.drive_service, requirements_file_id)
+            with stage("drive:sheets"):
+                requirements_text = await fp.download_sheet_from_drive(self.drive_service, requirements_file_id)
 
             session_service = InMemorySessionService()
-            session_id = f"prep_session_{os.urandom(8).hex()}"
+            session_id = f"requirements_session_{os.urandom(8).hex()}"
             user_id = "prep_user"
             await session_service.create_session(app_name=settings.app_name, user_id=user_id, session_id=session_id)
 
-            logger.info("🚀 Running agent_1_data_parser...")
-            runner_1 = Runner(agent=agent_1_data_parser, app_name=settings.app_name, session_service=session_service)
+            message = types.Content(role="user", parts=[types.Part(text=f"requirements_text: {requirements_text}")])
+            output, tokens_used = await self._run_agent(
+                agent_1_requirements_parser, "Agent 1 (requirements)", session_service, session_id, user_id, message
+            )
+            self.session_total_tokens += tokens_used
+
+            try:
+                data = json.loads(fp.extract_json_from_string(output))
+            except json.JSONDecodeError as e:
+                logger.error(f"Error decoding requirements JSON: {e}\nReceived text: {output}")
+                raise ValueError("AI service returned an invalid data format.")
+            return json.dumps(data.get("job_requirements", data), ensure_ascii=False)
+
+    @staticmethod
+    def _merge_candidate_with_requirements(candidate_output: str, parsed_requirements: str) -> str:
+        """Builds the agent_1 output format from a candidate-only parse and pre-parsed requirements."""
+        try:
+            candidate_data = json.loads(fp.extract_json_from_string(candidate_output))
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding JSON from Agent 1: {e}\nReceived text: {candidate_output}")
+            raise ValueError("AI service returned an invalid data format.")
+        candidate_data["job_requirements"] = json.loads(parsed_requirements)
+        return json.dumps(candidate_data, ensure_ascii=False)
+
+    async def _run_preparation_agents_1_2(
+            self,
+            cv_file: io.BytesIO,
+            cv_filename: str,
+            feedback_text: str,
+            requirements_link: str,
+            parsed_requirements: Optional[str],
+            session_service: InMemorySessionService,
+            session_id: str,
+            user_id: str
+    ) -> Tuple[str, int]:
+        """Parses the inputs (agent 1) and grades the candidate (agent 2). Returns agent 2's output and tokens."""
+        pipeline_tokens_used = 0
+
+        with stage("cv:parse"):
+            cv_text = fp.read_file_content(cv_file, cv_filename)
+
+        requirements_text = None
+        if parsed_requirements is None:
+            requirements_file_id = fp.get_google_drive_file_id(requirements_link)
+            with stage("drive:sheets"):
+                requirements_text = await fp.download_sheet_from_drive(self.drive_service, requirements_file_id)
+
+        if parsed_requirements is None:
             message_for_agent_1 = types.Content(
                 role="user",
                 parts=[
@@ -103,63 +255,135 @@ class AnalysisService:
                     types.Part(text=f"feedback_text: {feedback_text}")
                 ]
             )
-            agent_1_output = ""
-            async for event in runner_1.run_async(session_id=session_id, user_id=user_id,
-                                                  new_message=message_for_agent_1):
-                if event.usage_metadata:
-                    pipeline_tokens_used += event.usage_metadata.total_token_count
-                    logger.info(
-                        f"Tokens (Agent 1): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
-                if event.content and event.content.parts:
-                    agent_1_output += "".join(part.text for part in event.content.parts if part.text)
-
-            logger.info("🚀 Running agent_2_grader...")
-            runner_2 = Runner(agent=agent_2_grader, app_name=settings.app_name, session_service=session_service)
-            message_for_agent_2 = types.Content(role="user", parts=[types.Part(text=agent_1_output)])
-            agent_2_output = ""
-            async for event in runner_2.run_async(session_id=session_id, user_id=user_id,
-                                                  new_message=message_for_agent_2):
-                if event.usage_metadata:
-                    pipeline_tokens_used += event.usage_metadata.total_token_count
-                    logger.info(
-                        f"Tokens (Agent 2): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
-                if event.content and event.content.parts:
-                    agent_2_output += "".join(part.text for part in event.content.parts if part.text)
-
-            logger.info("🚀 Running agent_3_report_generator...")
-            runner_3 = Runner(agent=agent_3_report_generator, app_name=settings.app_name,
-                              session_service=session_service)
+            agent_1_output, tokens_used = await self._run_agent(
+                agent_1_data_parser, "Agent 1", session_service, session_id, user_id, message_for_agent_1
+            )
+        else:
+            message_for_agent_1 = types.Content(
+                role="user",
+                parts=[
+                    types.Part(text=f"cv_text: {cv_text}"),
+                    types.Part(text=f"feedback_text: {feedback_text}")
+                ]
+            )
+            candidate_output, tokens_used = await self._run_agent(
+                agent_1_candidate_parser, "Agent 1", session_service, session_id, user_id, message_for_agent_1
+            )
+            agent_1_output = self._merge_candidate_with_requirements(candidate_output, parsed_requirements)
+        pipeline_tokens_used += tokens_used
+
+        message_for_agent_2 = types.Content(role="user", parts=[types.Part(text=agent_1_output)])
+        agent_2_output, tokens_used = await self._run_agent(
+            agent_2_grader, "Agent 2", session_service, session_id, user_id, message_for_agent_2
+        )
+        pipeline_tokens_used += tokens_used
+        return agent_2_output, pipeline_tokens_used
+
+    @staticmethod
+    async def _new_session(prefix: str, user_id: str) -> Tuple[InMemorySessionService, str]:
+        session_service = InMemorySessionService()
+        session_id = f"{prefix}_{os.urandom(8).hex()}"
+        await session_service.create_session(app_name=settings.app_name, user_id=user_id, session_id=session_id)
+        return session_service, session_id
+
+    @staticmethod
+    def _parse_preparation_output(final_output: str) -> PreparationAnalysis:
+        logger.info("Parsing final output...")
+        try:
+            clean_json_str = final_output.strip().replace("```json", "").replace("```", "").strip()
+            data = json.loads(clean_json_str)
+
+            final_response_data = {
+                "message": "Interview preparation report created successfully.",
+                **data
+            }
+            return PreparationAnalysis(**final_response_data)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding JSON from Agent 3: {e}\nReceived text: {final_output}")
+            raise ValueError("AI service returned an invalid data format.")
+        except Exception as e:
+            logger.error(f"Pydantic validation error or other exception: {e}")
+            raise ValueError(f"Error forming the final response: {e}")
+
+    async def analyze_preparation(
+            self,
+            cv_file: io.BytesIO,
+            cv_filename: str,
+            feedback_text: str,
+            requirements_link: str,
+            parsed_requirements: Optional[str] = None
+    ) -> PreparationAnalysis:
+        async with self.semaphore:
+            logger.info("Starting candidate evaluation process (Pipeline 1)...")
+
+            user_id = "prep_user"
+            session_service, session_id = await self._new_session("prep_session", user_id)
+
+            agent_2_output, pipeline_tokens_used = await self._run_preparation_agents_1_2(
+                cv_file, cv_filename, feedback_text, requirements_link, parsed_requirements,
+                session_service, session_id, user_id
+            )
+
             message_for_agent_3 = types.Content(role="user", parts=[types.Part(text=agent_2_output)])
-            final_output = ""
-            async for event in runner_3.run_async(session_id=session_id, user_id=user_id,
-                                                  new_message=message_for_agent_3):
-                if event.usage_metadata:
-                    pipeline_tokens_used += event.usage_metadata.total_token_count
-                    logger.info(
-                        f"Tokens (Agent 3): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
-                if event.content and event.content.parts:
-                    final_output += "".join(part.text for part in event.content.parts if part.text)
+            final_output, tokens_used = await self._run_agent(
+                agent_3_report_generator, "Agent 3", session_service, session_id, user_id, message_for_agent_3
+            )
+            pipeline_tokens_used += tokens_used
 
             self.session_total_tokens += pipeline_tokens_used
             logger.info(f"Total tokens for Pipeline 1: {pipeline_tokens_used}")
             logger.info(f"Total token consumption for the session: {self.session_total_tokens}")
 
-            logger.info("Parsing final output...")
-            try:
-                clean_json_str = final_output.strip().replace("```json", "").replace("```", "").strip()
-                data = json.loads(clean_json_str)
+            return self._parse_preparation_output(final_output)
 
-                final_response_data = {
-                    "message": "Interview preparation report created successfully.",
-                    **data
-                }
-                return PreparationAnalysis(**final_response_data)
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON from Agent 3: {e}\nReceived text: {final_output}")
-                raise ValueError("AI service returned an invalid data format.")
-            except Exception as e:
-                logger.error(f"Pydantic validation error or other exception: {e}")
-                raise ValueError(f"Error forming the final response: {e}")
+    async def stream_preparation(
+            self,
+            cv_file: io.BytesIO,
+            cv_filename: str,
+            feedback_text: str,
+            requirements_link: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of ``analyze_preparation``. Yields ``(event, data)`` pairs:
+        ``stage`` when a step starts, ``section`` for every report section agent 3 has
+        closed so far, and finally ``report`` with the validated PreparationAnalysis.
+        """
+        async with self.semaphore:
+            logger.info("Starting streamed candidate evaluation (Pipeline 1)...")
+
+            user_id = "prep_user"
+            session_service, session_id = await self._new_session("prep_stream_session", user_id)
+
+            yield "stage", {"stage": "parsing"}
+            agent_2_output, pipeline_tokens_used = await self._run_preparation_agents_1_2(
+                cv_file, cv_filename, feedback_text, requirements_link, None,
+                session_service, session_id, user_id
+            )
+
+            yield "stage", {"stage": "report"}
+            parser = IncrementalJSONParser(watch=PREPARATION_STREAM_SECTIONS)
+            message_for_agent_3 = types.Content(role="user", parts=[types.Part(text=agent_2_output)])
+            final_output = None
+            async for event in self._stream_agent(
+                    agent_3_report_generator, "Agent 3", session_service, session_id, user_id, message_for_agent_3
+            ):
+                text = "".join(part.text for part in event.content.parts if part.text) \
+                    if event.content and event.content.parts else ""
+                if event.partial:
+                    for path, value in parser.feed(text):
+                        yield "section", {"path": list(path), "value": value}
+                    continue
+                if event.usage_metadata:
+                    pipeline_tokens_used += event.usage_metadata.total_token_count or 0
+                if text:
+                    final_output = text
+
+            # The final event carries the whole text; it is the source of truth for the report.
+            final_output = final_output if final_output is not None else parser.text
+            self.session_total_tokens += pipeline_tokens_used
+            logger.info(f"Total tokens for streamed Pipeline 1: {pipeline_tokens_used}")
+
+            yield "report", self._parse_preparation_output(final_output)
 
     async def analyze_results(
             self,
@@ -175,7 +399,8 @@ class AnalysisService:
         cv_text: str
         if cv_file and cv_filename:
             logger.info(f"Processing provided CV file: {cv_filename}")
-            cv_text = fp.read_file_content(cv_file, cv_filename)
+            with stage("cv:parse"):
+                cv_text = fp.read_file_content(cv_file, cv_filename)
         else:
             logger.info("CV file was not provided for this analysis.")
             cv_text = "CV was not provided for this analysis."
@@ -187,19 +412,19 @@ class AnalysisService:
             temp_audio_path = None
 
             try:
-                self._set_google_api_key()
-
                 logger.info("Starting audio processing pipeline...")
                 logger.info(f"Extracting file ID from Google Drive link: {video_link}")
                 video_file_id = fp.get_google_drive_file_id(video_link)
                 logger.info(f"Successfully extracted file ID: {video_file_id}")
 
                 logger.info(f"Starting download for file ID {video_file_id}...")
-                temp_audio_path = await fp.download_audio_from_drive_to_temp_file(self.drive_service, video_file_id)
+                with stage("drive:audio"):
+                    temp_audio_path = await fp.download_audio_from_drive_to_temp_file(self.drive_service, video_file_id)
                 logger.success(f"File successfully downloaded to temporary path: {temp_audio_path}")
 
                 logger.info(f"Sending downloaded file for transcription...")
-                transcription_text = await fp.transcribe_audio_assemblyai(temp_audio_path)
+                with stage("transcription"):
+                    transcription_text = await fp.transcribe_audio_assemblyai(temp_audio_path)
                 logger.success("Transcription received successfully.")
 
                 if not transcription_text:
@@ -217,11 +442,12 @@ class AnalysisService:
                 }
 
                 drive_data = {}
-                for key, link in links.items():
-                    file_id = fp.get_google_drive_file_id(link)
-                    logger.info(f"Downloading sheet '{key}' with ID: {file_id}...")
-                    data = await fp.download_sheet_from_drive(self.drive_service, file_id)
-                    drive_data[key] = data
+                with stage("drive:sheets"):
+                    for key, link in links.items():
+                        file_id = fp.get_google_drive_file_id(link)
+                        logger.info(f"Downloading sheet '{key}' with ID: {file_id}...")
+                        data = await fp.download_sheet_from_drive(self.drive_service, file_id)
+                        drive_data[key] = data
 
                 matrix_text = drive_data["matrix"]
                 values_text = drive_data["values"]
@@ -232,19 +458,19 @@ class AnalysisService:
                 user_id = "results_user"
                 await session_service.create_session(app_name=settings.app_name, user_id=user_id, session_id=session_id)
 
-                logger.info("🚀 Running agent_4_topic_extractor...")
-                runner_4 = Runner(agent=agent_4_topic_extractor, app_name=settings.app_name,
-                                  session_service=session_service)
                 message_for_agent_4 = types.Content(role="user", parts=[types.Part(text=transcription_text)])
-                agent_4_output = ""
-                async for event in runner_4.run_async(session_id=session_id, user_id=user_id,
-                                                      new_message=message_for_agent_4):
-                    if event.usage_metadata:
-                        pipeline_tokens_used += event.usage_metadata.total_token_count
-                        logger.info(
-                            f"Tokens (Agent 4): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
-                    if event.content and event.content.parts:
-                        agent_4_output += "".join(part.text for part in event.content.parts if part.text)
+                agent_4_output, tokens_used = await self._run_agent(
+                    agent_4_topic_extractor, "Agent 4", session_service, session_id, user_id, message_for_agent_4
+                )
+                pipeline_tokens_used += tokens_used
+
+                topics = self._topics_from_output(agent_4_output)
+                with stage("matrix:select"):
+                    matrix_coverage = topic_coverage(matrix_text, topics)
+                    matrix_text, kept_rows, total_rows = select_relevant_rows(
+                        matrix_text, topics, transcription_text, settings.matrix_max_rows
+                    )
+                logger.info(f"Competency matrix: {kept_rows} of {total_rows} rows are relevant to the interview.")
 
                 combined_input_for_agent_5 = (
                     f"### Список тем/вопросов интервью:\n{agent_4_output}\n\n"
@@ -256,19 +482,11 @@ class AnalysisService:
                     f"### Портрет идеального сотрудника:\n{portrait_text}"
                 )
 
-                logger.info("🚀 Running agent_5_final_report_generator...")
-                runner_5 = Runner(agent=agent_5_final_report_generator, app_name=settings.app_name,
-                                  session_service=session_service)
                 message_for_agent_5 = types.Content(role="user", parts=[types.Part(text=combined_input_for_agent_5)])
-                agent_5_output = ""
-                async for event in runner_5.run_async(session_id=session_id, user_id=user_id,
-                                                      new_message=message_for_agent_5):
-                    if event.usage_metadata:
-                        pipeline_tokens_used += event.usage_metadata.total_token_count
-                        logger.info(
-                            f"Tokens (Agent 5): Input={event.usage_metadata.prompt_token_count}, Output={event.usage_metadata.candidates_token_count}, Total={event.usage_metadata.total_token_count}")
-                    if event.content and event.content.parts:
-                        agent_5_output += "".join(part.text for part in event.content.parts if part.text)
+                agent_5_output, tokens_used = await self._run_agent(
+                    agent_5_final_report_generator, "Agent 5", session_service, session_id, user_id, message_for_agent_5
+                )
+                pipeline_tokens_used += tokens_used
 
                 self.session_total_tokens += pipeline_tokens_used
                 logger.info(f"Total tokens for Pipeline 2: {pipeline_tokens_used}")
@@ -283,13 +501,15 @@ class AnalysisService:
                     report_data = json.loads(clean_json_str_5)
 
                     if "topics" in topics_data and "interview_analysis" in report_data:
-                        report_data["interview_analysis"]["topics"] = topics_data["topics"]
+                        # Turn references are for agent 5 only; the report shows plain topic names.
+                        report_data["interview_analysis"]["topics"] = topics
 
                     full_report = FullReport(**report_data)
 
                     return ResultsAnalysis(
                         message="Interview analysis completed successfully",
-                        report=full_report
+                        report=full_report,
+                        matrix_coverage=matrix_coverage
                     )
                 except json.JSONDecodeError as e:
                     logger.error(f"Error decoding JSON: {e}")
@@ -0,0 +1,124 @@
+"""
+Pool of Gemini credentials and the per-key API clients built from them.
+
+Every Gemini call takes a credential from the pool instead of reading a
+process-global ``GOOGLE_API_KEY``, so concurrent requests never race on the
+environment and throughput grows with the number of keys: each call goes to
+the healthy key with the most quota left in the cluster-wide rate limiter.
+A key that answers 429 is put on a cooldown and skipped until it expires.
+"""
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from google.genai import Client, types
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.rate_limiter import api_key_id, get_rate_limiter
+
+VERTEX_PREFIX = "vertex:"
+DEFAULT_VERTEX_LOCATION = "us-central1"
+
+
+@dataclass(frozen=True)
+class GeminiCredential:
+    """An API key, or a Vertex AI project (``vertex:<project>[:<location>]``) used with the service account."""
+
+    key_id: str
+    api_key: Optional[str] = None
+    project: Optional[str] = None
+    location: Optional[str] = None
+
+    @classmethod
+    def parse(cls, value: str) -> "GeminiCredential":
+        value = value.strip()
+        if value.startswith(VERTEX_PREFIX):
+            project, _, location = value[len(VERTEX_PREFIX):].partition(":")
+            return cls(key_id=api_key_id(value), project=project, location=location or DEFAULT_VERTEX_LOCATION)
+        return cls(key_id=api_key_id(value), api_key=value)
+
+    def new_client(self, http_options: Optional[types.HttpOptions] = None) -> Client:
+        if self.project:
+            return Client(vertexai=True, project=self.project, location=self.location, http_options=http_options)
+        return Client(api_key=self.api_key, http_options=http_options)
+
+
+class GeminiKeyPool:
+    """
+    Chooses the credential for each Gemini call and keeps one client per credential.
+
+    Keys are ranked by the quota left for the model, read from the shared rate limiter;
+    ties (and a Redis outage) fall back to round robin, so load spreads over all keys.
+    Health is tracked per process: consecutive failures put a key on an exponentially
+    growing cooldown, and a success clears it.
+    """
+
+    def __init__(self, credentials: List[GeminiCredential]):
+        if not credentials:
+            raise ValueError("Gemini key pool needs at least one API key or project.")
+        self.credentials = credentials
+        self._clients: Dict[str, Client] = {}
+        self._failures: Dict[str, int] = {}
+        self._cooldown_until: Dict[str, float] = {}
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def client(self, credential: GeminiCredential, http_options: Optional[types.HttpOptions] = None) -> Client:
+        with self._lock:
+            client = self._clients.get(credential.key_id)
+            if client is None:
+                client = self._clients[credential.key_id] = credential.new_client(http_options)
+            return client
+
+    def healthy(self) -> List[GeminiCredential]:
+        now = time.monotonic()
+        return [c for c in self.credentials if self._cooldown_until.get(c.key_id, 0.0) <= now]
+
+    async def choose(self, model: str) -> GeminiCredential:
+        """The healthy credential with the most quota left for ``model``; all keys if none is healthy."""
+        candidates = self.healthy() or self.credentials
+        offset = next(self._round_robin) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        if len(candidates) == 1:
+            return candidates[0]
+
+        remaining = await get_rate_limiter().remaining(model, [c.key_id for c in candidates])
+        if remaining is None:
+            return candidates[0]
+        # max() keeps the first of equal keys, so the rotated order breaks ties.
+        return max(zip(remaining, candidates), key=lambda item: item[0])[1]
+
+    def report_success(self, credential: GeminiCredential) -> None:
+        if self._failures.pop(credential.key_id, None):
+            self._cooldown_until.pop(credential.key_id, None)
+
+    def report_failure(self, credential: GeminiCredential, status_code: int) -> None:
+        failures = self._failures[credential.key_id] = self._failures.get(credential.key_id, 0) + 1
+        cooldown = min(
+            settings.gemini_key_max_cooldown_seconds, settings.gemini_key_cooldown_seconds * 2 ** (failures - 1)
+        )
+        self._cooldown_until[credential.key_id] = time.monotonic() + cooldown
+        logger.warning(
+            f"Gemini key {credential.key_id} returned {status_code}, cooling down for {cooldown:.0f}s "
+            f"({len(self.healthy())}/{len(self.credentials)} keys healthy)."
+        )
+
+
+def configured_credentials() -> List[GeminiCredential]:
+    values = settings.gemini_api_keys or [settings.google_api_key]
+    return [GeminiCredential.parse(value) for value in dict.fromkeys(v for v in values if v and v.strip())]
+
+
+_key_pool: Optional[GeminiKeyPool] = None
+
+
+def get_key_pool() -> GeminiKeyPool:
+    """Returns the process-wide pool, built from the settings on first use."""
+    global _key_pool
+    if _key_pool is None:
+        _key_pool = GeminiKeyPool(configured_credentials())
+        logger.info(f"Gemini key pool: {len(_key_pool.credentials)} credential(s).")
+    return _key_pool
@@ -0,0 +1,124 @@
+"""
+Comparable feature vectors of stored reports and vacancy-level candidate ranking.
+
+The vector is computed once when a report is saved and stored next to it as raw
+float32 bytes. Ranking the candidates of a vacancy then only stacks the stored
+vectors into one NumPy matrix and scores, filters and sorts it in a few vectorized
+operations, without touching the report JSON or calling a model.
+Features that do not apply to a report kind are NaN.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_NAMES = (
+    "full_matches",
+    "partial_matches",
+    "no_matches",
+    "match_ratio",
+    "level",
+    "recommendation",
+    "matrix_coverage",
+)
+FEATURE_INDEX = {name: position for position, name in enumerate(FEATURE_NAMES)}
+
+# Weights of the normalized features in the ranking score; missing features count as 0.
+SCORE_WEIGHTS = {"match_ratio": 0.4, "recommendation": 0.3, "level": 0.2, "matrix_coverage": 0.1}
+LEVELS = {"intern": 0.0, "junior": 1.0, "middle": 2.0, "senior": 3.0, "lead": 4.0}
+MAX_LEVEL = max(LEVELS.values())
+LEVEL_PATTERN = re.compile(r"\b(intern|junior|middle|senior|lead)\b\s*([+-]?)", re.IGNORECASE)
+
+
+def parse_level(assessed_level: Optional[str]) -> float:
+    """'Middle' -> 2.0, 'Junior+' -> 1.5, 'Middle-' -> 1.5; NaN if no known grade is mentioned."""
+    match = LEVEL_PATTERN.search(assessed_level or "")
+    if not match:
+        return np.nan
+    level = LEVELS[match.group(1).lower()]
+    return level + {"+": 0.5, "-": -0.5}.get(match.group(2), 0.0)
+
+
+def parse_recommendation(recommendation: Optional[str]) -> float:
+    """1 to recommend, 0.5 with reservations, 0 not to recommend; NaN if the verdict is unclear."""
+    text = (recommendation or "").lower()
+    if "не рекоменд" in text or "not recommend" in text:
+        return 0.0
+    if "оговорк" in text or "reservation" in text:
+        return 0.5
+    if "рекоменд" in text or "recommend" in text:
+        return 1.0
+    return np.nan
+
+
+def compute_features(kind: str, report: Dict[str, Any]) -> np.ndarray:
+    features = np.full(len(FEATURE_NAMES), np.nan, dtype=np.float32)
+    body = report.get("report") or {}
+
+    table = body.get("matching_table")
+    if table:
+        matches = [str(item.get("match", "")).strip().lower() for item in table]
+        full, partial, none = matches.count("full"), matches.count("partial"), matches.count("none")
+        features[FEATURE_INDEX["full_matches"]] = full
+        features[FEATURE_INDEX["partial_matches"]] = partial
+        features[FEATURE_INDEX["no_matches"]] = none
+        features[FEATURE_INDEX["match_ratio"]] = (full + 0.5 * partial) / len(matches)
+
+    conclusion = body.get("conclusion") or {}
+    if kind == "results":
+        features[FEATURE_INDEX["level"]] = parse_level(conclusion.get("assessed_level"))
+        features[FEATURE_INDEX["recommendation"]] = parse_recommendation(conclusion.get("recommendation"))
+        if report.get("matrix_coverage") is not None:
+            features[FEATURE_INDEX["matrix_coverage"]] = report["matrix_coverage"]
+    return features
+
+
+def encode_features(features: np.ndarray) -> bytes:
+    return features.astype(np.float32).tobytes()
+
+
+def decode_features(blobs: Sequence[bytes]) -> np.ndarray:
+    """Stacks stored vectors into an (n_reports, n_features) matrix in a single copy."""
+    if not blobs:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32)
+    return np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), len(FEATURE_NAMES))
+
+
+def score(features: np.ndarray) -> np.ndarray:
+    normalized = features.copy()
+    normalized[:, FEATURE_INDEX["level"]] /= MAX_LEVEL
+    weights = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+    for name, weight in SCORE_WEIGHTS.items():
+        weights[FEATURE_INDEX[name]] = weight
+    return np.nan_to_num(normalized) @ weights
+
+
+def rank(
+        features: np.ndarray,
+        min_level: Optional[float] = None,
+        min_match_ratio: Optional[float] = None,
+        min_recommendation: Optional[float] = None,
+        limit: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """
+    Returns ``(row, score)`` pairs of the rows that pass the filters, best first.
+    A filter on a feature drops the rows where that feature is missing.
+    """
+    mask = np.ones(len(features), dtype=bool)
+    for name, threshold in (
+            ("level", min_level), ("match_ratio", min_match_ratio), ("recommendation", min_recommendation)
+    ):
+        if threshold is not None:
+            # NaN compares as False, so rows without the feature are filtered out.
+            mask &= features[:, FEATURE_INDEX[name]] >= threshold
+
+    scores = score(features)
+    candidates = np.flatnonzero(mask)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    if limit is not None:
+        order = order[:limit]
+    return [(int(row), float(scores[row])) for row in order]
+
+
+def features_as_dict(vector: np.ndarray) -> Dict[str, Optional[float]]:
+    return {name: None if np.isnan(value) else round(float(value), 4) for name, value in zip(FEATURE_NAMES, vector)}
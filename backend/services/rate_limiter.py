@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import os
+from typing import Optional
+
+from loguru import logger
+from redis import Redis, RedisError, from_url
+
+from backend.core.config import settings
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:gemini:"
+
+# Two token buckets (requests and LLM tokens) are checked and debited atomically.
+# Each bucket is a hash {level, ts}; it refills linearly at capacity per minute.
+# Returns 0 when the request may proceed, otherwise the milliseconds to wait.
+# With force=1 the cost is debited unconditionally (used to reconcile real usage),
+# so a bucket may go negative and delay the following requests.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local force = tonumber(ARGV[5])
+local wait = 0
+local levels = {}
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[(i - 1) * 2 + 1])
+    local cost = math.min(tonumber(ARGV[(i - 1) * 2 + 2]), capacity)
+    local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    local rate = capacity / 60000
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if force == 0 and level < cost then
+        wait = math.max(wait, math.ceil((cost - level) / rate))
+    end
+end
+
+if wait > 0 then
+    return wait
+end
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[(i - 1) * 2 + 1])
+    local cost = math.min(tonumber(ARGV[(i - 1) * 2 + 2]), capacity)
+    redis.call('HSET', KEYS[i], 'level', levels[i] - cost, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return 0
+"""
+
+
+# Read-only view of the same buckets for several keys at once: for every pair of
+# bucket keys returns the refilled levels of the request and token buckets, so
+# callers can compare the quota left on each API key in one round trip.
+BUCKET_LEVELS_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local levels = {}
+
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[(i - 1) % 2 + 1])
+    local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    levels[i] = math.floor(math.min(capacity, level + math.max(0, now - ts) * capacity / 60000))
+end
+return levels
+"""
+
+
+def api_key_id(api_key: Optional[str]) -> str:
+    """Short, non-reversible identifier of an API key, used in Redis keys and logs."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+def estimate_tokens(text_length: int) -> int:
+    """Rough token estimate for Gemini: about four characters per token."""
+    return max(1, text_length // 4)
+
+
+class GeminiRateLimiter:
+    """
+    Cluster-wide token-bucket limiter for Gemini calls, shared by all API replicas and
+    workers through Redis. Buckets are kept per model and per API key, and each call is
+    charged one request plus its estimated tokens against the RPM and TPM quotas.
+
+    Redis errors never fail a call: the limiter logs them and lets the request through.
+    """
+
+    def __init__(self, connection: Redis):
+        self.connection = connection
+        self._script = connection.register_script(TOKEN_BUCKET_SCRIPT)
+        self._levels_script = connection.register_script(BUCKET_LEVELS_SCRIPT)
+
+    @staticmethod
+    def limits(model: str) -> tuple[int, int]:
+        model_limits = settings.gemini_rate_limits.get(model, {})
+        return (
+            model_limits.get("rpm", settings.gemini_default_rpm),
+            model_limits.get("tpm", settings.gemini_default_tpm),
+        )
+
+    @staticmethod
+    def _keys(model: str, key_id: str) -> list[str]:
+        prefix = f"{RATE_LIMIT_KEY_PREFIX}{model}:{key_id}"
+        return [f"{prefix}:requests", f"{prefix}:tokens"]
+
+    def _consume(self, model: str, key_id: str, requests: int, tokens: int, force: bool = False) -> int:
+        rpm, tpm = self.limits(model)
+        return int(self._script(keys=self._keys(model, key_id), args=[rpm, requests, tpm, tokens, int(force)]))
+
+    async def acquire(self, model: str, key_id: str, tokens: int) -> float:
+        """Waits until one request with ``tokens`` estimated tokens fits the quotas. Returns the time waited."""
+        waited = 0.0
+        while True:
+            try:
+                wait_ms = await asyncio.to_thread(self._consume, model, key_id, 1, tokens)
+            except RedisError as e:
+                logger.warning(f"Gemini rate limiter unavailable, proceeding without it: {e}")
+                return waited
+            if wait_ms <= 0:
+                if waited:
+                    logger.info(f"Gemini rate limit ({model}): waited {waited:.1f}s for quota.")
+                return waited
+            delay = wait_ms / 1000
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def _remaining(self, model: str, key_ids: list[str]) -> list[float]:
+        rpm, tpm = self.limits(model)
+        keys = [bucket for key_id in key_ids for bucket in self._keys(model, key_id)]
+        levels = self._levels_script(keys=keys, args=[rpm, tpm])
+        return [min(int(levels[i]) / rpm, int(levels[i + 1]) / tpm) for i in range(0, len(levels), 2)]
+
+    async def remaining(self, model: str, key_ids: list[str]) -> Optional[list[float]]:
+        """
+        Share of the RPM/TPM quota (the tighter of the two, may be negative) left on each
+        of ``key_ids`` for ``model``; None when Redis is unavailable.
+        """
+        try:
+            return await asyncio.to_thread(self._remaining, model, key_ids)
+        except RedisError as e:
+            logger.warning(f"Gemini rate limiter unavailable, quota of the keys is unknown: {e}")
+            return None
+
+    async def record_usage(self, model: str, key_id: str, extra_tokens: int) -> None:
+        """Charges tokens used above the estimate, once the real usage is known."""
+        if extra_tokens <= 0:
+            return
+        try:
+            await asyncio.to_thread(self._consume, model, key_id, 0, extra_tokens, True)
+        except RedisError as e:
+            logger.warning(f"Gemini rate limiter unavailable, usage not recorded: {e}")
+
+
+_rate_limiter: Optional[GeminiRateLimiter] = None
+
+
+def get_rate_limiter() -> GeminiRateLimiter:
+    """Returns the process-wide limiter, connecting to Redis on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = GeminiRateLimiter(from_url(os.getenv("REDIS_URL", "redis://localhost:6379")))
+    return _rate_limiter
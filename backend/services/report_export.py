@@ -0,0 +1,191 @@
+"""
+Server-side DOCX and PDF rendering of preparation and results reports.
+
+Both formats are built from the same list of blocks, so the documents have the same
+structure. Exports are content-addressed: ``report_hash`` identifies a report and the
+renderer version, and the rendered files are cached under that hash.
+"""
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple, Union
+
+from backend.api.models import PreparationAnalysis, ResultsAnalysis
+from backend.core.config import settings
+
+# Bump when the layout changes, so cached files of the old layout are not served.
+RENDERER_VERSION = 1
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+@dataclass
+class Block:
+    kind: str  # "heading", "paragraph", "field", "bullets" or "table"
+    text: str = ""
+    items: List[Any] = field(default_factory=list)
+
+
+def parse_report(report: Dict[str, Any]) -> Union[PreparationAnalysis, ResultsAnalysis]:
+    """Validates a report returned by the preparation or results pipeline."""
+    model = ResultsAnalysis if "candidate_info" in (report.get("report") or {}) else PreparationAnalysis
+    return model.model_validate(report)
+
+
+def report_hash(report: Union[PreparationAnalysis, ResultsAnalysis]) -> str:
+    canonical = json.dumps(report.model_dump(), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{RENDERER_VERSION}:{canonical}".encode("utf-8")).hexdigest()[:32]
+
+
+def _preparation_blocks(analysis: PreparationAnalysis) -> Tuple[str, List[Block]]:
+    report = analysis.report
+    name = " ".join(part for part in (report.first_name, report.last_name) if part)
+    title = f"Подготовка к интервью: {name}" if name else "Подготовка к интервью"
+    blocks = [
+        Block("heading", "Соответствие требованиям"),
+        Block("table", items=[["Критерий", "Соответствие", "Комментарий"]] + [
+            [item.criterion, item.match, item.comment] for item in report.matching_table
+        ]),
+        Block("heading", "Профиль кандидата"),
+        Block("paragraph", report.candidate_profile),
+        Block("heading", "Заключение"),
+        Block("paragraph", report.conclusion.summary),
+        Block("field", "Рекомендации", items=[report.conclusion.recommendations]),
+        Block("field", "Соответствие ценностям", items=[report.conclusion.values_assessment]),
+        Block("heading", "Темы для интервью"),
+        Block("bullets", items=report.conclusion.interview_topics),
+    ]
+    return title, blocks
+
+
+def _results_blocks(analysis: ResultsAnalysis) -> Tuple[str, List[Block]]:
+    report = analysis.report
+    info = report.candidate_info
+    return f"Результаты интервью: {info.full_name}", [
+        Block("paragraph", report.ai_summary),
+        Block("heading", "Информация о кандидате"),
+        Block("field", "Опыт", items=[info.experience_years]),
+        Block("field", "Технологии", items=[", ".join(info.tech_stack)]),
+        Block("field", "Домены", items=[", ".join(info.domains)]),
+        Block("field", "Проекты", items=[]),
+        Block("bullets", items=info.projects),
+        Block("field", "Задачи", items=[]),
+        Block("bullets", items=info.tasks),
+        Block("heading", "Анализ интервью"),
+        Block("field", "Темы", items=[]),
+        Block("bullets", items=report.interview_analysis.topics),
+        Block("field", "Техническое задание", items=[report.interview_analysis.tech_assignment]),
+        Block("field", "Оценка знаний", items=[report.interview_analysis.knowledge_assessment]),
+        Block("heading", "Коммуникация и языки"),
+        Block("field", "Коммуникативные навыки", items=[report.communication_skills.assessment]),
+        Block("field", "Иностранные языки", items=[report.foreign_languages.assessment]),
+        Block("heading", "Соответствие команде"),
+        Block("paragraph", report.team_fit),
+        Block("heading", "Дополнительная информация"),
+        Block("bullets", items=report.additional_information),
+        Block("heading", "Заключение"),
+        Block("field", "Рекомендация", items=[report.conclusion.recommendation]),
+        Block("field", "Оцененный уровень", items=[report.conclusion.assessed_level]),
+        Block("paragraph", report.conclusion.summary),
+        Block("heading", "Рекомендации кандидату"),
+        Block("bullets", items=report.recommendations_for_candidate),
+    ]
+
+
+def document_blocks(analysis: Union[PreparationAnalysis, ResultsAnalysis]) -> Tuple[str, List[Block]]:
+    if isinstance(analysis, ResultsAnalysis):
+        return _results_blocks(analysis)
+    return _preparation_blocks(analysis)
+
+
+def render_docx(analysis: Union[PreparationAnalysis, ResultsAnalysis]) -> bytes:
+    import docx
+
+    title, blocks = document_blocks(analysis)
+    document = docx.Document()
+    document.add_heading(title, level=0)
+    for block in blocks:
+        if block.kind == "heading":
+            document.add_heading(block.text, level=1)
+        elif block.kind == "paragraph":
+            document.add_paragraph(block.text)
+        elif block.kind == "field":
+            paragraph = document.add_paragraph()
+            paragraph.add_run(f"{block.text}: ").bold = True
+            paragraph.add_run(" ".join(block.items))
+        elif block.kind == "bullets":
+            for item in block.items:
+                document.add_paragraph(item, style="List Bullet")
+        elif block.kind == "table":
+            header, *rows = block.items
+            table = document.add_table(rows=1, cols=len(header))
+            table.style = "Table Grid"
+            for cell, text in zip(table.rows[0].cells, header):
+                cell.paragraphs[0].add_run(text).bold = True
+            for row in rows:
+                for cell, text in zip(table.add_row().cells, row):
+                    cell.text = text
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def render_pdf(analysis: Union[PreparationAnalysis, ResultsAnalysis]) -> bytes:
+    from fpdf import FPDF
+
+    if not os.path.exists(settings.report_font_path) or not os.path.exists(settings.report_font_bold_path):
+        raise FileNotFoundError(
+            f"PDF export needs a Unicode TTF font: {settings.report_font_path}, {settings.report_font_bold_path}"
+        )
+
+    title, blocks = document_blocks(analysis)
+    pdf = FPDF()
+    pdf.add_font("ReportFont", "", settings.report_font_path)
+    pdf.add_font("ReportFont", "B", settings.report_font_bold_path)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    width = pdf.epw
+
+    pdf.set_font("ReportFont", "B", 16)
+    pdf.multi_cell(width, 8, title, new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(2)
+    for block in blocks:
+        if block.kind == "heading":
+            pdf.ln(3)
+            pdf.set_font("ReportFont", "B", 13)
+            pdf.multi_cell(width, 7, block.text, new_x="LMARGIN", new_y="NEXT")
+        elif block.kind == "paragraph":
+            pdf.set_font("ReportFont", "", 11)
+            pdf.multi_cell(width, 6, block.text, new_x="LMARGIN", new_y="NEXT")
+        elif block.kind == "field":
+            pdf.set_font("ReportFont", "B", 11)
+            pdf.write(6, f"{block.text}: ")
+            pdf.set_font("ReportFont", "", 11)
+            pdf.write(6, " ".join(block.items))
+            pdf.ln(6)
+        elif block.kind == "bullets":
+            pdf.set_font("ReportFont", "", 11)
+            for item in block.items:
+                pdf.multi_cell(width, 6, f"• {item}", new_x="LMARGIN", new_y="NEXT")
+        elif block.kind == "table":
+            pdf.set_font("ReportFont", "", 10)
+            with pdf.table(col_widths=(3, 2, 5), first_row_as_headings=True) as table:
+                for row in block.items:
+                    table.row(row)
+
+    return bytes(pdf.output())
+
+
+def render(analysis: Union[PreparationAnalysis, ResultsAnalysis], export_format: str) -> bytes:
+    if export_format == "pdf":
+        return render_pdf(analysis)
+    if export_format == "docx":
+        return render_docx(analysis)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
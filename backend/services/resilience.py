@@ -0,0 +1,168 @@
+"""
+Tail-latency and overload controls for Gemini calls: per-agent deadlines, hedging
+delays derived from observed latencies, and a per-model circuit breaker.
+
+Latencies and breaker state are kept per process; they describe what this process
+observes and need no coordination.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from loguru import logger
+
+from backend.core.config import settings
+
+
+class AgentDeadlineExceeded(TimeoutError):
+    """An agent did not finish within its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """Calls to the model are paused because too many recent calls failed."""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(f"Gemini model {model} is temporarily unavailable: too many recent errors.")
+        self.model = model
+        self.retry_after = retry_after
+
+
+def agent_deadline(agent_name: str) -> float:
+    return settings.agent_deadlines.get(agent_name, settings.agent_deadline_seconds)
+
+
+class LatencyTracker:
+    """Rolling window of successful call durations per key, e.g. ``(task, model)``."""
+
+    def __init__(self, window: int):
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def observe(self, key: Tuple[str, str], seconds: float) -> None:
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def percentile(self, key: Tuple[str, str], percentile: float, min_samples: int) -> Optional[float]:
+        """Nearest-rank percentile of the window; None until ``min_samples`` calls were observed."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[max(0, math.ceil(percentile / 100 * len(samples)) - 1)]
+
+    def hedge_delay(self, key: Tuple[str, str]) -> Optional[float]:
+        """How long to wait for a call before starting a duplicate; None when hedging is off or not warmed up."""
+        if not settings.gemini_hedging_enabled:
+            return None
+        observed = self.percentile(key, settings.gemini_hedge_percentile, settings.gemini_hedge_min_samples)
+        if observed is None:
+            return None
+        return max(observed, settings.gemini_hedge_min_delay_seconds)
+
+
+class BreakerPermit:
+    """Permission for one call to a model; the half-open probe is owned by exactly one permit."""
+
+    __slots__ = ("model", "probe")
+
+    def __init__(self, model: str, probe: bool):
+        self.model = model
+        self.probe = probe
+
+
+class CircuitBreaker:
+    """
+    Per-model breaker over a sliding time window of call outcomes.
+
+    When at least ``min_calls`` calls in the window failed at ``error_rate`` or more, the
+    breaker opens and calls to the model fail fast for ``open_seconds``. Then a single
+    probe call is let through: its success closes the breaker, its failure opens it again.
+    ``allow`` hands out a permit per call, so only the call that owns the probe can end it.
+    """
+
+    def __init__(self, window_seconds: float, min_calls: int, error_rate: float, open_seconds: float):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self._outcomes: Dict[str, Deque[Tuple[float, bool]]] = defaultdict(deque)
+        self._open_until: Dict[str, float] = {}
+        self._probing: Dict[str, BreakerPermit] = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, model: str) -> float:
+        return max(0.0, self._open_until.get(model, 0.0) - time.monotonic())
+
+    def allow(self, model: str) -> Optional[BreakerPermit]:
+        """A permit for one call, or None while the breaker is open or another call is probing."""
+        with self._lock:
+            open_until = self._open_until.get(model)
+            if open_until is None:
+                return BreakerPermit(model, probe=False)
+            if time.monotonic() < open_until or model in self._probing:
+                return None
+            permit = BreakerPermit(model, probe=True)
+            self._probing[model] = permit
+            return permit
+
+    def _end_probe(self, permit: BreakerPermit) -> bool:
+        if permit.probe and self._probing.get(permit.model) is permit:
+            del self._probing[permit.model]
+            return True
+        return False
+
+    def abandon(self, permit: BreakerPermit) -> None:
+        """A call ended without a verdict (cancelled, deadline); lets another probe through."""
+        with self._lock:
+            self._end_probe(permit)
+
+    def record(self, permit: BreakerPermit, ok: bool) -> None:
+        model = permit.model
+        now = time.monotonic()
+        with self._lock:
+            if self._end_probe(permit):
+                if ok:
+                    self._open_until.pop(model, None)
+                    self._outcomes[model].clear()
+                    logger.info(f"Circuit breaker for {model} closed: probe call succeeded.")
+                else:
+                    self._open_until[model] = now + self.open_seconds
+                return
+
+            outcomes = self._outcomes[model]
+            outcomes.append((now, ok))
+            while outcomes and outcomes[0][0] < now - self.window_seconds:
+                outcomes.popleft()
+            failures = sum(1 for _, succeeded in outcomes if not succeeded)
+            if model not in self._open_until and len(outcomes) >= self.min_calls \
+                    and failures / len(outcomes) >= self.error_rate:
+                self._open_until[model] = now + self.open_seconds
+                logger.error(
+                    f"Circuit breaker for {model} opened: {failures} of {len(outcomes)} calls failed "
+                    f"in the last {self.window_seconds:.0f}s; pausing calls for {self.open_seconds:.0f}s."
+                )
+
+
+_latency_tracker: Optional[LatencyTracker] = None
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker(settings.gemini_latency_window)
+    return _latency_tracker
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            window_seconds=settings.gemini_breaker_window_seconds,
+            min_calls=settings.gemini_breaker_min_calls,
+            error_rate=settings.gemini_breaker_error_rate,
+            open_seconds=settings.gemini_breaker_open_seconds
+        )
+    return _circuit_breaker
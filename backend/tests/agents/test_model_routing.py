@@ -0,0 +1,76 @@
+import pytest
+from fakeredis import FakeRedis
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import errors, types
+
+from backend.agents import llm, model_routing
+from backend.services import rate_limiter
+
+
+def test_select_model_by_input_size(mocker):
+    """
+    Тест: Небольшой вход уходит в самую дешевую модель, длинная транскрипция в
+    модель с длинным контекстом, а настройка переопределяет таблицу для одного агента.
+    """
+    extractor = model_routing.INTERVIEW_TOPIC_EXTRACTOR
+    assert model_routing.select_model(extractor, 2_000, "default") == "gemini-2.0-flash-lite"
+    assert model_routing.select_model(extractor, 100_000, "default") == "gemini-2.0-flash"
+    assert model_routing.select_model(extractor, 600_000, "default") == "gemini-2.5-flash"
+    assert model_routing.select_model(None, 600_000, "default") == "default"
+
+    mocker.patch.object(
+        model_routing.settings, "gemini_model_routes", {"final_report_generator": [{"model": "gemini-2.5-pro"}]}
+    )
+    assert model_routing.select_model(model_routing.FINAL_REPORT_GENERATOR, 10, "default") == "gemini-2.5-pro"
+    assert model_routing.select_model(extractor, 10, "default") == "gemini-2.0-flash-lite"
+
+
+def test_every_agent_routes_by_its_own_name():
+    """
+    Тест: Каждый агент маршрутизируется по собственной задаче, совпадающей с его именем,
+    так что модели анализатора транскрипции и генератора итогового отчета настраиваются отдельно.
+    """
+    from backend.agents.pipeline_1_pre_interview import agent_1_data_parser, agent_2_grader, agent_3_report_generator
+    from backend.agents.pipeline_2_post_interview import agent_4_topic_extractor, agent_5_final_report_generator
+
+    agents = [
+        value
+        for module in (
+            agent_1_data_parser, agent_2_grader, agent_3_report_generator,
+            agent_4_topic_extractor, agent_5_final_report_generator
+        )
+        for value in vars(module).values()
+        if isinstance(getattr(value, "model", None), llm.ManagedGemini)
+    ]
+
+    assert len(agents) == len(model_routing.DEFAULT_MODEL_ROUTES)
+    assert {agent.name for agent in agents} == set(model_routing.DEFAULT_MODEL_ROUTES)
+    assert all(agent.model.task == agent.name for agent in agents)
+
+
+@pytest.mark.asyncio
+async def test_managed_gemini_falls_back_when_overloaded(mocker):
+    """
+    Тест: Если основная модель отвечает 503, после заданного числа попыток
+    запрос уходит в резервную модель.
+    """
+    mocker.patch.object(rate_limiter.settings, "gemini_default_rpm", 60)
+    mocker.patch.object(llm, "get_rate_limiter", return_value=rate_limiter.GeminiRateLimiter(FakeRedis()))
+    mocker.patch.object(llm.settings, "gemini_retry_base_delay", 0.01)
+    mocker.patch.object(llm.settings, "gemini_fallback_after_attempts", 2)
+    calls = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        calls.append(llm_request.model)
+        if llm_request.model == "gemini-2.0-flash-lite":
+            raise errors.ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite", task=model_routing.CANDIDATE_CV_PARSER)
+    request = LlmRequest(model=model.model, contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [response async for response in model.generate_content_async(request)]
+
+    assert calls == ["gemini-2.0-flash-lite", "gemini-2.0-flash-lite", "gemini-2.0-flash"]
+    assert responses[0].content.parts[0].text == "ok"
@@ -0,0 +1,53 @@
+import pytest
+from fakeredis import FakeRedis
+
+from backend.api import deps
+from backend.main import app
+from backend.queue import tasks
+from backend.queue.scheduling import JobScheduler
+from backend.tests.services.test_report_export import PREPARATION
+
+
+@pytest.fixture
+def redis_conn(mocker):
+    """
+    Фикстура: fakeredis вместо Redis для эндпоинтов экспорта, без уведомления воркера.
+    """
+    connection = FakeRedis()
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    app.dependency_overrides[deps.get_job_scheduler] = lambda: JobScheduler(connection)
+    mocker.patch("backend.api.routes.exports.notify_worker", new=mocker.AsyncMock())
+    yield connection
+    app.dependency_overrides.clear()
+
+
+def test_export_is_rendered_once_and_cached(client, redis_conn):
+    """
+    Тест: Экспорт ставится в очередь, пока файл не готов; готовый файл отдается
+    с ETag и Cache-Control, повторный экспорт не ставит новую задачу.
+    """
+    response = client.post("/api/exports/", json={"format": "docx", "report": PREPARATION})
+    assert response.status_code == 202
+    export = response.json()
+    assert export["status"] == "queued"
+    assert client.get(export["download_url"]).status_code == 202
+
+    tasks._render_export(redis_conn, export["report_hash"], "docx")
+
+    response = client.get(export["download_url"])
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.openxmlformats")
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    assert client.get(export["download_url"], headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.post("/api/exports/", json={"format": "docx", "report": PREPARATION})
+    assert response.status_code == 200 and response.json()["status"] == "finished"
+
+
+def test_export_rejects_invalid_report(client, redis_conn):
+    """
+    Тест: Отчет, не соответствующий схеме, отклоняется с 422.
+    """
+    response = client.post("/api/exports/", json={"format": "pdf", "report": {"report": {"first_name": "Иван"}}})
+    assert response.status_code == 422
@@ -62,3 +62,33 @@ def test_analyze_preparation_service_internal_error(client, mocker):
 
     assert response.status_code == 500
     assert "Произошла ошибка при анализе" in response.json()["detail"]
+
+
+def test_stream_preparation_reports_agent_deadline_as_timeout(client):
+    """
+    Тест: Превышение срока агента в потоковой подготовке приходит событием timeout,
+    а не общей ошибкой ввода-вывода.
+    """
+    from backend.api import deps
+    from backend.main import app
+    from backend.services.resilience import AgentDeadlineExceeded
+
+    class StubService:
+        async def stream_preparation(self, **kwargs):
+            yield "stage", {"stage": "parsing"}
+            raise AgentDeadlineExceeded("Agent 3 did not finish within 90s.")
+
+    app.dependency_overrides[deps.get_analysis_service] = StubService
+    try:
+        response = client.post(
+            "/api/prep/stream",
+            files={"cv_file": ("cv.txt", b"CV", "text/plain")},
+            data={"feedback_text": "Фидбэк", "requirements_link": "https://docs.google.com/x"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert "event: timeout" in response.text
+    assert "Agent 3 did not finish" in response.text
+    assert "event: error" not in response.text
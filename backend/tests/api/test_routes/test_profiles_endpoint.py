@@ -0,0 +1,69 @@
+from fakeredis import FakeRedis
+
+from backend.api import deps
+from backend.core.config import settings
+from backend.main import app
+from backend.queue import profile_store
+from backend.utils.profiling import JobProfile
+
+
+def test_download_job_profile(client):
+    """
+    Тест: Эндпоинт профиля отдает ссылки на артефакты и сами файлы; неизвестная задача и артефакт дают 404.
+    """
+    connection = FakeRedis()
+    profile_store.save_profile(connection, "job-1", JobProfile(cpu_stats=b"cpu", allocations=b"mem", summary="Сводка"))
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    try:
+        response = client.get("/api/profiles/job-1")
+        assert response.status_code == 200
+        artifacts = response.json()["artifacts"]
+        assert artifacts["summary"] == "/api/profiles/job-1/summary"
+
+        response = client.get(artifacts["cpu"])
+        assert response.status_code == 200
+        assert response.content == b"cpu"
+        assert 'filename="job-1-cpu.pstats"' in response.headers["content-disposition"]
+        assert client.get(artifacts["summary"]).text == "Сводка"
+
+        assert client.get("/api/profiles/job-2").status_code == 404
+        assert client.get("/api/profiles/job-1/flamegraph").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_streamed_preparation_is_profiled_in_process(client, mocker):
+    """
+    Тест: Флаг profile потоковой подготовки без разрешения на сервере игнорируется; с разрешением
+    запрос профилируется в процессе API, идентификатор профиля приходит в заголовке,
+    а сам профиль доступен через /api/profiles.
+    """
+    class StubService:
+        async def stream_preparation(self, **kwargs):
+            yield "report", {"report": "готово"}
+
+    connection = FakeRedis()
+    mocker.patch("backend.db.report_store.save_report_safely")
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    app.dependency_overrides[deps.get_analysis_service] = StubService
+    request = {
+        "files": {"cv_file": ("cv.txt", b"CV", "text/plain")},
+        "data": {"feedback_text": "Фидбэк", "requirements_link": "https://docs.google.com/x", "profile": "true"},
+    }
+    try:
+        response = client.post("/api/prep/stream", **request)
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+
+        mocker.patch.object(settings, "api_request_profiling_enabled", True)
+        response = client.post("/api/prep/stream", **request)
+        assert response.status_code == 200
+        assert "event: report" in response.text
+        profile_id = response.headers["X-Profile-Id"]
+
+        response = client.get(f"/api/profiles/{profile_id}")
+        assert response.status_code == 200
+        assert set(response.json()["artifacts"]) == set(profile_store.PROFILE_ARTIFACTS)
+        assert f"request {profile_id}" in client.get(f"/api/profiles/{profile_id}/summary").text
+    finally:
+        app.dependency_overrides.clear()
@@ -1,5 +1,13 @@
 import io
 
+from fakeredis import FakeRedis
+from rq import Queue
+
+from backend.api import deps
+from backend.api.routes.results import RESULTS_TASK
+from backend.main import app
+from backend.queue import cancellation
+
 
 def test_analyze_results_success(client, mocker):
     """
@@ -80,3 +88,114 @@ def test_analyze_results_service_error(client, mocker):
 
     assert response.status_code == 500
     assert "Произошла внутренняя ошибка сервера" in response.json()["detail"]
+
+
+def _override_redis(mock_redis):
+    from backend.main import app
+    from backend.api.deps import get_redis_connection
+
+    app.dependency_overrides[get_redis_connection] = lambda: mock_redis
+    return app
+
+
+def test_get_status_finished_returns_stored_report_with_etag(client, mocker):
+    """
+    Тест: Статус завершенной задачи читается из отдельного сжатого отчета
+    и отдается с ETag, без загрузки самой задачи RQ.
+    """
+    from backend.queue import result_store
+
+    report = {"message": "ok", "success": True, "report": {"ai_summary": "Кандидат"}}
+    stored = {}
+    mock_redis = mocker.MagicMock()
+    mock_redis.set.side_effect = lambda key, value, ex=None: stored.update({key: value})
+    result_store.save_result(mock_redis, "job-1", report)
+
+    mock_redis.hget.return_value = b"finished"
+    mock_redis.get.side_effect = lambda key: stored.get(key)
+    app = _override_redis(mock_redis)
+    mock_fetch = mocker.patch("backend.queue.result_store.fetch_job")
+    try:
+        response = client.get("/api/results/status/job-1")
+        assert response.status_code == 200
+        assert response.json()["result"] == report
+        etag = response.headers["etag"]
+
+        not_modified = client.get("/api/results/status/job-1", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        mock_fetch.assert_not_called()
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_get_status_unknown_job(client, mocker):
+    """
+    Тест: Статус несуществующей задачи возвращает 404.
+    """
+    mock_redis = mocker.MagicMock()
+    mock_redis.hget.return_value = None
+    mock_redis.exists.return_value = 0
+    app = _override_redis(mock_redis)
+    try:
+        response = client.get("/api/results/status/missing")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_cancel_analysis_task(client):
+    """
+    Тест: Задача в очереди отменяется сразу, выполняющаяся получает флаг отмены (202),
+    завершенную отменить нельзя, неизвестная дает 404.
+    """
+    connection = FakeRedis()
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    try:
+        queue = Queue("results_processing", connection=connection)
+        queued = queue.enqueue(RESULTS_TASK)
+        running = queue.enqueue(RESULTS_TASK)
+        running.set_status("started")
+        finished = queue.enqueue(RESULTS_TASK)
+        finished.set_status("finished")
+
+        response = client.delete(f"/api/results/{queued.id}")
+        assert response.status_code == 200 and response.json()["status"] == "canceled"
+        assert queued.id not in queue.job_ids
+
+        response = client.delete(f"/api/results/{running.id}")
+        assert response.status_code == 202
+        assert cancellation.is_cancel_requested(connection, running.id)
+
+        running.set_status("failed")
+        assert client.get(f"/api/results/status/{running.id}").json()["status"] == "canceled"
+
+        assert client.delete(f"/api/results/{finished.id}").status_code == 409
+        assert client.delete("/api/results/unknown").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_status_outlives_rq_job_hash(client, mocker):
+    """
+    Тест: Задача хранится в RQ столько же, сколько отчет; после удаления хэша задачи
+    статус все равно отдает сохраненный отчет, пока он не истек.
+    """
+    from backend.queue import result_store
+    from backend.queue.scheduling import JobScheduler
+
+    connection = FakeRedis()
+    job = JobScheduler(connection).enqueue(RESULTS_TASK, kind="results")
+    assert job.result_ttl == job.failure_ttl == result_store.settings.results_retention_seconds
+
+    report = {"message": "ok", "success": True}
+    result_store.save_result(connection, job.id, report)
+    connection.delete(job.key)
+
+    app.dependency_overrides[deps.get_redis_connection] = lambda: connection
+    try:
+        response = client.get(f"/api/results/status/{job.id}")
+        assert response.status_code == 200
+        assert response.json() == {"job_id": job.id, "status": "finished", "result": report, "error": None}
+    finally:
+        app.dependency_overrides.clear()
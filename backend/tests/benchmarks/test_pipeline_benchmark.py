@@ -0,0 +1,25 @@
+import pytest
+
+from backend.benchmarks import pipeline_benchmark
+from backend.benchmarks.fakes import FakeBackendConfig
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_benchmark_runs_both_pipelines_offline():
+    """
+    Тест: Бенчмарк проходит оба пайплайна на фейковых бэкендах без ошибок
+    и возвращает разбивку по этапам; регрессия относительно базового прогона обнаруживается.
+    """
+    config = FakeBackendConfig(
+        drive_latency=0, audio_mb=0.1, transcription_latency=0, llm_latency=0, sheet_kb=1, transcript_kb=1
+    )
+    results = await pipeline_benchmark.run_benchmark(["preparation", "results"], [2], 2, config)
+
+    assert [result.errors for result in results] == [0, 0]
+    assert "agent:interview_plan_generator" in results[0].stages
+    assert {"drive:audio", "transcription", "agent:final_report_generator"} <= set(results[1].stages)
+    assert set(results[1].stage_peak_rss_mb) == set(results[1].stages)
+
+    baseline = [{**result.__dict__, "throughput_per_second": result.throughput_per_second * 10} for result in results]
+    assert len(pipeline_benchmark.compare_with_baseline(results, baseline, 0.25)) == 2
@@ -0,0 +1,33 @@
+from backend.benchmarks import startup_profile
+
+
+def test_parse_importtime_reads_costs_and_nesting():
+    """
+    Тест: Строки вывода -X importtime разбираются в модули с временем и глубиной вложенности.
+    """
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     redis.exceptions\n"
+        "import time:      2500 |       2620 |   redis\n"
+        "import time:       300 |       2920 | backend.main\n"
+    )
+    modules = startup_profile.parse_importtime(stderr)
+
+    assert [(module.name, module.depth) for module in modules] == [
+        ("redis.exceptions", 2), ("redis", 1), ("backend.main", 0)
+    ]
+    assert modules[1].self_ms == 2.5 and modules[2].cumulative_ms == 2.92
+
+
+def test_api_startup_does_not_import_agent_stack():
+    """
+    Тест: Импорт backend.main не подтягивает google-adk, assemblyai, клиент Google Drive и numpy.
+    """
+    profile = startup_profile.profile_target(
+        "backend.main", top=10_000, env={"GOOGLE_API_KEY": "x", "ASSEMBLYAI_API_KEY": "x", "GOOGLE_APPLICATION_B64": ""}
+    )
+    imported = {module.name for module in profile.top_cumulative}
+
+    assert "backend.api.routes.prep" in imported
+    assert not imported & {"google.adk", "assemblyai", "googleapiclient", "backend.services.analysis_service"}
+    assert not imported & {"numpy", "backend.services.ranking"}
@@ -11,4 +11,16 @@ def client():
     'scope="module"' означает, что клиент будет создан один раз для всех тестов в модуле.
     """
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+@pytest.fixture(autouse=True)
+def in_memory_report_store(monkeypatch):
+    """
+    Фикстура: хранилище отчетов в SQLite в памяти, чтобы тесты не создавали файл базы.
+    """
+    from backend.db import database
+
+    database.dispose_engine()
+    monkeypatch.setattr(database.settings, "database_url", "sqlite://")
+    yield
+    database.dispose_engine()
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.db import report_store
+from backend.tests.services.test_report_export import PREPARATION, RESULTS
+
+
+@pytest.fixture
+def store():
+    """
+    Фикстура: хранилище отчетов; база в памяти создается общей фикстурой из conftest.
+    """
+    return report_store
+
+
+def _results_for(name: str, level: str) -> dict:
+    body = {**RESULTS["report"], "candidate_info": {**RESULTS["report"]["candidate_info"], "full_name": name}}
+    body["conclusion"] = {**body["conclusion"], "assessed_level": level}
+    return {**RESULTS, "report": body}
+
+
+def test_filters_and_keyset_pagination(store):
+    """
+    Тест: Отчеты ищутся по началу имени без учета регистра, по вакансии и уровню;
+    страницы идут от новых к старым без повторов.
+    """
+    for index in range(5):
+        store.save_report(f"job-{index}", store.RESULTS, _results_for(f"Иван Петров {index}", "Middle"), "link-a")
+    store.save_report("job-x", store.RESULTS, _results_for("Анна Смирнова", "Junior"), "link-b")
+    store.save_report("prep-1", store.PREPARATION, PREPARATION, "link-a")
+
+    first, cursor = store.list_reports(candidate="иван п", limit=3)
+    second, last_cursor = store.list_reports(candidate="иван п", limit=3, cursor=cursor)
+    assert [row.report_id for row in first] == ["job-4", "job-3", "job-2"]
+    assert [row.report_id for row in second] == ["job-1", "job-0"]
+    assert last_cursor is None
+
+    rows, _ = store.list_reports(requirements_link="link-a", kind="preparation")
+    assert [(row.report_id, row.candidate_name) for row in rows] == [("prep-1", "Иван Иванов")]
+    assert [row.report_id for row in store.list_reports(assessed_level="Junior")[0]] == ["job-x"]
+    assert store.list_reports(created_from=datetime.now(timezone.utc) + timedelta(days=1))[0] == []
+
+
+def test_saving_twice_keeps_one_row(store):
+    """
+    Тест: Повторное сохранение того же отчета (перезапуск задачи) не создает дубликат.
+    """
+    store.save_report("job-1", store.RESULTS, RESULTS, "link")
+    store.save_report("job-1", store.RESULTS, RESULTS, "link")
+
+    rows, _ = store.list_reports()
+    assert len(rows) == 1
+    assert store.get_report("job-1").recommendation == "Рекомендуем"
+
+
+def test_vacancy_features_are_stored_with_report(store):
+    """
+    Тест: При сохранении отчета рядом записывается вектор признаков для рейтинга вакансии.
+    """
+    store.save_report("job-1", store.RESULTS, _results_for("Иван Петров", "Senior"), "link-a")
+    store.save_report("prep-1", store.PREPARATION, PREPARATION, "link-a")
+    store.save_report("job-2", store.RESULTS, RESULTS, "link-b")
+
+    rows = store.vacancy_features("link-a", kind=store.RESULTS)
+    assert [(row[0], row[2]) for row in rows] == [("job-1", "Иван Петров")]
+    assert len(store.vacancy_features("link-a")) == 2
+
+
+def test_ranking_requires_report_kind(store, client):
+    """
+    Тест: Рейтинг вакансии строится по отчетам одного типа: без kind запрос отклоняется,
+    с kind в выдаче только отчеты этого типа.
+    """
+    store.save_report("job-1", store.RESULTS, _results_for("Иван Петров", "Senior"), "link-a")
+    store.save_report("prep-1", store.PREPARATION, PREPARATION, "link-a")
+
+    assert client.get("/api/reports/ranking", params={"requirements_link": "link-a"}).status_code == 422
+
+    response = client.get("/api/reports/ranking", params={"requirements_link": "link-a", "kind": "results"})
+    assert response.status_code == 200
+    assert [item["report_id"] for item in response.json()["items"]] == ["job-1"]
+
+
+def test_cloud_run_without_shared_database_disables_history(monkeypatch, mocker, client):
+    """
+    Тест: В Cloud Run с SQLite история отчетов отключается, а не роняет сервис:
+    отчеты не сохраняются, эндпоинты истории отвечают 503; локально и с общей базой история работает.
+    """
+    from backend.db import database
+
+    save_report = mocker.patch.object(report_store, "save_report")
+    monkeypatch.setattr(database.settings, "database_url", "sqlite:///data/reports.db")
+    monkeypatch.delenv("K_SERVICE", raising=False)
+    assert database.history_available()
+
+    monkeypatch.setenv("K_SERVICE", "ai-hiring-tool-worker")
+    database.warn_if_history_unavailable()
+    assert not database.history_available()
+    report_store.save_report_safely("r-1", report_store.RESULTS, {}, None)
+    save_report.assert_not_called()
+    assert client.get("/api/reports/").status_code == 503
+
+    monkeypatch.setattr(database.settings, "database_url", "postgresql+psycopg://user:secret@db:5432/reports")
+    assert database.history_available()
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeRedis
+from rq import Queue
+
+from backend.queue import async_worker, result_store
+from backend.queue.memory_watchdog import MEMORY_META_KEY, RecyclePolicy
+
+TASK_NAME = "backend.queue.tasks.run_analysis_pipeline"
+
+
+@pytest.fixture
+def queue(mocker):
+    """
+    Фикстура: очередь RQ поверх fakeredis и воркер без реального AnalysisService.
+    """
+    mocker.patch.object(async_worker, "AnalysisService")
+    return Queue("results_processing", connection=FakeRedis())
+
+
+def test_async_worker_runs_jobs_concurrently_and_reports_failures(queue, mocker):
+    """
+    Тест: Несколько задач выполняются одновременно в одном цикле событий,
+    ошибки и превышение job_timeout попадают в статус задачи.
+    """
+    async def fake_pipeline(service, job, delay, fail=False):
+        await asyncio.sleep(delay)
+        if fail:
+            raise ValueError("Transcription failed")
+        return result_store.save_result(job.connection, job.id, {"delay": delay})
+
+    mocker.patch.dict(async_worker.ASYNC_TASKS, {TASK_NAME: fake_pipeline})
+
+    finished = [queue.enqueue(TASK_NAME, delay=0.3) for _ in range(3)]
+    failed = queue.enqueue(TASK_NAME, delay=0.01, fail=True)
+    timed_out = queue.enqueue(TASK_NAME, delay=5, job_timeout=1)
+
+    worker = async_worker.AsyncWorker([queue], queue.connection, concurrency=5, poll_interval=0.01)
+    loop = asyncio.new_event_loop()
+    try:
+        started = loop.time()
+        loop.run_until_complete(worker.run(burst=True))
+        elapsed = loop.time() - started
+    finally:
+        loop.close()
+
+    assert elapsed < 2
+    for job in finished:
+        assert result_store.get_job_status(queue.connection, job.id) == "finished"
+        blob = result_store.load_result_blob(queue.connection, job.id)
+        assert result_store.decode_result(blob) == {"delay": 0.3}
+
+    failed.refresh()
+    assert failed.get_status() == "failed"
+    assert "Transcription failed" in failed.exc_info
+
+    timed_out.refresh()
+    assert timed_out.get_status() == "failed"
+    assert "JobTimeoutException" in timed_out.exc_info
+    assert queue.started_job_registry.count == 0
+
+
+def test_async_worker_recycles_after_job_limit(queue, mocker):
+    """
+    Тест: После лимита задач воркер перестает брать новые, дожидается текущих и завершается;
+    замеры памяти каждой задачи сохраняются в ее метаданных.
+    """
+    async def fake_pipeline(service, job, delay):
+        await asyncio.sleep(delay)
+        return None
+
+    mocker.patch.dict(async_worker.ASYNC_TASKS, {TASK_NAME: fake_pipeline})
+
+    jobs = [queue.enqueue(TASK_NAME, delay=0.05) for _ in range(4)]
+    worker = async_worker.AsyncWorker(
+        [queue], queue.connection, concurrency=1, poll_interval=0.01,
+        recycle_policy=RecyclePolicy(max_jobs=2)
+    )
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(worker.run())
+    finally:
+        loop.close()
+
+    statuses = [result_store.get_job_status(queue.connection, job.id) for job in jobs]
+    assert statuses == ["finished", "finished", "queued", "queued"]
+    jobs[0].refresh()
+    assert jobs[0].meta[MEMORY_META_KEY]["peak_rss_mb"] > 0
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+from fakeredis import FakeRedis
+
+from backend.queue import cancellation
+from backend.utils import cancellation as job_cancellation
+from backend.utils.cancellation import JobCancelled
+from backend.utils.metrics import stage
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def connection(mocker):
+    """
+    Фикстура: fakeredis и частый опрос флага отмены.
+    """
+    mocker.patch.object(cancellation.settings, "job_cancel_poll_seconds", 0.01)
+    return FakeRedis()
+
+
+async def test_cancel_stops_pipeline_and_runs_cleanup(connection):
+    """
+    Тест: Отмена прерывает ожидание внутри этапа, поток с опросом просыпается сразу,
+    а блок finally пайплайна успевает освободить ресурсы.
+    """
+    events = []
+
+    def poll_transcript():
+        job_cancellation.sleep(30)
+        events.append("poll finished")
+
+    async def pipeline():
+        try:
+            with stage("transcription"):
+                await asyncio.to_thread(poll_transcript)
+        finally:
+            events.append("cleanup")
+
+    async def cancel_later():
+        await asyncio.sleep(0.05)
+        cancellation.request_cancel(connection, "job-1")
+
+    started = time.perf_counter()
+    asyncio.create_task(cancel_later())
+    with pytest.raises(JobCancelled):
+        await cancellation.run_cancellable(connection, "job-1", pipeline())
+
+    assert time.perf_counter() - started < 2
+    assert events == ["cleanup"]
+
+
+async def test_job_cancelled_before_start_does_not_run_stages(connection):
+    """
+    Тест: Задача, отмененная до начала, не входит ни в один этап.
+    """
+    cancellation.request_cancel(connection, "job-2")
+    entered = []
+
+    async def pipeline():
+        await asyncio.sleep(0.05)
+        with stage("drive:audio"):
+            entered.append("drive:audio")
+
+    with pytest.raises(JobCancelled):
+        await cancellation.run_cancellable(connection, "job-2", pipeline())
+    assert entered == []
+
+
+async def test_uncancelled_job_returns_result(connection):
+    """
+    Тест: Без отмены результат пайплайна возвращается как есть, а вне задачи этапы не проверяют отмену.
+    """
+    async def pipeline():
+        await asyncio.sleep(0.03)
+        return {"ok": True}
+
+    assert await cancellation.run_cancellable(connection, "job-3", pipeline()) == {"ok": True}
+    with stage("cv:parse"):
+        pass
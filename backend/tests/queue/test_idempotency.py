@@ -0,0 +1,38 @@
+import pytest
+from fakeredis import FakeRedis
+from rq import Queue
+
+from backend.queue import idempotency
+
+TASK_NAME = "backend.queue.tasks.run_analysis_pipeline"
+INPUTS = {"video_link": "https://drive.google.com/file/d/video/view", "job_requirements_link": "https://docs/req"}
+
+
+def test_duplicate_submission_returns_existing_job_until_it_fails():
+    """
+    Тест: Повторная отправка тех же данных возвращает ID задачи, пока она в очереди;
+    после ошибки задачи создается новая. Тот же ключ с другими данными отклоняется.
+    """
+    connection = FakeRedis()
+    queue = Queue("results_processing", connection=connection)
+
+    fingerprint = idempotency.submission_fingerprint(INPUTS, b"cv")
+    padded = idempotency.submission_fingerprint({**INPUTS, "video_link": f" {INPUTS['video_link']} "}, b"cv")
+    assert fingerprint == padded
+
+    key = idempotency.idempotency_key("results", fingerprint)
+    job_id, is_new = idempotency.claim_submission(connection, key, fingerprint)
+    assert is_new
+    job = queue.enqueue(TASK_NAME, job_id=job_id)
+
+    assert idempotency.claim_submission(connection, key, fingerprint) == (job_id, False)
+
+    job.set_status("failed")
+    retry_id, is_new = idempotency.claim_submission(connection, key, fingerprint)
+    assert is_new and retry_id != job_id
+
+    client_key = idempotency.idempotency_key("results", fingerprint, "click-1", "recruiter-a")
+    idempotency.claim_submission(connection, client_key, fingerprint)
+    other = idempotency.submission_fingerprint(INPUTS, b"another cv")
+    with pytest.raises(idempotency.IdempotencyConflict):
+        idempotency.claim_submission(connection, client_key, other)
@@ -0,0 +1,75 @@
+import time
+
+from fakeredis import FakeRedis
+from rq import Queue
+from rq.job import Job
+
+from backend.queue import memory_watchdog
+from backend.queue.memory_watchdog import MEMORY_META_KEY, RecyclePolicy, track_job_memory
+from backend.utils.metrics import stage
+
+MB = 1024 * 1024
+
+
+def test_job_memory_report_has_stage_peaks(mocker):
+    """
+    Тест: Замер памяти задачи сохраняет в метаданных RSS до и после, пик задачи
+    и пик этапа, в котором память выделялась и освобождалась: его ловит фоновый сэмплер.
+    """
+    mocker.patch.object(memory_watchdog.settings, "worker_memory_sample_seconds", 0.01)
+    connection = FakeRedis()
+    job = Queue("results_processing", connection=connection).enqueue("backend.queue.tasks.run_analysis_pipeline")
+
+    with track_job_memory(job):
+        with stage("drive:sheets"):
+            pass
+        with stage("transcription"):
+            buffer = b"x" * (64 * MB)
+            time.sleep(0.2)
+            del buffer
+
+    report = Job.fetch(job.id, connection=connection).meta[MEMORY_META_KEY]
+    assert set(report["stages_peak_rss_mb"]) == {"drive:sheets", "transcription"}
+    assert report["stages_peak_rss_mb"]["transcription"] >= report["rss_before_mb"] + 60
+    assert report["peak_rss_mb"] >= report["stages_peak_rss_mb"]["transcription"]
+
+
+def test_recycle_policy_limits_jobs_and_memory(mocker):
+    """
+    Тест: Политика просит перезапуск после лимита задач или при RSS выше порога; нули отключают лимиты.
+    """
+    rss = mocker.patch.object(memory_watchdog, "current_rss_bytes", return_value=500 * MB)
+
+    by_jobs = RecyclePolicy(max_jobs=2)
+    assert by_jobs.job_finished() is None
+    assert "2" in by_jobs.job_finished()
+
+    by_memory = RecyclePolicy(max_rss_mb=1024)
+    assert by_memory.job_finished() is None
+    rss.return_value = 1500 * MB
+    assert "1500" in by_memory.job_finished()
+
+    assert RecyclePolicy().job_finished() is None
+
+
+def test_rq_worker_stops_warmly_above_memory_limit(mocker):
+    """
+    Тест: Форкающий воркер RQ при RSS выше порога после задачи завершается штатно,
+    не беря следующую задачу из очереди.
+    """
+    from rq import Worker
+
+    from backend.queue.worker import RecyclingWorker
+
+    mocker.patch.object(memory_watchdog, "current_rss_bytes", return_value=1500 * MB)
+    execute_job = mocker.patch.object(Worker, "execute_job")
+    connection = FakeRedis()
+    queue = Queue("results_processing", connection=connection)
+    for _ in range(2):
+        queue.enqueue("backend.queue.tasks.run_analysis_pipeline")
+
+    worker = RecyclingWorker([queue], connection=connection, recycle_policy=RecyclePolicy(max_rss_mb=1024))
+    worker.work(burst=True)
+
+    assert execute_job.call_count == 1
+    assert queue.count == 1
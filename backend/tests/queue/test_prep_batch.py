@@ -0,0 +1,55 @@
+import asyncio
+
+from fakeredis import FakeRedis
+
+from backend.api.models import PreparationAnalysis
+from backend.queue import batch_store, result_store
+from backend.queue.tasks import _prepare_batch
+
+
+def _report(name):
+    return PreparationAnalysis(
+        message="ok",
+        report={
+            "first_name": name, "matching_table": [], "candidate_profile": "QA",
+            "conclusion": {
+                "summary": "Ок", "recommendations": "Нет",
+                "interview_topics": [], "values_assessment": "Соответствует"
+            }
+        }
+    )
+
+
+def test_prepare_batch_parses_requirements_once(mocker):
+    """
+    Тест: Требования разбираются один раз на пакет, а статус и отчет
+    сохраняются для каждого кандидата отдельно, включая ошибочные.
+    """
+    connection = FakeRedis()
+    service = mocker.MagicMock()
+    service.parse_requirements = mocker.AsyncMock(return_value='{"hard_skills_required": ["SQL"]}')
+
+    async def fake_analyze(cv_file, cv_filename, feedback_text, requirements_link, parsed_requirements):
+        assert parsed_requirements == '{"hard_skills_required": ["SQL"]}'
+        if cv_filename == "broken.pdf":
+            raise ValueError("Could not process file: broken.pdf")
+        return _report(cv_file.read().decode())
+
+    service.analyze_preparation = mocker.AsyncMock(side_effect=fake_analyze)
+
+    candidates = [
+        {"cv_bytes": "Иван".encode(), "cv_filename": "ivan.txt", "feedback_text": ""},
+        {"cv_bytes": b"%PDF-", "cv_filename": "broken.pdf", "feedback_text": ""},
+        {"cv_bytes": "Анна".encode(), "cv_filename": "anna.txt", "feedback_text": "Хороший кандидат"},
+    ]
+    batch_store.init_batch(connection, "batch-1", [c["cv_filename"] for c in candidates])
+
+    summary = asyncio.run(_prepare_batch(service, connection, "batch-1", candidates, "https://link"))
+
+    assert summary == {"batch_id": "batch-1", "finished": 2, "failed": 1}
+    service.parse_requirements.assert_awaited_once_with("https://link")
+    statuses = [c["status"] for c in batch_store.get_batch(connection, "batch-1")]
+    assert statuses == ["finished", "failed", "finished"]
+
+    blob = result_store.load_result_blob(connection, batch_store.candidate_result_id("batch-1", 2))
+    assert result_store.decode_result(blob)["report"]["first_name"] == "Анна"
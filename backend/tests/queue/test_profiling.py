@@ -0,0 +1,61 @@
+import pickle
+import pstats
+import tracemalloc
+
+from fakeredis import FakeRedis
+from rq import Queue
+
+from backend.queue import profile_store, tasks
+from backend.utils import profiling
+
+
+def build_rows(count: int):
+    return [{"index": index, "text": str(index) * 10} for index in range(count)]
+
+
+def test_profiled_job_stores_cpu_and_allocation_profiles(tmp_path):
+    """
+    Тест: Задача с флагом профилирования сохраняет профиль CPU в формате pstats,
+    снимок памяти tracemalloc и текстовую сводку; после задачи tracemalloc выключен.
+    """
+    connection = FakeRedis()
+    job = Queue("results_processing", connection=connection).enqueue(
+        "backend.queue.tasks.run_analysis_pipeline", meta={profiling.PROFILE_META_KEY: True}
+    )
+
+    with tasks._profiled(job):
+        rows = build_rows(5_000)
+
+    assert len(rows) == 5_000
+    assert not tracemalloc.is_tracing()
+    assert set(profile_store.available_artifacts(connection, job.id)) == set(profile_store.PROFILE_ARTIFACTS)
+
+    cpu_path = tmp_path / "job.pstats"
+    cpu_path.write_bytes(profile_store.load_artifact(connection, job.id, "cpu"))
+    functions = {name for _, _, name in pstats.Stats(str(cpu_path)).stats}
+    assert "build_rows" in functions
+
+    snapshot = pickle.loads(profile_store.load_artifact(connection, job.id, "allocations"))
+    assert isinstance(snapshot, tracemalloc.Snapshot)
+    assert any(
+        frame.filename == __file__ for statistic in snapshot.statistics("lineno") for frame in statistic.traceback
+    )
+    assert "build_rows" in profile_store.load_artifact(connection, job.id, "summary").decode()
+
+
+def test_job_without_flag_is_not_profiled(mocker):
+    """
+    Тест: Без флага задача не профилируется, а выборка включает профилирование без флага.
+    """
+    connection = FakeRedis()
+    job = Queue("results_processing", connection=connection).enqueue("backend.queue.tasks.run_analysis_pipeline")
+
+    with tasks._profiled(job):
+        build_rows(10)
+
+    assert profile_store.available_artifacts(connection, job.id) == []
+
+    mocker.patch.object(profiling.settings, "job_profile_sample_rate", 1.0)
+    assert profiling.should_profile(False)
+    mocker.patch.object(profiling.settings, "job_profile_sample_rate", 0.0)
+    assert not profiling.should_profile(False)
@@ -0,0 +1,52 @@
+from fakeredis import FakeRedis
+
+from backend.queue import scheduling
+
+TASK_NAME = "backend.queue.tasks.run_analysis_pipeline"
+
+
+def test_scheduler_demotes_submitter_over_fair_share(mocker):
+    """
+    Тест: После fair_share_max_active_jobs активных задач новые задачи отправителя
+    уходят в очередь bulk, а задачи других отправителей остаются в основной очереди.
+    """
+    mocker.patch.object(scheduling.settings, "fair_share_max_active_jobs", 2)
+    scheduler = scheduling.JobScheduler(FakeRedis())
+
+    jobs = [scheduler.enqueue(TASK_NAME, kind="results", submitter="recruiter-a") for _ in range(3)]
+    other = scheduler.enqueue(TASK_NAME, kind="results", submitter="recruiter-b")
+    interactive = scheduler.enqueue(TASK_NAME, kind="interactive", submitter="recruiter-a")
+
+    assert [job.origin for job in jobs] == [scheduling.DEFAULT_QUEUE, scheduling.DEFAULT_QUEUE, scheduling.BULK_QUEUE]
+    assert other.origin == scheduling.DEFAULT_QUEUE
+    assert interactive.origin == scheduling.INTERACTIVE_QUEUE
+
+    # Завершённая и удалённая задачи освобождают место в основной очереди.
+    scheduling.release_submitter_slot(jobs[0], scheduler.connection)
+    jobs[1].delete()
+    assert scheduler.enqueue(TASK_NAME, kind="results", submitter="recruiter-a").origin == scheduling.DEFAULT_QUEUE
+
+
+def test_submitter_is_derived_on_server(mocker):
+    """
+    Тест: Отправитель для справедливой очереди определяется сервером: заголовок X-Submitter
+    игнорируется, а за доверенным прокси берется адрес, который добавил сам прокси.
+    """
+    from starlette.requests import Request
+
+    from backend.api import deps
+
+    def request(headers):
+        return Request({
+            "type": "http",
+            "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+            "client": ("169.254.1.1", 4000),
+        })
+
+    spoofed = {"x-submitter": "someone-else", "x-forwarded-for": "10.0.0.1, 203.0.113.7"}
+    mocker.patch.object(deps.settings, "trusted_proxy_hops", 0)
+    assert deps.get_submitter(request(spoofed)) == "169.254.1.1"
+
+    mocker.patch.object(deps.settings, "trusted_proxy_hops", 1)
+    assert deps.get_submitter(request(spoofed)) == "203.0.113.7"
+    assert deps.get_submitter(request({})) == "169.254.1.1"
@@ -0,0 +1,61 @@
+from backend.queue.supervisor import WorkerSupervisor
+
+
+def _make_supervisor(mocker, pending, max_workers=2, **kwargs):
+    supervisor = WorkerSupervisor(
+        "redis://localhost:6379", ["interactive", "results_processing"], max_workers=max_workers, **kwargs
+    )
+    mocker.patch.object(supervisor, "_pending_jobs", return_value=pending)
+    spawned = []
+
+    def fake_spawn(queue_names):
+        process = mocker.MagicMock()
+        process.poll.return_value = None
+        spawned.append(process)
+        return process
+
+    mocker.patch.object(supervisor, "_spawn", side_effect=fake_spawn)
+    return supervisor, spawned
+
+
+def test_reconcile_never_exceeds_max_workers(mocker):
+    """
+    Тест: Даже при большом числе задач и повторных триггерах процессов не больше лимита.
+    """
+    supervisor, spawned = _make_supervisor(mocker, pending=30, max_workers=2)
+
+    for _ in range(5):
+        supervisor.trigger()
+        supervisor._reconcile()
+
+    assert len(spawned) == 2
+    assert supervisor.running_workers() == 2
+
+
+def test_reconcile_starts_no_more_workers_than_pending_jobs(mocker):
+    """
+    Тест: Для одной задачи запускается один воркер, для пустой очереди - ни одного.
+    """
+    supervisor, spawned = _make_supervisor(mocker, pending=1, max_workers=4)
+    supervisor._reconcile()
+    assert len(spawned) == 1
+
+    supervisor._pending_jobs.return_value = 0
+    spawned[0].poll.return_value = 0
+    supervisor._reconcile()
+    assert supervisor.running_workers() == 0
+
+
+def test_reconcile_reserves_slot_for_interactive_queue(mocker):
+    """
+    Тест: При очереди длинных задач один слот остается за воркером только для interactive.
+    """
+    supervisor, spawned = _make_supervisor(
+        mocker, pending=10, max_workers=3, interactive_queue="interactive", reserved_interactive=1
+    )
+    supervisor._reconcile()
+
+    spawned_queues = [call.args[0] for call in supervisor._spawn.call_args_list]
+    assert spawned_queues.count(["interactive"]) == 1
+    assert spawned_queues.count(["interactive", "results_processing"]) == 2
+    assert supervisor.running_workers() == 3
@@ -58,8 +58,6 @@ async def test_analyze_preparation_success(service, mocker):
 
     mocker.patch("backend.services.analysis_service.InMemorySessionService", return_value=mock_session_instance)
 
-    mocker.patch.object(service, '_set_google_api_key')
-
     cv_file = io.BytesIO("Тестовое резюме".encode('utf-8'))
 
     result = await service.analyze_preparation(
@@ -0,0 +1,67 @@
+import numpy as np
+
+from backend.services import ranking
+from backend.tests.services.test_report_export import PREPARATION, RESULTS
+
+
+def _vector(**values) -> np.ndarray:
+    vector = np.full(len(ranking.FEATURE_NAMES), np.nan, dtype=np.float32)
+    for name, value in values.items():
+        vector[ranking.FEATURE_INDEX[name]] = value
+    return vector
+
+
+def test_parse_level_and_recommendation():
+    """
+    Тест: Уровень и рекомендация переводятся в числа; непонятные значения дают NaN.
+    """
+    assert ranking.parse_level("Middle") == 2.0
+    assert ranking.parse_level("Junior+") == 1.5
+    assert ranking.parse_level("уровень senior-") == 2.5
+    assert np.isnan(ranking.parse_level("не определен"))
+    assert np.isnan(ranking.parse_level("strong leadership"))
+
+    assert ranking.parse_recommendation("Рекомендуем") == 1.0
+    assert ranking.parse_recommendation("Рекомендуем с оговорками") == 0.5
+    assert ranking.parse_recommendation("Не рекомендуем") == 0.0
+    assert np.isnan(ranking.parse_recommendation(None))
+
+
+def test_compute_features_of_report_kinds():
+    """
+    Тест: У подготовки считается только таблица соответствия, у результатов — еще уровень и рекомендация.
+    """
+    preparation = ranking.features_as_dict(ranking.compute_features("preparation", PREPARATION))
+    results = ranking.features_as_dict(ranking.compute_features("results", {**RESULTS, "matrix_coverage": 0.75}))
+
+    assert preparation["match_ratio"] is not None
+    assert preparation["level"] is None and preparation["recommendation"] is None
+    assert results["recommendation"] == 1.0
+    assert results["matrix_coverage"] == 0.75
+
+
+def test_encode_decode_roundtrip():
+    """
+    Тест: Векторы, сохраненные байтами, собираются обратно в матрицу без потерь.
+    """
+    vectors = [_vector(match_ratio=0.5, level=2), _vector(recommendation=1)]
+    matrix = ranking.decode_features([ranking.encode_features(vector) for vector in vectors])
+
+    assert matrix.shape == (2, len(ranking.FEATURE_NAMES))
+    np.testing.assert_array_equal(matrix, np.stack(vectors))
+    assert ranking.decode_features([]).shape == (0, len(ranking.FEATURE_NAMES))
+
+
+def test_rank_orders_and_filters():
+    """
+    Тест: Кандидаты сортируются по баллу, фильтры отбрасывают строки без нужного признака.
+    """
+    features = np.stack([
+        _vector(match_ratio=0.5, level=2, recommendation=0.5),
+        _vector(match_ratio=1.0, level=3, recommendation=1),
+        _vector(match_ratio=0.9),
+    ])
+
+    assert [row for row, _ in ranking.rank(features)] == [1, 0, 2]
+    assert [row for row, _ in ranking.rank(features, min_level=2.5)] == [1]
+    assert [row for row, _ in ranking.rank(features, min_match_ratio=0.8, limit=1)] == [1]
@@ -0,0 +1,129 @@
+import pytest
+from fakeredis import FakeRedis
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import errors, types
+
+from backend.agents import llm
+from backend.services import key_pool, rate_limiter
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def limiter(mocker):
+    """
+    Фикстура: лимитер поверх fakeredis с квотой 60 запросов в минуту.
+    """
+    mocker.patch.object(rate_limiter.settings, "gemini_default_rpm", 60)
+    limiter = rate_limiter.GeminiRateLimiter(FakeRedis())
+    mocker.patch.object(llm, "get_rate_limiter", return_value=limiter)
+    mocker.patch.object(key_pool, "get_rate_limiter", return_value=limiter)
+    mocker.patch.object(key_pool, "_key_pool", None)
+    return limiter
+
+
+async def test_limiter_delays_requests_over_quota(limiter):
+    """
+    Тест: Пока квота не исчерпана, запросы проходят сразу; сверх квоты лимитер
+    возвращает время ожидания, а у другого ключа API собственная квота.
+    """
+    assert all(limiter._consume("gemini-2.0-flash-lite", "key-a", 1, 100) == 0 for _ in range(60))
+    assert limiter._consume("gemini-2.0-flash-lite", "key-a", 1, 100) > 0
+    assert limiter._consume("gemini-2.0-flash-lite", "key-b", 1, 100) == 0
+
+
+async def test_managed_gemini_retries_rate_limited_calls(limiter, mocker):
+    """
+    Тест: Ответ 429 повторяется с backoff, и успешный ответ доходит до вызывающего кода.
+    """
+    mocker.patch.object(llm.settings, "gemini_retry_base_delay", 0.01)
+    calls = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        calls.append(llm_request.model)
+        if len(calls) < 3:
+            raise errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    request = LlmRequest(model=model.model, contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [response async for response in model.generate_content_async(request)]
+
+    assert len(calls) == 3
+    assert responses[0].content.parts[0].text == "ok"
+
+
+async def test_key_pool_prefers_key_with_most_quota_left(limiter, mocker):
+    """
+    Тест: Пул выбирает ключ с наибольшим остатком квоты, а ключ после 429 пропускает до конца паузы.
+    """
+    pool = key_pool.GeminiKeyPool([key_pool.GeminiCredential.parse(key) for key in ("key-a", "key-b")])
+    key_a, key_b = pool.credentials
+    for _ in range(30):
+        limiter._consume("gemini-2.0-flash-lite", key_a.key_id, 1, 100)
+
+    assert await pool.choose("gemini-2.0-flash-lite") == key_b
+    assert await pool.choose("gemini-2.0-flash-lite") == key_b
+
+    for _ in range(40):
+        limiter._consume("gemini-2.0-flash-lite", key_b.key_id, 1, 100)
+    pool.report_failure(key_a, 429)
+    assert pool.healthy() == [key_b]
+    assert await pool.choose("gemini-2.0-flash-lite") == key_b
+
+    pool.report_success(key_a)
+    assert await pool.choose("gemini-2.0-flash-lite") == key_a
+
+
+async def test_managed_gemini_moves_rate_limited_call_to_another_key(limiter, mocker):
+    """
+    Тест: После 429 вызов сразу повторяется с клиентом другого ключа, без ожидания и без записи в окружение.
+    """
+    mocker.patch.object(llm.settings, "gemini_api_keys", ["key-a", "key-b"])
+    sleep = mocker.patch.object(llm.asyncio, "sleep")
+    clients = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        clients.append(self.api_client)
+        if len(clients) == 1:
+            raise errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    request = LlmRequest(model=model.model, contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [response async for response in model.generate_content_async(request)]
+
+    assert responses[0].content.parts[0].text == "ok"
+    assert len(clients) == 2 and clients[0] is not clients[1]
+    assert {client._api_client.api_key for client in clients} == {"key-a", "key-b"}
+    sleep.assert_not_called()
+
+
+async def test_managed_gemini_backs_off_on_server_errors_with_single_key(limiter, mocker):
+    """
+    Тест: 503 не выводит ключ из пула, поэтому с единственным ключом повтор идет только после backoff.
+    """
+    mocker.patch.object(llm.settings, "gemini_api_keys", ["key-a"])
+    mocker.patch.object(llm, "fallback_chain", lambda model: [model])
+    sleep = mocker.patch.object(llm.asyncio, "sleep")
+    calls = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        calls.append(llm_request.model)
+        if len(calls) < 3:
+            raise errors.ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    request = LlmRequest(model=model.model, contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [response async for response in model.generate_content_async(request)]
+
+    assert responses[0].content.parts[0].text == "ok"
+    assert len(calls) == 3
+    assert sleep.await_count == 2
@@ -0,0 +1,68 @@
+import io
+
+import docx
+import pytest
+
+from backend.services import report_export
+
+PREPARATION = {
+    "message": "ok",
+    "success": True,
+    "report": {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "matching_table": [{"criterion": "Python", "match": "Да", "comment": "Опыт 5 лет"}],
+        "candidate_profile": "Опытный QA инженер.",
+        "conclusion": {
+            "summary": "Кандидат подходит.",
+            "recommendations": "Пригласить",
+            "interview_topics": ["Тест-дизайн", "CI"],
+            "values_assessment": "Соответствует",
+        },
+    },
+}
+
+RESULTS = {
+    "message": "ok",
+    "report": {
+        "ai_summary": "Рекомендуем.",
+        "candidate_info": {
+            "full_name": "Иван Иванов", "experience_years": "5", "tech_stack": ["Python"],
+            "projects": ["CRM"], "domains": ["FinTech"], "tasks": ["Автотесты"],
+        },
+        "interview_analysis": {"topics": ["REST"], "tech_assignment": "Нет", "knowledge_assessment": "Хорошо"},
+        "communication_skills": {"assessment": "Хорошо"},
+        "foreign_languages": {"assessment": "B2"},
+        "team_fit": "Подходит",
+        "additional_information": [],
+        "conclusion": {"recommendation": "Рекомендуем", "assessed_level": "Middle", "summary": "Подходит."},
+        "recommendations_for_candidate": ["Изучить k6"],
+    },
+}
+
+
+@pytest.mark.parametrize("report", [PREPARATION, RESULTS])
+def test_render_docx_and_pdf(report):
+    """
+    Тест: Оба типа отчетов рендерятся в DOCX с текстом отчета и в PDF с кириллическим шрифтом.
+    """
+    analysis = report_export.parse_report(report)
+
+    document = docx.Document(io.BytesIO(report_export.render(analysis, "docx")))
+    text = "\n".join(paragraph.text for paragraph in document.paragraphs)
+    assert "Иван" in text
+
+    pdf = report_export.render(analysis, "pdf")
+    assert pdf.startswith(b"%PDF")
+
+
+def test_report_hash_is_stable_and_content_addressed():
+    """
+    Тест: Хэш не зависит от порядка ключей и меняется вместе с содержимым отчета.
+    """
+    reordered = {"report": PREPARATION["report"], "success": True, "message": "ok"}
+    changed = {**PREPARATION, "report": {**PREPARATION["report"], "candidate_profile": "Другой профиль."}}
+
+    first = report_export.report_hash(report_export.parse_report(PREPARATION))
+    assert first == report_export.report_hash(report_export.parse_report(reordered))
+    assert first != report_export.report_hash(report_export.parse_report(changed))
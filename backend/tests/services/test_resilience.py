@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeRedis
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import errors, types
+
+from backend.agents import llm
+from backend.services import key_pool, rate_limiter, resilience
+from backend.services.analysis_service import AnalysisService
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def controls(mocker):
+    """
+    Фикстура: свежие трекер задержек и предохранитель, лимитер поверх fakeredis.
+    """
+    limiter = rate_limiter.GeminiRateLimiter(FakeRedis())
+    mocker.patch.object(llm, "get_rate_limiter", return_value=limiter)
+    mocker.patch.object(key_pool, "get_rate_limiter", return_value=limiter)
+    mocker.patch.object(key_pool, "_key_pool", None)
+    mocker.patch.object(resilience, "_latency_tracker", None)
+    mocker.patch.object(resilience, "_circuit_breaker", None)
+
+
+def _request() -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.0-flash-lite", contents=[types.Content(role="user", parts=[types.Part(text="hi")])]
+    )
+
+
+async def test_circuit_breaker_opens_and_probes():
+    """
+    Тест: Предохранитель открывается при всплеске ошибок, после паузы пропускает один пробный вызов
+    и закрывается, если тот успешен. Завершить пробу может только вызов, который ее получил.
+    """
+    breaker = resilience.CircuitBreaker(window_seconds=60, min_calls=4, error_rate=0.5, open_seconds=0.05)
+    late = breaker.allow("model")
+    for ok in (True, False, True, False):
+        permit = breaker.allow("model")
+        assert permit
+        breaker.record(permit, ok)
+
+    assert not breaker.allow("model")
+    await asyncio.sleep(0.06)
+    probe = breaker.allow("model")
+    assert probe.probe
+    assert not breaker.allow("model")
+
+    # Вызов, начатый до открытия, не снимает чужую пробу.
+    breaker.abandon(late)
+    breaker.record(late, True)
+    assert not breaker.allow("model")
+
+    breaker.record(probe, True)
+    assert breaker.allow("model")
+
+
+async def test_latency_tracker_percentile():
+    """
+    Тест: Задержка хеджирования — p95 окна, но не меньше минимальной и только после прогрева.
+    """
+    tracker = resilience.LatencyTracker(window=100)
+    for value in range(1, 101):
+        tracker.observe(("grading", "model"), value / 100)
+
+    assert tracker.percentile(("grading", "model"), 95, min_samples=20) == 0.95
+    assert tracker.percentile(("report", "model"), 95, min_samples=20) is None
+
+
+async def test_slow_call_is_hedged(controls, mocker):
+    """
+    Тест: Вызов дольше наблюдаемого p95 дублируется, и ответ берется у более быстрого запроса.
+    """
+    mocker.patch.object(llm.settings, "gemini_hedging_enabled", True)
+    mocker.patch.object(llm.settings, "gemini_hedge_min_delay_seconds", 0.01)
+    for _ in range(20):
+        resilience.get_latency_tracker().observe(("", "gemini-2.0-flash-lite"), 0.02)
+    calls = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=f"call {len(calls)}")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    responses = await asyncio.wait_for(_collect(model.generate_content_async(_request())), timeout=2)
+
+    assert len(calls) == 2
+    assert [response.content.parts[0].text for response in responses] == ["call 2"]
+
+
+async def test_open_circuit_fails_fast(controls, mocker):
+    """
+    Тест: Когда предохранитель модели открыт и резервной модели нет, вызов сразу завершается CircuitOpenError.
+    """
+    mocker.patch.object(llm, "fallback_chain", lambda model: [model])
+    mocker.patch.object(llm.settings, "gemini_retry_attempts", 1)
+    mocker.patch.object(llm.settings, "gemini_breaker_min_calls", 2)
+
+    async def fake_generate(self, llm_request, stream=False):
+        raise errors.ServerError(500, {"error": {"code": 500, "status": "INTERNAL"}})
+        yield
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            await _collect(model.generate_content_async(_request()))
+
+    with pytest.raises(resilience.CircuitOpenError):
+        await _collect(model.generate_content_async(_request()))
+
+
+async def test_network_errors_open_circuit(controls, mocker):
+    """
+    Тест: Сетевые ошибки и таймауты клиента засчитываются предохранителю так же, как ответы 5xx.
+    """
+    mocker.patch.object(llm, "fallback_chain", lambda model: [model])
+    mocker.patch.object(llm.settings, "gemini_retry_attempts", 1)
+    mocker.patch.object(llm.settings, "gemini_breaker_min_calls", 2)
+
+    async def fake_generate(self, llm_request, stream=False):
+        raise ConnectionError("connection reset")
+        yield
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await _collect(model.generate_content_async(_request()))
+
+    with pytest.raises(resilience.CircuitOpenError):
+        await _collect(model.generate_content_async(_request()))
+
+
+async def test_retry_falls_back_when_circuit_opens(controls, mocker):
+    """
+    Тест: Если предохранитель модели открылся, пока вызов ждал повтора, следующая попытка
+    уходит в резервную модель, а не в ту же.
+    """
+    mocker.patch.object(llm, "fallback_chain", lambda model: [model, "gemini-2.0-flash"])
+    mocker.patch.object(llm.settings, "gemini_retry_attempts", 3)
+    mocker.patch.object(llm.settings, "gemini_fallback_after_attempts", 3)
+    mocker.patch.object(llm.settings, "gemini_retry_base_delay", 0.01)
+    calls = []
+
+    async def fake_generate(self, llm_request, stream=False):
+        calls.append(llm_request.model)
+        if llm_request.model == "gemini-2.0-flash-lite":
+            # Параллельные вызовы тем временем открыли предохранитель модели.
+            breaker = resilience.get_circuit_breaker()
+            breaker._open_until[llm_request.model] = float("inf")
+            raise errors.ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+    mocker.patch.object(Gemini, "generate_content_async", fake_generate)
+    model = llm.ManagedGemini(model="gemini-2.0-flash-lite")
+    responses = await _collect(model.generate_content_async(_request()))
+
+    assert calls == ["gemini-2.0-flash-lite", "gemini-2.0-flash"]
+    assert responses[0].content.parts[0].text == "ok"
+
+
+async def test_agent_deadline(mocker):
+    """
+    Тест: Агент, не уложившийся в срок, прерывается с AgentDeadlineExceeded.
+    """
+    mocker.patch("assemblyai.settings.api_key")
+    mocker.patch("googleapiclient.discovery.build")
+    mocker.patch.object(resilience.settings, "agent_deadlines", {"slow_agent": 0.05})
+
+    class SlowRunner:
+        def __init__(self, **kwargs):
+            pass
+
+        async def run_async(self, **kwargs):
+            await asyncio.sleep(5)
+            yield None
+
+    mocker.patch("backend.services.analysis_service.Runner", SlowRunner)
+    agent = mocker.MagicMock()
+    agent.name = "slow_agent"
+
+    with pytest.raises(resilience.AgentDeadlineExceeded):
+        await AnalysisService()._run_agent(agent, "Agent 0", None, "session", "user", None)
+
+
+async def _collect(responses):
+    return [response async for response in responses]
+
+
+async def test_streamed_agent_deadline(mocker):
+    """
+    Тест: Потоковый запуск агента (SSE-подготовка) ограничен тем же сроком: уже полученные события
+    доходят до клиента, а зависший поток прерывается с AgentDeadlineExceeded.
+    """
+    mocker.patch("assemblyai.settings.api_key")
+    mocker.patch("googleapiclient.discovery.build")
+    mocker.patch.object(resilience.settings, "agent_deadlines", {"slow_agent": 0.05})
+
+    class HangingStreamRunner:
+        def __init__(self, **kwargs):
+            pass
+
+        async def run_async(self, **kwargs):
+            yield "first chunk"
+            await asyncio.sleep(5)
+            yield "never sent"
+
+    mocker.patch("backend.services.analysis_service.Runner", HangingStreamRunner)
+    agent = mocker.MagicMock()
+    agent.name = "slow_agent"
+
+    received = []
+    with pytest.raises(resilience.AgentDeadlineExceeded):
+        async for event in AnalysisService()._stream_agent(agent, "Agent 3", None, "session", "user", None):
+            received.append(event)
+    assert received == ["first chunk"]
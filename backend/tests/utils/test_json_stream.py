@@ -0,0 +1,55 @@
+import json
+
+from backend.utils.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "report": {
+        "first_name": "Иван",
+        "matching_table": [
+            {"criterion": "Python", "match": "✅", "comment": "5 лет, \"asyncio\""},
+            {"criterion": "SQL", "match": "❌", "comment": "нет опыта"},
+        ],
+        "conclusion": {"summary": "Подходит", "score": 7.5, "ready": True},
+    }
+}
+WATCH = [("report", "first_name"), ("report", "matching_table", "*"), ("report", "conclusion", "summary")]
+
+
+def _feed_in_chunks(parser, text, size):
+    emitted = []
+    for offset in range(0, len(text), size):
+        emitted.append(parser.feed(text[offset:offset + size]))
+    return emitted
+
+
+def test_sections_are_emitted_as_soon_as_they_close():
+    """
+    Тест: При подаче документа по 7 символов каждая отслеживаемая секция
+    возвращается один раз, в момент закрытия, до окончания документа.
+    """
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    parser = IncrementalJSONParser(watch=WATCH)
+    emitted = _feed_in_chunks(parser, text, 7)
+
+    flat = [item for chunk in emitted for item in chunk]
+    assert flat == [
+        (("report", "first_name"), "Иван"),
+        (("report", "matching_table", 0), DOCUMENT["report"]["matching_table"][0]),
+        (("report", "matching_table", 1), DOCUMENT["report"]["matching_table"][1]),
+        (("report", "conclusion", "summary"), "Подходит"),
+    ]
+    first_row_chunk = next(i for i, chunk in enumerate(emitted) if any(path[-1] == 0 for path, _ in chunk))
+    assert first_row_chunk < len(emitted) - 1
+    assert parser.done and parser.text == text
+
+
+def test_code_fence_and_scalars():
+    """
+    Тест: Markdown-обертка модели пропускается, числа и литералы разбираются
+    на границе значения, а незавершенная секция не возвращается.
+    """
+    parser = IncrementalJSONParser(watch=[("a",), ("b",), ("c", "*")])
+    assert parser.feed('```json\n{"a": 12') == []
+    assert parser.feed('.5, "b": true, "c": [null') == [(("a",), 12.5), (("b",), True)]
+    assert parser.feed(", [1, 2]]}\n```") == [(("c", 0), None), (("c", 1), [1, 2])]
+    assert parser.done
@@ -0,0 +1,41 @@
+from backend.utils import matrix_index
+from backend.utils.matrix_index import get_matrix_index, select_relevant_rows
+
+MATRIX = """Категория,Навык,Junior,Middle
+API,REST и HTTP методы,Знает GET и POST,Объясняет PUT и PATCH
+,Postman переменные и окружения,Использует коллекции,Пишет скрипты
+Базы данных,SQL запросы,Простые SELECT,JOIN и индексы
+,Нормализация баз данных,Знает термин,Объясняет формы
+Процессы,Scrum и Kanban,Знает роли,Сравнивает подходы
+,,,
+Мобильное,Тестирование iOS,Ставит сборки,Пишет тест-планы
+"""
+
+
+def test_selects_rows_relevant_to_topics():
+    """
+    Тест: Из матрицы остаются заголовок и строки, совпадающие с темами интервью,
+    в исходном порядке; категория объединенной ячейки сохраняется.
+    """
+    topics = ["Разница между PUT и PATCH в REST API", "Нормализация базы данных"]
+    text, kept, total = select_relevant_rows(MATRIX, topics, "", max_rows=2)
+
+    assert (kept, total) == (2, 6)
+    assert text.splitlines() == [
+        "Категория,Навык,Junior,Middle",
+        "API,REST и HTTP методы,Знает GET и POST,Объясняет PUT и PATCH",
+        "Базы данных,Нормализация баз данных,Знает термин,Объясняет формы",
+    ]
+
+
+def test_small_or_unmatched_matrix_is_kept_and_index_is_cached():
+    """
+    Тест: Матрица не сокращается, если она уже помещается в лимит или ничего
+    не совпало; индекс строится один раз на версию матрицы.
+    """
+    assert select_relevant_rows(MATRIX, ["REST"], "", max_rows=10)[0] == MATRIX
+    assert select_relevant_rows(MATRIX, ["Kotlin корутины"], "", max_rows=2)[0] == MATRIX
+
+    matrix_index._index_cache.clear()
+    assert get_matrix_index(MATRIX) is get_matrix_index(MATRIX)
+    assert len(matrix_index._index_cache) == 1
@@ -0,0 +1,64 @@
+import pytest
+
+from backend.benchmarks.fakes import FakeBackendConfig, FakeDriveService
+from backend.utils import file_processing as fp
+from backend.utils.metrics import collect_stages
+from backend.utils.sheets import normalize_sheet_csv
+
+RAW_EXPORT = (
+    "Категория,Навык,Уровень,,,\r\n"
+    ",,,,,\r\n"
+    "API,\"REST  и\nHTTP\",Middle,,,\r\n"
+    "API,Postman,Junior,,,\r\n"
+    "Категория,Навык,Уровень,,,\r\n"
+    "Базы данных,SQL,Middle,,,\r\n"
+    "Базы данных,SQL,Middle,,,\r\n"
+    "Базы данных,Индексы,,,,\r\n"
+)
+
+
+def test_normalize_sheet_csv():
+    """
+    Тест: Пустые строки и столбцы удаляются, повтор заголовка и дубликаты строк
+    отбрасываются, повтор объединенной ячейки остается только в первой строке группы.
+    """
+    assert normalize_sheet_csv(RAW_EXPORT) == (
+        "Категория,Навык,Уровень\n"
+        "API,REST и HTTP,Middle\n"
+        ",Postman,Junior\n"
+        "Базы данных,SQL,Middle\n"
+        ",Индексы\n"
+    )
+    assert normalize_sheet_csv(",,\n,,\n") == ""
+
+
+def test_normalize_sheet_csv_keeps_repeats_outside_groups():
+    """
+    Тест: Повторы схлопываются только в ведущих столбцах-группах; одинаковый уровень
+    в соседних строках и значение, встречающееся в столбце вразброс, остаются как есть.
+    """
+    assert normalize_sheet_csv(
+        "Навык,Уровень,Вес\nPython,Middle,1\nPython,Middle,2\nGo,Middle,1\n"
+    ) == "Навык,Уровень,Вес\nPython,Middle,1\n,Middle,2\nGo,Middle,1\n"
+
+    scattered = "Уровень,Навык\nMiddle,SQL\nMiddle,Git\nJunior,Linux\nMiddle,Docker\n"
+    assert normalize_sheet_csv(scattered) == scattered
+
+
+@pytest.mark.asyncio
+async def test_sheet_export_is_cached_and_counted(mocker):
+    """
+    Тест: Повторная загрузка той же таблицы берется из кэша, а токены до и после
+    нормализации попадают в метрики.
+    """
+    mocker.patch.object(fp, "_sheet_cache", {})
+    drive = FakeDriveService(FakeBackendConfig(drive_latency=0, sheet_kb=1))
+    export = mocker.spy(drive, "export_media")
+
+    with collect_stages() as timings:
+        first = await fp.download_sheet_from_drive(drive, "sheet-1")
+        second = await fp.download_sheet_from_drive(drive, "sheet-1")
+
+    assert first == second
+    assert export.call_count == 1
+    assert timings.counters["sheets:normalized_tokens"] < timings.counters["sheets:raw_tokens"]
@@ -0,0 +1,85 @@
+import pytest
+from fakeredis import FakeRedis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from backend.queue.scheduling import JobScheduler
+from backend.utils import tracing
+from backend.utils.metrics import stage
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans():
+    """
+    Фикстура: провайдер трассировки SDK, который складывает спаны в память.
+    """
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        trace.set_tracer_provider(provider)
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def test_job_continues_trace_of_request(spans):
+    """
+    Тест: Контекст трассировки запроса попадает в метаданные задачи RQ,
+    а воркер продолжает ту же трассировку, и этапы пайплайна становятся дочерними спанами задачи.
+    """
+    scheduler = JobScheduler(FakeRedis())
+    with tracing.tracer.start_as_current_span("POST /api/results/analyze", kind=SpanKind.SERVER):
+        job = scheduler.enqueue("backend.queue.tasks.analyze_results_task", kind="results", submitter="alice")
+
+    assert "traceparent" in job.meta[tracing.TRACE_META_KEY]
+
+    with tracing.job_span(job):
+        with stage("transcription"):
+            pass
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    request = by_name["POST /api/results/analyze"]
+    enqueue = by_name["enqueue backend.queue.tasks.analyze_results_task"]
+    execution = by_name["job backend.queue.tasks.analyze_results_task"]
+    transcription = by_name["transcription"]
+
+    assert {span.context.trace_id for span in by_name.values()} == {request.context.trace_id}
+    assert enqueue.parent.span_id == request.context.span_id
+    assert execution.parent.span_id == enqueue.context.span_id
+    assert execution.kind == SpanKind.CONSUMER
+    assert execution.attributes["messaging.message.id"] == job.id
+    assert transcription.parent.span_id == execution.context.span_id
+
+
+def test_middleware_names_span_after_route(spans):
+    """
+    Тест: Middleware открывает серверный спан на запрос, продолжает входящий traceparent
+    и называет спан по шаблону маршрута, а не по конкретному пути.
+    """
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/api/reports/{report_id}")
+    def get_report(report_id: str):
+        with stage("db:read"):
+            return {"id": report_id}
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = TestClient(app).get(
+        "/api/reports/42", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    )
+
+    assert response.status_code == 200
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    server = by_name["GET /api/reports/{report_id}"]
+    assert server.kind == SpanKind.SERVER
+    assert format(server.context.trace_id, "032x") == trace_id
+    assert server.attributes["http.response.status_code"] == 200
+    assert by_name["db:read"].context.trace_id == server.context.trace_id
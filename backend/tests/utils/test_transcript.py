@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from backend.utils.transcript import (
+    CANDIDATE, INTERVIEWER, TURN_FORMAT_HEADER, build_turns, compact_transcript, strip_turn_refs
+)
+
+
+def _utterance(speaker, start, text):
+    return SimpleNamespace(speaker=speaker, start=start, text=text)
+
+
+def test_turns_merge_speakers_and_assign_roles():
+    """
+    Тест: Подряд идущие фразы одного говорящего объединяются в одну реплику,
+    больше всех говорящий считается кандидатом, реплики нумеруются по порядку.
+    """
+    utterances = [
+        _utterance("A", 1_000, "Расскажите про REST."),
+        _utterance("B", 5_500, "REST — это архитектурный стиль"),
+        _utterance("B", 9_000, "поверх HTTP с ресурсами и методами."),
+        _utterance("A", 65_000, "Чем PUT отличается от PATCH?"),
+        _utterance("B", 70_000, "PUT заменяет ресурс целиком, PATCH меняет его частично."),
+    ]
+
+    turns = build_turns(utterances)
+
+    assert [(turn.index, turn.role) for turn in turns] == [
+        (0, INTERVIEWER), (1, CANDIDATE), (2, INTERVIEWER), (3, CANDIDATE)
+    ]
+    assert turns[1].text == "REST — это архитектурный стиль поверх HTTP с ресурсами и методами."
+    assert compact_transcript(utterances, "").splitlines() == [
+        TURN_FORMAT_HEADER,
+        "#0 I 00:01 Расскажите про REST.",
+        "#1 C 00:05 REST — это архитектурный стиль поверх HTTP с ресурсами и методами.",
+        "#2 I 01:05 Чем PUT отличается от PATCH?",
+        "#3 C 01:10 PUT заменяет ресурс целиком, PATCH меняет его частично.",
+    ]
+
+
+def test_flat_text_without_utterances():
+    """
+    Тест: Если диаризация не вернула фраз, используется обычный текст транскрипции.
+    """
+    assert compact_transcript(None, "сплошной текст") == "сплошной текст"
+
+
+def test_strip_turn_refs_keeps_topic_name():
+    """
+    Тест: Ссылки на реплики в конце темы удаляются, остальные скобки в названии остаются.
+    """
+    assert strip_turn_refs("Разница между Put и Patch в REST API (#4-#7)") == "Разница между Put и Patch в REST API"
+    assert strip_turn_refs("Переменные в Postman (#8, #11)") == "Переменные в Postman"
+    assert strip_turn_refs("Нормализация (3НФ) баз данных") == "Нормализация (3НФ) баз данных"
+    assert strip_turn_refs("Scrum и Kanban") == "Scrum и Kanban"
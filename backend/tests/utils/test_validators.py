@@ -1,5 +1,8 @@
+import io
+import zipfile
+
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
 from unittest.mock import MagicMock
 from backend.utils.validators import FileValidator
 
@@ -86,3 +89,45 @@ def test_validate_matrix_file_failure(mock_upload_file):
     with pytest.raises(HTTPException) as excinfo:
         FileValidator.validate_matrix_file(mock_upload_file)
     assert excinfo.value.status_code == 400
+
+
+def _docx_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", "<document/>")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_read_validated_upload_detects_real_type():
+    """
+    Тест: Тип файла определяется по сигнатуре, а не по расширению:
+    DOCX с расширением .pdf читается как .docx, текст остается .txt.
+    """
+    upload = await FileValidator.read_validated_upload(UploadFile(io.BytesIO(_docx_bytes()), filename="cv.pdf"), 'cv_prep')
+    assert upload.detected_type == ".docx" and upload.filename == "cv.docx"
+    assert upload.read_bytes() == _docx_bytes()
+
+    text = "Опыт работы 5 лет".encode("utf-8")
+    upload = await FileValidator.read_validated_upload(UploadFile(io.BytesIO(text), filename="cv.txt"), 'cv_prep')
+    assert upload.detected_type == ".txt" and upload.size == len(text)
+
+
+@pytest.mark.asyncio
+async def test_read_validated_upload_rejects_oversized_and_mislabeled(mocker):
+    """
+    Тест: Файл больше лимита отклоняется с 413 без чтения до конца,
+    бинарный файл с расширением .pdf отклоняется с 400.
+    """
+    mocker.patch.object(FileValidator, "MAX_FILE_SIZE", 100 * 1024)
+    oversized = UploadFile(io.BytesIO(b"a" * (1024 * 1024)), filename="cv.txt")
+    with pytest.raises(HTTPException) as excinfo:
+        await FileValidator.read_validated_upload(oversized, 'cv_prep')
+    assert excinfo.value.status_code == 413
+    assert oversized.file.tell() < 1024 * 1024
+
+    binary = UploadFile(io.BytesIO(b"MZ\x90\x00\x03\x00\x00\x00"), filename="cv.pdf")
+    with pytest.raises(HTTPException) as excinfo:
+        await FileValidator.read_validated_upload(binary, 'cv_prep')
+    assert excinfo.value.status_code == 400
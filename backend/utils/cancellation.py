@@ -0,0 +1,61 @@
+"""
+Cooperative cancellation of a running pipeline.
+
+A ``CancellationToken`` is bound to the context of a job. Asyncio tasks and threads
+started with ``asyncio.to_thread`` inherit the context, so blocking loops (downloads,
+transcription polling) can check the token between steps and stop early, and every
+pipeline stage checks it on entry.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class JobCancelled(Exception):
+    """The job was cancelled by the user."""
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Blocks for up to ``seconds``; returns True as soon as the token is cancelled."""
+        return self._event.wait(seconds)
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("cancellation_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    reset_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
+
+
+def is_cancelled() -> bool:
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+def raise_if_cancelled() -> None:
+    if is_cancelled():
+        raise JobCancelled("The job was cancelled.")
+
+
+def sleep(seconds: float) -> None:
+    """``time.sleep`` for worker threads that wakes up and raises as soon as the job is cancelled."""
+    token = _current_token.get() or CancellationToken()
+    if token.wait(seconds):
+        raise JobCancelled("The job was cancelled.")
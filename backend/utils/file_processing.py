@@ -3,8 +3,10 @@ import re
 import asyncio
 import tempfile
 import os
-import time
+import threading
+from dataclasses import dataclass
 
+from cachetools import TTLCache
 from loguru import logger
 
 from assemblyai import api
@@ -15,6 +17,27 @@ from assemblyai.client import Client as AssemblyAIClient
 from assemblyai.types import Settings as AssemblyAISettings
 from googleapiclient.http import MediaIoBaseDownload
 
+from backend.core.config import settings
+from backend.services.rate_limiter import estimate_tokens
+from backend.utils import cancellation
+from backend.utils.metrics import count
+from backend.utils.sheets import normalize_sheet_csv
+from backend.utils.tracing import tracer
+from backend.utils.transcript import compact_transcript
+
+
+@dataclass(frozen=True)
+class SheetExport:
+    raw: str
+    normalized: str
+
+
+# Drive media is downloaded in chunks of this size; a cancelled job stops between chunks.
+DOWNLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+
+_sheet_cache: TTLCache = TTLCache(maxsize=settings.sheet_cache_max_entries, ttl=settings.sheet_cache_ttl_seconds)
+_sheet_cache_lock = threading.Lock()
+
 
 def get_google_drive_file_id(link: str) -> str:
     """
@@ -31,9 +54,9 @@ def get_google_drive_file_id(link: str) -> str:
     raise ValueError("Invalid Google Drive link. Could not extract file ID.")
 
 
-async def download_sheet_from_drive(drive_service, file_id: str) -> str:
+async def _export_sheet_csv(drive_service, file_id: str) -> str:
     """
-    Downloads a Google Sheet as CSV and returns its text content.
+    Downloads a Google Sheet as CSV and returns its raw text content.
     """
     if not drive_service:
         raise ConnectionError("Google Drive service is not initialized.")
@@ -57,6 +80,39 @@ async def download_sheet_from_drive(drive_service, file_id: str) -> str:
         raise IOError(f"Failed to download requirements from Google Drive: {e}")
 
 
+async def export_sheet(drive_service, file_id: str) -> SheetExport:
+    """
+    Returns the raw CSV export of a Google Sheet together with its normalized form.
+    Both are cached per file for ``sheet_cache_ttl_seconds``.
+    """
+    with _sheet_cache_lock:
+        cached = _sheet_cache.get(file_id)
+    if cached is not None:
+        logger.info(f"Sheet {file_id} served from cache.")
+        return cached
+
+    raw = await _export_sheet_csv(drive_service, file_id)
+    sheet = SheetExport(raw=raw, normalized=normalize_sheet_csv(raw))
+    raw_tokens, normalized_tokens = estimate_tokens(len(sheet.raw)), estimate_tokens(len(sheet.normalized))
+    logger.info(
+        f"Sheet {file_id} normalized: ~{raw_tokens} -> ~{normalized_tokens} tokens "
+        f"({len(sheet.raw)} -> {len(sheet.normalized)} characters)."
+    )
+    with _sheet_cache_lock:
+        _sheet_cache[file_id] = sheet
+    return sheet
+
+
+async def download_sheet_from_drive(drive_service, file_id: str) -> str:
+    """
+    Downloads a Google Sheet as CSV and returns its normalized, token-compact text content.
+    """
+    sheet = await export_sheet(drive_service, file_id)
+    count("sheets:raw_tokens", estimate_tokens(len(sheet.raw)))
+    count("sheets:normalized_tokens", estimate_tokens(len(sheet.normalized)))
+    return sheet.normalized
+
+
 async def download_audio_from_drive_to_temp_file(drive_service, file_id: str) -> str:
     """
     Asynchronously downloads an audio/video file from Google Drive to a temporary file on disk.
@@ -69,13 +125,19 @@ async def download_audio_from_drive_to_temp_file(drive_service, file_id: str) ->
         request = drive_service.files().get_media(fileId=file_id)
 
         fd, temp_file_path = tempfile.mkstemp()
+    except Exception as e:
+        logger.error(f"Critical error while trying to download file from Google Drive: {e}", exc_info=True)
+        raise e
 
+    try:
         with os.fdopen(fd, 'wb') as f:
-            downloader = MediaIoBaseDownload(f, request)
+            downloader = MediaIoBaseDownload(f, request, chunksize=DOWNLOAD_CHUNK_SIZE)
 
             def download_in_thread():
                 done = False
                 while not done:
+                    # A cancelled job stops between chunks instead of finishing the download.
+                    cancellation.raise_if_cancelled()
                     status, done = downloader.next_chunk()
                     if status:
                         logger.info(f"Download progress: {int(status.progress() * 100)}%.")
@@ -84,9 +146,12 @@ async def download_audio_from_drive_to_temp_file(drive_service, file_id: str) ->
 
         logger.success(f"File {file_id} successfully downloaded to temporary file: {temp_file_path}")
         return temp_file_path
-    except Exception as e:
-        logger.error(f"Critical error while trying to download file from Google Drive: {e}", exc_info=True)
-        raise e
+    except BaseException as e:
+        # Also on cancellation: the caller never gets the path, so the file is removed here.
+        os.remove(temp_file_path)
+        if isinstance(e, Exception) and not cancellation.is_cancelled():
+            logger.error(f"Critical error while trying to download file from Google Drive: {e}", exc_info=True)
+        raise
 
 
 def read_file_content(file: io.BytesIO, filename: str) -> str:
@@ -113,6 +178,7 @@ async def transcribe_audio_assemblyai(audio_path: str) -> str:
     """
     Transcribes an audio file with enhanced logging, using the correct low-level API
     functions and public properties.
+    Returns the speaker-diarized transcript in the compact turn format of ``utils.transcript``.
     """
     logger.info(f"Starting audio transcription process for file: {audio_path}")
 
@@ -130,7 +196,11 @@ async def transcribe_audio_assemblyai(audio_path: str) -> str:
     custom_settings = AssemblyAISettings(http_timeout=900.0)
     api_client = AssemblyAIClient(settings=custom_settings)
     transcriber = aai.Transcriber(client=api_client)
-    config = aai.TranscriptionConfig(language_detection=True)
+    config = aai.TranscriptionConfig(
+        language_detection=True,
+        speaker_labels=True,
+        speakers_expected=settings.transcription_speakers_expected
+    )
 
     submitted_transcript = None
     try:
@@ -138,7 +208,15 @@ async def transcribe_audio_assemblyai(audio_path: str) -> str:
         def sync_submit_task():
             logger.info("Step 1/2: Submitting file to AssemblyAI...")
             # submit() возвращает полноценный объект Transcript
-            return transcriber.submit(audio_path, config=config)
+            with tracer.start_as_current_span("assemblyai:submit") as span:
+                span.set_attribute("file.size_mb", round(file_size_mb, 2))
+                transcript = transcriber.submit(audio_path, config=config)
+                span.set_attribute("assemblyai.transcript_id", transcript.id or "")
+            if cancellation.is_cancelled():
+                # The job was cancelled during the upload and nobody awaits this thread any more.
+                _delete_transcript(api_client, transcript.id)
+                raise cancellation.JobCancelled("The job was cancelled.")
+            return transcript
 
         submitted_transcript = await asyncio.to_thread(sync_submit_task)
         # ИСПОЛЬЗУЕМ ПУБЛИЧНЫЕ СВОЙСТВА .id и .status
@@ -150,21 +228,26 @@ async def transcribe_audio_assemblyai(audio_path: str) -> str:
             logger.info("Step 2/2: Polling for transcription result...")
             polling_interval = 20  # seconds
 
-            while True:
-                # Используем ID из публичного свойства .id
-                current_transcript_response = api.get_transcript(
-                    api_client.http_client,
-                    submitted_transcript.id
-                )
+            with tracer.start_as_current_span("assemblyai:poll") as span:
+                polls = 0
+                while True:
+                    # Используем ID из публичного свойства .id
+                    current_transcript_response = api.get_transcript(
+                        api_client.http_client,
+                        submitted_transcript.id
+                    )
+                    polls += 1
 
-                status = current_transcript_response.status
-                logger.info(f"Polling... Current job status: {status.value}")
+                    status = current_transcript_response.status
+                    logger.info(f"Polling... Current job status: {status.value}")
 
-                if status in [aai.TranscriptStatus.completed, aai.TranscriptStatus.error]:
-                    logger.info(f"Polling finished with status '{status.value}'.")
-                    return current_transcript_response
+                    if status in [aai.TranscriptStatus.completed, aai.TranscriptStatus.error]:
+                        logger.info(f"Polling finished with status '{status.value}'.")
+                        span.set_attribute("assemblyai.polls", polls)
+                        span.set_attribute("assemblyai.status", status.value)
+                        return current_transcript_response
 
-                time.sleep(polling_interval)
+                    cancellation.sleep(polling_interval)
 
         final_transcript_response = await asyncio.to_thread(sync_poll_task)
 
@@ -176,27 +259,39 @@ async def transcribe_audio_assemblyai(audio_path: str) -> str:
         if not final_transcript_response.text:
             logger.warning("Transcription returned empty text.")
 
-        return final_transcript_response.text or ""
+        transcript = compact_transcript(final_transcript_response.utterances, final_transcript_response.text or "")
+        logger.info(
+            f"Transcript: {len(final_transcript_response.utterances or [])} utterances, "
+            f"{len(transcript)} characters in turn format."
+        )
+        return transcript
 
-    except Exception as e:
-        logger.error(f"An error occurred during the transcription process: {e}", exc_info=True)
+    except (Exception, asyncio.CancelledError) as e:
+        if cancellation.is_cancelled():
+            logger.warning("Transcription stopped: the job was cancelled.")
+        else:
+            logger.error(f"An error occurred during the transcription process: {e}", exc_info=True)
         if submitted_transcript:
-            try:
-                def sync_delete_task():
-                    logger.warning(f"Attempting to delete failed transcription job {submitted_transcript.id}...")
-                    # Используем ID из публичного свойства .id
-                    api.delete_transcript(
-                        api_client.http_client,
-                        submitted_transcript.id
-                    )
-
-                await asyncio.to_thread(sync_delete_task)
-                logger.success("Failed job deleted successfully.")
-            except Exception as delete_e:
-                logger.error(f"Could not delete failed job {submitted_transcript.id}: {delete_e}")
+            await asyncio.to_thread(_delete_transcript, api_client, submitted_transcript.id)
         raise
 
 
+def _delete_transcript(api_client: AssemblyAIClient, transcript_id: str) -> None:
+    with tracer.start_as_current_span("assemblyai:delete") as span:
+        span.set_attribute("assemblyai.transcript_id", transcript_id)
+        try:
+            logger.warning(f"Attempting to delete failed transcription job {transcript_id}...")
+            # Используем ID из публичного свойства .id
+            api.delete_transcript(
+                api_client.http_client,
+                transcript_id
+            )
+            logger.success("Failed job deleted successfully.")
+        except Exception as delete_e:
+            span.record_exception(delete_e)
+            logger.error(f"Could not delete failed job {transcript_id}: {delete_e}")
+
+
 def extract_json_from_string(text: str) -> str:
     """
     Finds and extracts the first JSON object from a string, stripping markdown code blocks.
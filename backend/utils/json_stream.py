@@ -0,0 +1,134 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+PathElement = Union[str, int]
+Path = Tuple[PathElement, ...]
+
+WHITESPACE = " \t\r\n"
+SCALAR_END = ",}]" + WHITESPACE
+
+
+@dataclass
+class _Frame:
+    kind: str
+    start: int
+    path: Path
+    key: Optional[str] = None
+    index: int = 0
+    expects_key: bool = True
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a JSON document that arrives in chunks, e.g. streamed LLM output.
+
+    ``feed`` returns ``(path, value)`` for every value under a watched path that was closed
+    within the fed text, so sections can be shown before the whole document is generated.
+    Watch patterns are tuples of keys; ``"*"`` matches any key or array index, e.g.
+    ``("report", "matching_table", "*")`` emits each table row as soon as its ``}`` arrives.
+
+    Text before the first ``{`` or ``[`` (such as a Markdown code fence) is skipped.
+    """
+
+    def __init__(self, watch: Iterable[Sequence[PathElement]]):
+        self.watch = [tuple(pattern) for pattern in watch]
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        self._text += chunk
+        text = self._text
+        completed: List[Tuple[Path, Any]] = []
+        i = self._pos
+
+        while i < len(text) and not self.done:
+            char = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        frame = self._stack[-1]
+                        frame.key = json.loads(text[self._string_start:i + 1])
+                        frame.expects_key = False
+                    else:
+                        self._close_value(self._child_path(), self._string_start, i + 1, completed)
+                i += 1
+                continue
+
+            if self._scalar_start is not None:
+                if char in SCALAR_END:
+                    self._close_value(self._child_path(), self._scalar_start, i, completed)
+                    self._scalar_start = None
+                    continue
+                i += 1
+                continue
+
+            if not self._stack:
+                if char in "{[":
+                    self._stack.append(_Frame(kind=char, start=i, path=()))
+                i += 1
+                continue
+
+            frame = self._stack[-1]
+            if char in WHITESPACE or char == ":":
+                pass
+            elif char in "{[":
+                self._stack.append(_Frame(kind=char, start=i, path=self._child_path()))
+            elif char in "}]":
+                self._stack.pop()
+                self._close_value(frame.path, frame.start, i + 1, completed)
+                if not self._stack:
+                    self.done = True
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = frame.kind == "{" and frame.expects_key
+            elif char == ",":
+                if frame.kind == "{":
+                    frame.expects_key = True
+                else:
+                    frame.index += 1
+            else:
+                self._scalar_start = i
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _child_path(self) -> Path:
+        frame = self._stack[-1]
+        return frame.path + ((frame.key,) if frame.kind == "{" else (frame.index,))
+
+    def _matches(self, path: Path) -> bool:
+        for pattern in self.watch:
+            if len(pattern) == len(path) and all(
+                    expected == "*" or expected == actual for expected, actual in zip(pattern, path)
+            ):
+                return True
+        return False
+
+    def _close_value(self, path: Path, start: int, end: int, completed: List[Tuple[Path, Any]]) -> None:
+        if self._matches(path):
+            try:
+                completed.append((path, json.loads(self._text[start:end])))
+            except json.JSONDecodeError:
+                # Malformed model output for this section; the final full parse reports the error.
+                pass
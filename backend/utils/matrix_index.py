@@ -0,0 +1,142 @@
+"""
+Local BM25 index over the rows of a competency matrix.
+
+An interview covers only a part of the matrix, so instead of sending the whole CSV
+to the final report agent, the rows are ranked against the topics found by agent 4
+and the transcript, and only the best matching rows are kept. Indexes are cached
+per matrix content, so a matrix shared by many interviews is tokenized once.
+"""
+import csv
+import hashlib
+import io
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Crude stemming: Russian and English word forms mostly share the first characters.
+STEM_LENGTH = 6
+# The transcript is long and noisy compared with the topic list, so its matches count less.
+TRANSCRIPT_WEIGHT = 0.3
+
+_index_cache: LRUCache = LRUCache(maxsize=32)
+_index_cache_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token[:STEM_LENGTH] for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and not token.isdigit()]
+
+
+class CompetencyMatrixIndex:
+    """BM25 (k1=1.5, b=0.75) over the data rows of a CSV; the first non-empty row is the header."""
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, csv_text: str):
+        rows = [row for row in csv.reader(io.StringIO(csv_text)) if any(cell.strip() for cell in row)]
+        self.header: List[str] = rows[0] if rows else []
+        self.rows: List[List[str]] = rows[1:]
+
+        self._term_frequencies: List[Counter] = []
+        category = ""
+        for row in self.rows:
+            # Merged category cells are exported only on the first row of the group.
+            if row and row[0].strip():
+                category = row[0]
+            self._term_frequencies.append(Counter(tokenize(" ".join([category, *row[1:]]))))
+
+        lengths = [sum(frequencies.values()) for frequencies in self._term_frequencies]
+        self._lengths = lengths
+        self._average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        document_frequency: Counter = Counter()
+        for frequencies in self._term_frequencies:
+            document_frequency.update(frequencies.keys())
+        total = len(self.rows)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = set(tokenize(query)) & self._idf.keys()
+        scores = []
+        for frequencies, length in zip(self._term_frequencies, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self._average_length) if self._average_length else self.k1
+            score = 0.0
+            for term in frequencies.keys() & terms:
+                tf = frequencies[term]
+                score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, queries: Iterable[Tuple[str, float]], max_rows: int) -> Optional[List[int]]:
+        """
+        Indexes of the ``max_rows`` best rows for the weighted queries, in matrix order.
+        Returns None when nothing matches, so the caller can keep the full matrix.
+        """
+        combined = [0.0] * len(self.rows)
+        for query, weight in queries:
+            for index, score in enumerate(self.scores(query)):
+                combined[index] += weight * score
+        ranked = sorted((index for index, score in enumerate(combined) if score > 0), key=lambda i: -combined[i])
+        if not ranked:
+            return None
+        return sorted(ranked[:max_rows])
+
+    def render(self, indexes: List[int]) -> str:
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(self.header)
+        category = ""
+        previous = -1
+        for index in indexes:
+            row = list(self.rows[index])
+            # Keep the category of a row whose group header row was not selected.
+            for skipped in range(previous + 1, index + 1):
+                if self.rows[skipped] and self.rows[skipped][0].strip():
+                    category = self.rows[skipped][0]
+            if row and not row[0].strip():
+                row[0] = category
+            writer.writerow(row)
+            previous = index
+        return output.getvalue()
+
+
+def get_matrix_index(csv_text: str) -> CompetencyMatrixIndex:
+    """Returns the cached index for this matrix version, building it on first use."""
+    key = hashlib.sha256(csv_text.encode("utf-8")).hexdigest()
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+    if index is None:
+        index = CompetencyMatrixIndex(csv_text)
+        with _index_cache_lock:
+            _index_cache[key] = index
+    return index
+
+
+def select_relevant_rows(csv_text: str, topics: List[str], transcript: str, max_rows: int) -> Tuple[str, int, int]:
+    """
+    Keeps the header and the ``max_rows`` matrix rows most relevant to the interview.
+    Returns the CSV text with the selected rows, the number of rows kept and the total number of rows.
+    """
+    index = get_matrix_index(csv_text)
+    total = len(index.rows)
+    if total <= max_rows:
+        return csv_text, total, total
+    selected = index.select([("\n".join(topics), 1.0), (transcript, TRANSCRIPT_WEIGHT)], max_rows)
+    if selected is None:
+        return csv_text, total, total
+    return index.render(selected), len(selected), total
+
+
+def topic_coverage(csv_text: str, topics: List[str]) -> Optional[float]:
+    """Share of matrix rows that match at least one interview topic; None for an empty matrix."""
+    index = get_matrix_index(csv_text)
+    if not index.rows:
+        return None
+    scores = index.scores("\n".join(topics))
+    return sum(1 for score in scores if score > 0) / len(scores)
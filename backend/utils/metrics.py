@@ -0,0 +1,134 @@
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from backend.utils.cancellation import raise_if_cancelled
+from backend.utils.tracing import tracer
+
+
+class StageTimings:
+    """
+    Wall-clock durations of pipeline stages, named counters and the peak process RSS
+    seen while each stage ran, recorded within one collection scope.
+
+    RSS is read on stage entry and exit, and by ``sample_memory`` in between. It is a
+    process-wide number: stages of concurrent jobs in the same process share it.
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.peak_rss: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name].append(seconds)
+
+    def enter(self, name: str) -> None:
+        self._active[name] = self._active.get(name, 0) + 1
+        self.observe_rss(current_rss_bytes())
+
+    def exit(self, name: str) -> None:
+        self.observe_rss(current_rss_bytes())
+        if self._active.get(name, 0) <= 1:
+            self._active.pop(name, None)
+        else:
+            self._active[name] -= 1
+
+    def observe_rss(self, rss: int) -> None:
+        """Raises the peak of every stage that is running now to ``rss``."""
+        for name in list(self._active):
+            if rss > self.peak_rss.get(name, 0):
+                self.peak_rss[name] = rss
+
+    def increment(self, name: str, value: float) -> None:
+        self.counters[name] += value
+
+    def totals(self) -> Dict[str, float]:
+        return {name: sum(values) for name, values in self.durations.items()}
+
+
+_current_timings: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect_stages() -> Iterator[StageTimings]:
+    """
+    Collects the stages timed inside this block. The scope follows the context,
+    so concurrent asyncio tasks and threads started from it report separately.
+    """
+    timings = StageTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Times a pipeline stage, tracks its peak RSS and traces it as a span of the current job.
+    Costs a single clock read and a no-op span when nothing is collecting or tracing.
+    Stage boundaries are cancellation points: a cancelled job does not start the next stage.
+    """
+    raise_if_cancelled()
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.enter(name)
+    started = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(name):
+            yield
+    finally:
+        if timings is not None:
+            timings.add(name, time.perf_counter() - started)
+            timings.exit(name)
+
+
+def count(name: str, value: float) -> None:
+    """Adds ``value`` to a named counter, e.g. prompt tokens saved by a stage."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.increment(name, value)
+
+
+@contextmanager
+def sample_memory(timings: StageTimings, interval: float) -> Iterator[None]:
+    """
+    Samples the process RSS every ``interval`` seconds in a background thread while the
+    block runs, so stage peaks include allocations between the stage boundaries.
+    """
+    stopped = threading.Event()
+
+    def sample() -> None:
+        while not stopped.wait(interval):
+            timings.observe_rss(current_rss_bytes())
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        sampler.join()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process. Falls back to the peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process over its lifetime."""
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,102 @@
+"""
+On-demand CPU and allocation profiling of a single job.
+
+A job is profiled when it was submitted with the profile flag, or picked by
+``job_profile_sample_rate``. The CPU profile is a cProfile capture of the thread that
+runs the job (the event loop: parsing, JSON handling and agent orchestration), saved in
+the ``pstats`` format; the allocation snapshot is a pickled ``tracemalloc.Snapshot``.
+Both are process-wide instruments, so only one job per process is profiled at a time.
+"""
+import cProfile
+import io
+import marshal
+import pickle
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from loguru import logger
+
+from backend.core.config import settings
+
+PROFILE_META_KEY = "profile"
+TRACEMALLOC_FRAMES = 10
+SUMMARY_FUNCTIONS = 40
+SUMMARY_ALLOCATIONS = 25
+
+_profiler_lock = threading.Lock()
+
+
+@dataclass
+class JobProfile:
+    cpu_stats: bytes = b""
+    allocations: bytes = b""
+    summary: str = ""
+
+
+def should_profile(requested: bool) -> bool:
+    """Whether a new job is profiled: on request, or sampled at ``job_profile_sample_rate``."""
+    return requested or random.random() < settings.job_profile_sample_rate
+
+
+@contextmanager
+def profile(label: str) -> Iterator[Optional[JobProfile]]:
+    """
+    Profiles the block and fills the yielded JobProfile when it exits, also on errors.
+    Yields None when another profile is already running in this process.
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        logger.warning(f"Another job is being profiled in this process; {label} runs without profiling.")
+        yield None
+        return
+
+    result = JobProfile()
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        try:
+            # Not filtered: filter_traces() is pure Python and takes seconds on a large snapshot.
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            _fill(result, label, profiler, snapshot, peak, elapsed)
+        finally:
+            _profiler_lock.release()
+
+
+def _fill(
+        result: JobProfile,
+        label: str,
+        profiler: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        peak: int,
+        elapsed: float
+) -> None:
+    profiler.create_stats()
+    # The same bytes Profile.dump_stats writes: loadable with pstats.Stats(path) or snakeviz.
+    result.cpu_stats = marshal.dumps(profiler.stats)
+    result.allocations = pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)
+
+    summary = io.StringIO()
+    summary.write(f"Profile of {label}: {elapsed:.2f}s wall time, {peak / 2 ** 20:.1f} MB peak traced memory.\n")
+    summary.write("CPU profile covers the thread that ran the job, including other work on its event loop.\n\n")
+    pstats.Stats(profiler, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_FUNCTIONS)
+    summary.write(f"\nTop {SUMMARY_ALLOCATIONS} allocation sites still alive at the end of the job:\n")
+    for statistic in snapshot.statistics("lineno")[:SUMMARY_ALLOCATIONS]:
+        summary.write(f"{statistic}\n")
+    result.summary = summary.getvalue()
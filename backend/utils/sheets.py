@@ -0,0 +1,85 @@
+"""
+Token-compact normalization of Google Sheets CSV exports.
+
+Exports carry a lot that costs prompt tokens without adding information: trailing
+empty columns, blank spacer rows, header rows repeated for printing, values that
+were filled down over a group of rows, and whitespace and line breaks from cell
+formatting. ``normalize_sheet_csv`` drops all of it and renders a compact CSV.
+"""
+import csv
+import io
+from typing import List
+
+
+def _clean_cell(cell: str) -> str:
+    return " ".join(cell.split())
+
+
+def _group_columns(rows: List[List[str]]) -> int:
+    """
+    Counts the leading columns laid out like merged cells: every value forms a single
+    contiguous run, nested inside the runs of the columns before it. The last column
+    holds the data itself and is never a group.
+    """
+    width = min((len(row) for row in rows), default=0)
+    for column in range(width - 1):
+        seen = set()
+        for index, row in enumerate(rows):
+            value = row[column]
+            if not value:
+                continue
+            previous = rows[index - 1] if index else None
+            if previous is not None and previous[column] == value:
+                if previous[:column] != row[:column]:
+                    return column
+                continue
+            key = tuple(row[:column + 1])
+            if key in seen:
+                return column
+            seen.add(key)
+    return max(width - 1, 0)
+
+
+def _blank_repeated_groups(rows: List[List[str]]) -> None:
+    """
+    Blanks group cells that repeat the row above, the way a merged cell is exported:
+    the group value stays on the first row of the group only. Repeats in other columns,
+    e.g. the same level on two rows, are data and are kept.
+    """
+    group_columns = _group_columns(rows)
+    previous: List[str] = []
+    for row in rows:
+        current = list(row)
+        for column, value in enumerate(row[:group_columns]):
+            if not value or column >= len(previous) or previous[column] != value:
+                break
+            row[column] = ""
+        previous = current
+
+
+def normalize_sheet_csv(csv_text: str) -> str:
+    rows = [[_clean_cell(cell) for cell in row] for row in csv.reader(io.StringIO(csv_text))]
+    rows = [row for row in rows if any(row)]
+    if not rows:
+        return ""
+
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    used_columns = [column for column in range(width) if any(row[column] for row in rows)]
+    rows = [[row[column] for column in used_columns] for row in rows]
+
+    header = rows[0]
+    body: List[List[str]] = []
+    for row in rows[1:]:
+        if row == header or (body and row == body[-1]):
+            continue
+        body.append(row)
+    _blank_repeated_groups(body)
+
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for row in [header, *body]:
+        while row and not row[-1]:
+            row.pop()
+        writer.writerow(row)
+    return output.getvalue()
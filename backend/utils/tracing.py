@@ -0,0 +1,138 @@
+"""
+OpenTelemetry tracing of a request from the API through the queue into the worker.
+
+The API opens a span per request, ``JobScheduler.enqueue`` stores the trace context in
+``job.meta["trace"]``, and the worker continues the same trace around the job, so the
+pipeline stages (``metrics.stage``), AssemblyAI calls and the spans of the ADK agents
+all end up in one trace per job.
+
+Spans are exported only when ``tracing_exporter`` is set: ``console`` prints them to
+stdout for local runs, ``gcp`` sends them to Cloud Trace. With the default ``none`` no
+tracer provider is installed and every span is a no-op.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from loguru import logger
+from opentelemetry import context, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from backend.core.config import settings
+
+TRACE_META_KEY = "trace"
+
+tracer = trace.get_tracer("backend")
+_propagator = TraceContextTextMapPropagator()
+_configured = False
+
+
+def configure_tracing(service_name: str) -> bool:
+    """
+    Installs the tracer provider and exporter chosen in the settings.
+    Returns False when tracing is disabled or the exporter is unknown.
+    """
+    global _configured
+    exporter_name = settings.tracing_exporter.strip().lower()
+    if _configured or exporter_name in ("", "none"):
+        return _configured
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+
+    if exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "gcp":
+        from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+        exporter = CloudTraceSpanExporter()
+    else:
+        logger.warning(f"Unknown tracing exporter '{settings.tracing_exporter}', tracing stays disabled.")
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBasedTraceIdRatio(settings.tracing_sample_rate)
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    logger.info(f"Tracing enabled for {service_name}: exporter {exporter_name}, sample rate {settings.tracing_sample_rate}.")
+    return True
+
+
+def flush(timeout_millis: int = 5000) -> None:
+    """Exports buffered spans, e.g. before a forked job process exits."""
+    provider = trace.get_tracer_provider()
+    force_flush = getattr(provider, "force_flush", None)
+    if force_flush is not None:
+        force_flush(timeout_millis)
+
+
+def inject_context() -> Dict[str, str]:
+    """The W3C trace context of the current span, to be stored with a job; empty when nothing is traced."""
+    carrier: Dict[str, str] = {}
+    _propagator.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: Optional[Dict[str, str]]) -> context.Context:
+    return _propagator.extract(carrier or {})
+
+
+@contextmanager
+def job_span(job: Any) -> Iterator[trace.Span]:
+    """Continues the trace of the request that enqueued ``job`` for the time the job runs."""
+    parent = extract_context((job.meta or {}).get(TRACE_META_KEY))
+    with tracer.start_as_current_span(
+            f"job {job.func_name}",
+            context=parent,
+            kind=SpanKind.CONSUMER,
+            attributes={
+                "messaging.system": "rq",
+                "messaging.destination.name": job.origin or "",
+                "messaging.message.id": job.id,
+                "rq.job.kind": (job.meta or {}).get("kind") or "",
+            }
+    ) as span:
+        yield span
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that opens a server span per HTTP request, continuing an incoming
+    ``traceparent``. The span is named after the matched route template and ends only
+    after the whole response is sent, so streamed (SSE) responses are timed in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", ())}
+        method = scope.get("method", "GET")
+        with tracer.start_as_current_span(
+                f"{method} {scope.get('path', '')}",
+                context=extract_context(headers),
+                kind=SpanKind.SERVER,
+                attributes={"http.request.method": method, "url.path": scope.get("path", "")}
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
@@ -0,0 +1,94 @@
+"""
+Compact, speaker-diarized interview transcript.
+
+AssemblyAI utterances are merged into turns (consecutive speech of one speaker),
+each speaker gets an interviewer or candidate role, and the turns are rendered one
+per line as ``#<index> <role> <mm:ss> <text>``. Compared with the flat transcript
+this adds the Q/A structure for a few tokens per turn, and agents can refer to a
+turn by its index instead of quoting it.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+INTERVIEWER = "I"
+CANDIDATE = "C"
+SPEAKER = "S"
+
+TURN_FORMAT_HEADER = (
+    "Формат: #номер_реплики роль время(мм:сс) текст. "
+    f"Роли: {INTERVIEWER} — интервьюер, {CANDIDATE} — кандидат."
+)
+
+# A "(#12-#15)" or "(#3, #8)" suffix with which agents cite turns.
+_TURN_REFS = re.compile(r"\s*\(\s*#\d+(?:\s*[-–,]\s*#?\d+)*\s*\)\s*$")
+
+
+@dataclass
+class TranscriptTurn:
+    index: int
+    speaker: str
+    role: str
+    start_ms: int
+    text: str
+
+
+def _assign_roles(word_counts: Counter) -> Dict[str, str]:
+    """The candidate is the speaker who talks the most; everyone else is an interviewer."""
+    if len(word_counts) < 2:
+        return {speaker: SPEAKER for speaker in word_counts}
+    candidate = word_counts.most_common(1)[0][0]
+    return {speaker: CANDIDATE if speaker == candidate else INTERVIEWER for speaker in word_counts}
+
+
+def build_turns(utterances: Iterable) -> List[TranscriptTurn]:
+    """
+    Merges consecutive utterances of the same speaker into turns and assigns roles.
+    ``utterances`` are AssemblyAI utterances (``speaker``, ``start`` in ms, ``text``).
+    """
+    merged: List[dict] = []
+    for utterance in utterances:
+        text = (utterance.text or "").strip()
+        if not text:
+            continue
+        speaker = utterance.speaker or "?"
+        if merged and merged[-1]["speaker"] == speaker:
+            merged[-1]["text"] += " " + text
+        else:
+            merged.append({"speaker": speaker, "start_ms": utterance.start or 0, "text": text})
+
+    word_counts = Counter()
+    for turn in merged:
+        word_counts[turn["speaker"]] += len(turn["text"].split())
+    roles = _assign_roles(word_counts)
+
+    return [
+        TranscriptTurn(index=index, speaker=turn["speaker"], role=roles[turn["speaker"]],
+                       start_ms=turn["start_ms"], text=turn["text"])
+        for index, turn in enumerate(merged)
+    ]
+
+
+def _timestamp(ms: int) -> str:
+    minutes, seconds = divmod(ms // 1000, 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_turns(turns: List[TranscriptTurn]) -> str:
+    lines = [TURN_FORMAT_HEADER]
+    lines += [f"#{turn.index} {turn.role} {_timestamp(turn.start_ms)} {turn.text}" for turn in turns]
+    return "\n".join(lines)
+
+
+def compact_transcript(utterances: Optional[Iterable], fallback_text: str) -> str:
+    """Turn-based transcript, or the flat text when diarization returned no utterances."""
+    turns = build_turns(utterances or [])
+    if not turns:
+        return fallback_text
+    return format_turns(turns)
+
+
+def strip_turn_refs(text: str) -> str:
+    """Removes the trailing turn references an agent added to a topic, e.g. ``Тема (#4-#7)`` -> ``Тема``."""
+    return _TURN_REFS.sub("", text)
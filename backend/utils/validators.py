@@ -1,6 +1,25 @@
 from fastapi import HTTPException, status
 from fastapi import UploadFile
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+import codecs
 import os
+import zipfile
+
+
+@dataclass
+class ValidatedUpload:
+    """An upload that passed streaming validation, spooled to memory or disk and rewound."""
+    file: SpooledTemporaryFile
+    filename: str
+    detected_type: str
+    size: int
+
+    def read_bytes(self) -> bytes:
+        self.file.seek(0)
+        data = self.file.read()
+        self.file.seek(0)
+        return data
 
 
 class FileValidator:
@@ -14,6 +33,16 @@ class FileValidator:
 
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+    CHUNK_SIZE = 64 * 1024
+    SPOOL_MAX_MEMORY = 1024 * 1024  # larger uploads are spooled to disk
+
+    # Real content types detected from magic bytes, and the extension each one is parsed as.
+    MAGIC_SIGNATURES = [
+        (b'%PDF-', '.pdf'),
+        (b'PK\x03\x04', '.docx'),
+        (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', '.doc'),
+    ]
+
     @classmethod
     def validate_file_size(cls, file: UploadFile) -> None:
         """Validate file size"""
@@ -45,4 +74,69 @@ class FileValidator:
     def validate_cv_file_results(cls, file: UploadFile) -> None:
         """Validate CV file for results endpoint"""
         cls.validate_file_size(file)
-        cls.validate_file_extension(file, 'cv_results')
\ No newline at end of file
+        cls.validate_file_extension(file, 'cv_results')
+
+    @classmethod
+    def detect_file_type(cls, head: bytes) -> str | None:
+        """Detects the real file type from its first bytes. Returns an extension or None."""
+        for signature, extension in cls.MAGIC_SIGNATURES:
+            if head.startswith(signature):
+                return extension
+        if b'\x00' in head:
+            return None
+        try:
+            # The head may end in the middle of a multi-byte character.
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        except UnicodeDecodeError:
+            return None
+        return '.txt'
+
+    @classmethod
+    async def read_validated_upload(cls, file: UploadFile, file_type: str) -> ValidatedUpload:
+        """
+        Streams an upload in chunks into a spooled file. Rejects it with 413 as soon as it
+        exceeds MAX_FILE_SIZE, and with 400 when its extension or its real type (by magic
+        bytes) is not allowed.
+        The returned filename carries the detected extension, so parsers pick the right reader.
+        """
+        cls.validate_file_size(file)
+        cls.validate_file_extension(file, file_type)
+
+        spooled = SpooledTemporaryFile(max_size=cls.SPOOL_MAX_MEMORY)
+        size = 0
+        head = b''
+        try:
+            while chunk := await file.read(cls.CHUNK_SIZE):
+                size += len(chunk)
+                if size > cls.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum allowed size of {cls.MAX_FILE_SIZE // (1024 * 1024)}MB"
+                    )
+                if len(head) < cls.CHUNK_SIZE:
+                    head += chunk[:cls.CHUNK_SIZE - len(head)]
+                spooled.write(chunk)
+
+            detected_type = cls.detect_file_type(head)
+            if detected_type == '.docx':
+                spooled.seek(0)
+                try:
+                    with zipfile.ZipFile(spooled) as archive:
+                        if 'word/document.xml' not in archive.namelist():
+                            detected_type = None
+                except zipfile.BadZipFile:
+                    detected_type = None
+
+            allowed = cls.ALLOWED_EXTENSIONS.get(file_type, [])
+            if size == 0 or detected_type not in allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid file type for {file_type}. Allowed types: {', '.join(allowed)}"
+                )
+        except BaseException:
+            spooled.close()
+            raise
+
+        spooled.seek(0)
+        stem = os.path.splitext(file.filename or 'upload')[0]
+        return ValidatedUpload(file=spooled, filename=f"{stem}{detected_type}", detected_type=detected_type, size=size)
@@ -1,40 +1,61 @@
 import os
-import subprocess
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, status
 from loguru import logger
 
+from backend.core.config import settings
+from backend.db import database
+from backend.queue.scheduling import INTERACTIVE_QUEUE, QUEUE_PRIORITIES
+from backend.queue.supervisor import WorkerSupervisor
+
+redis_url = os.getenv('REDIS_URL')
+
+supervisor = WorkerSupervisor(
+    redis_url=redis_url,
+    queue_names=QUEUE_PRIORITIES,
+    max_workers=settings.worker_max_processes,
+    poll_interval=settings.worker_supervisor_poll_seconds,
+    interactive_queue=INTERACTIVE_QUEUE,
+    reserved_interactive=settings.worker_reserved_interactive_slots,
+) if redis_url else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.warn_if_history_unavailable()
+    if supervisor:
+        supervisor.start()
+        # Подхватываем задачи, которые могли остаться в очереди до старта сервиса.
+        supervisor.trigger()
+    yield
+    if supervisor:
+        supervisor.stop()
+
+
 app = FastAPI(
     title="AI Hiring Tool - On-Demand Worker",
     description="Этот сервис принимает HTTP-запросы для запуска обработки задач из очереди Redis.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-redis_url = os.getenv('REDIS_URL')
-listen_queues = ["results_processing"]
-
 
 @app.post("/process", status_code=status.HTTP_202_ACCEPTED)
 def trigger_processing():
     """
-    Этот эндпоинт принимает 'пинок' и запускает обработку очереди в отдельном процессе.
+    Этот эндпоинт принимает 'пинок' и будит супервизор воркеров.
+    Повторные 'пинки' объединяются, число процессов воркеров ограничено настройками.
     """
-    logger.info("Получен триггер, запускаю обработку очереди в отдельном процессе...")
-    if not redis_url:
+    logger.info("Получен триггер, передаю его супервизору воркеров...")
+    if not supervisor:
         logger.error("Нет REDIS_URL. Обработка невозможна.")
         return {"status": "error", "detail": "Redis URL not configured"}
 
-    try:
-        command = [
-            "rq", "worker",
-            "--burst",
-            "--url", redis_url,
-            *listen_queues
-        ]
-        subprocess.Popen(command)
-
-        logger.info("Процесс обработки очереди успешно запущен в фоне.")
-        return {"status": "ok", "detail": "Processing started in background."}
-
-    except Exception as e:
-        logger.error(f"Ошибка при запуске дочернего процесса воркера: {e}", exc_info=True)
-        return {"status": "error", "detail": str(e)}
+    supervisor.trigger()
+    return {
+        "status": "ok",
+        "detail": "Processing scheduled.",
+        "running_workers": supervisor.running_workers(),
+        "max_workers": supervisor.max_workers,
+    }